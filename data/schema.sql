@@ -4,7 +4,7 @@ CREATE TABLE VersionHistory(
   time TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
   author TEXT
 );
-INSERT INTO VersionHistory (version, author) VALUES (14, 'Initial Creation');
+INSERT INTO VersionHistory (version, author) VALUES (15, 'Initial Creation');
 
 
 CREATE OR REPLACE FUNCTION update_timestamp_column()
@@ -909,6 +909,226 @@ AS $$
   END;
 $$ LANGUAGE PLPGSQL;
 
+-- Voice time, messages and experience of each member per day, in the timezone recorded in member_activity_rollups.
+-- Members are rolled up on their first read through member_daily_activity_fetch(), and rebuilt there
+-- whenever the requested timezone changes, after which completed sessions are added by the triggers below.
+CREATE TABLE member_activity_rollups(
+  guildid BIGINT NOT NULL,
+  userid BIGINT NOT NULL,
+  timezone TEXT NOT NULL,
+  built_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (guildid, userid),
+  FOREIGN KEY (guildid, userid) REFERENCES members (guildid, userid) ON DELETE CASCADE
+);
+CREATE INDEX member_activity_rollups_users ON member_activity_rollups (userid);
+
+CREATE TABLE member_daily_activity(
+  guildid BIGINT NOT NULL,
+  userid BIGINT NOT NULL,
+  day DATE NOT NULL,
+  voice_seconds INTEGER NOT NULL DEFAULT 0,
+  messages INTEGER NOT NULL DEFAULT 0,
+  xp INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (guildid, userid, day),
+  FOREIGN KEY (guildid, userid) REFERENCES members (guildid, userid) ON DELETE CASCADE
+);
+
+-- Split the period between the given times into the seconds falling on each day in the given timezone
+CREATE FUNCTION activity_day_parts(_start TIMESTAMPTZ, _end TIMESTAMPTZ, _tz TEXT)
+  RETURNS TABLE (day DATE, seconds INTEGER)
+AS $$
+  SELECT
+    days._day::DATE,
+    EXTRACT(EPOCH FROM (
+      LEAST(_end, (days._day + interval '1 day') AT TIME ZONE _tz) - GREATEST(_start, days._day AT TIME ZONE _tz)
+    ))::INTEGER
+  FROM generate_series(
+    date_trunc('day', _start AT TIME ZONE _tz),
+    date_trunc('day', (_end - interval '1 microsecond') AT TIME ZONE _tz),
+    interval '1 day'
+  ) AS days (_day)
+  WHERE _end > _start;
+$$ LANGUAGE SQL STABLE;
+
+CREATE FUNCTION member_daily_activity_compute(_guildid BIGINT, _userid BIGINT, _tz TEXT)
+  RETURNS TABLE (day DATE, voice_seconds INTEGER, messages INTEGER, xp INTEGER)
+AS $$
+  WITH
+    parts AS (
+      SELECT p.day AS _day, p.seconds AS _voice, 0 AS _messages, 0 AS _xp
+      FROM voice_sessions v
+      CROSS JOIN LATERAL activity_day_parts(v.start_time, v.start_time + v.duration * interval '1 second', _tz) p
+      WHERE v.guildid = _guildid AND v.userid = _userid
+      UNION ALL
+      SELECT (t.start_time AT TIME ZONE _tz)::DATE, 0, t.messages, 0
+      FROM text_sessions t
+      WHERE t.guildid = _guildid AND t.userid = _userid
+      UNION ALL
+      SELECT (e.earned_at AT TIME ZONE _tz)::DATE, 0, 0, e.amount
+      FROM member_experience e
+      WHERE e.guildid = _guildid AND e.userid = _userid
+    )
+  SELECT parts._day, SUM(parts._voice)::INTEGER, SUM(parts._messages)::INTEGER, SUM(parts._xp)::INTEGER
+  FROM parts
+  GROUP BY parts._day;
+$$ LANGUAGE SQL STABLE;
+
+CREATE FUNCTION member_daily_activity_rebuild(_guildid BIGINT, _userid BIGINT, _tz TEXT)
+  RETURNS VOID
+AS $$
+  BEGIN
+    -- Locks the rollup row, which conflicts with the FOR SHARE taken by the maintenance triggers,
+    -- so sessions saved while we rebuild are applied after the rebuild completes.
+    INSERT INTO member_activity_rollups (guildid, userid, timezone) VALUES (_guildid, _userid, _tz)
+    ON CONFLICT (guildid, userid) DO UPDATE
+      SET timezone = EXCLUDED.timezone, built_at = now();
+    DELETE FROM member_daily_activity a WHERE a.guildid = _guildid AND a.userid = _userid;
+    INSERT INTO member_daily_activity (guildid, userid, day, voice_seconds, messages, xp)
+      SELECT _guildid, _userid, c.day, c.voice_seconds, c.messages, c.xp
+      FROM member_daily_activity_compute(_guildid, _userid, _tz) c;
+  END;
+$$ LANGUAGE PLPGSQL;
+
+-- Daily activity of the given member since the given day, or of the user in every guild if _guildid is NULL.
+-- Includes ongoing voice sessions. Members without a rollup in the given timezone are rebuilt first.
+CREATE FUNCTION member_daily_activity_fetch(_guildid BIGINT, _userid BIGINT, _tz TEXT, _since DATE)
+  RETURNS TABLE (day DATE, voice_seconds INTEGER, messages INTEGER, xp INTEGER)
+AS $$
+  #variable_conflict use_column
+  BEGIN
+    IF _guildid IS NULL THEN
+      PERFORM member_daily_activity_rebuild(m.guildid, _userid, _tz)
+      FROM members m
+      WHERE m.userid = _userid AND NOT EXISTS (
+        SELECT 1 FROM member_activity_rollups r
+        WHERE r.guildid = m.guildid AND r.userid = _userid AND r.timezone = _tz
+      );
+    ELSIF NOT EXISTS (
+      SELECT 1 FROM member_activity_rollups r
+      WHERE r.guildid = _guildid AND r.userid = _userid AND r.timezone = _tz
+    ) THEN
+      PERFORM member_daily_activity_rebuild(_guildid, _userid, _tz);
+    END IF;
+    RETURN QUERY
+      WITH
+        built AS (
+          SELECT r.guildid
+          FROM member_activity_rollups r
+          WHERE r.userid = _userid AND (_guildid IS NULL OR r.guildid = _guildid) AND r.timezone = _tz
+        ),
+        parts AS (
+          SELECT a.day AS _day, a.voice_seconds AS _voice, a.messages AS _messages, a.xp AS _xp
+          FROM member_daily_activity a
+          WHERE
+            a.guildid IN (SELECT built.guildid FROM built)
+            AND a.userid = _userid
+            AND (_since IS NULL OR a.day >= _since)
+          UNION ALL
+          SELECT p.day, p.seconds, 0, 0
+          FROM voice_sessions_ongoing o
+          CROSS JOIN LATERAL activity_day_parts(o.start_time, now(), _tz) p
+          WHERE
+            (_guildid IS NULL OR o.guildid = _guildid)
+            AND o.userid = _userid
+            AND (_since IS NULL OR p.day >= _since)
+        )
+      SELECT parts._day, SUM(parts._voice)::INTEGER, SUM(parts._messages)::INTEGER, SUM(parts._xp)::INTEGER
+      FROM parts
+      GROUP BY parts._day
+      ORDER BY parts._day;
+  END;
+$$ LANGUAGE PLPGSQL;
+
+CREATE FUNCTION member_daily_activity_voice_trigger()
+  RETURNS TRIGGER
+AS $$
+  BEGIN
+    WITH
+      rollups AS (
+        SELECT guildid, userid, timezone
+        FROM member_activity_rollups
+        WHERE (guildid, userid) IN (SELECT guildid, userid FROM new_sessions)
+        FOR SHARE
+      ),
+      totals AS (
+        SELECT s.guildid, s.userid, p.day, SUM(p.seconds) AS total
+        FROM new_sessions s
+        JOIN rollups USING (guildid, userid)
+        CROSS JOIN LATERAL activity_day_parts(
+          s.start_time, s.start_time + s.duration * interval '1 second', rollups.timezone
+        ) p
+        GROUP BY s.guildid, s.userid, p.day
+      )
+    INSERT INTO member_daily_activity (guildid, userid, day, voice_seconds)
+      SELECT guildid, userid, day, total FROM totals
+    ON CONFLICT (guildid, userid, day) DO UPDATE
+      SET voice_seconds = member_daily_activity.voice_seconds + EXCLUDED.voice_seconds;
+    RETURN NULL;
+  END;
+$$ LANGUAGE PLPGSQL;
+
+CREATE TRIGGER member_daily_activity_voice_sessions AFTER INSERT ON voice_sessions
+  REFERENCING NEW TABLE AS new_sessions
+  FOR EACH STATEMENT EXECUTE PROCEDURE member_daily_activity_voice_trigger();
+
+CREATE FUNCTION member_daily_activity_text_trigger()
+  RETURNS TRIGGER
+AS $$
+  BEGIN
+    WITH
+      rollups AS (
+        SELECT guildid, userid, timezone
+        FROM member_activity_rollups
+        WHERE (guildid, userid) IN (SELECT guildid, userid FROM new_sessions)
+        FOR SHARE
+      ),
+      totals AS (
+        SELECT s.guildid, s.userid, (s.start_time AT TIME ZONE rollups.timezone)::DATE AS day, SUM(s.messages) AS total
+        FROM new_sessions s
+        JOIN rollups USING (guildid, userid)
+        GROUP BY 1, 2, 3
+      )
+    INSERT INTO member_daily_activity (guildid, userid, day, messages)
+      SELECT guildid, userid, day, total FROM totals
+    ON CONFLICT (guildid, userid, day) DO UPDATE
+      SET messages = member_daily_activity.messages + EXCLUDED.messages;
+    RETURN NULL;
+  END;
+$$ LANGUAGE PLPGSQL;
+
+CREATE TRIGGER member_daily_activity_text_sessions AFTER INSERT ON text_sessions
+  REFERENCING NEW TABLE AS new_sessions
+  FOR EACH STATEMENT EXECUTE PROCEDURE member_daily_activity_text_trigger();
+
+CREATE FUNCTION member_daily_activity_xp_trigger()
+  RETURNS TRIGGER
+AS $$
+  BEGIN
+    WITH
+      rollups AS (
+        SELECT guildid, userid, timezone
+        FROM member_activity_rollups
+        WHERE (guildid, userid) IN (SELECT guildid, userid FROM new_exp)
+        FOR SHARE
+      ),
+      totals AS (
+        SELECT e.guildid, e.userid, (e.earned_at AT TIME ZONE rollups.timezone)::DATE AS day, SUM(e.amount) AS total
+        FROM new_exp e
+        JOIN rollups USING (guildid, userid)
+        GROUP BY 1, 2, 3
+      )
+    INSERT INTO member_daily_activity (guildid, userid, day, xp)
+      SELECT guildid, userid, day, total FROM totals
+    ON CONFLICT (guildid, userid, day) DO UPDATE
+      SET xp = member_daily_activity.xp + EXCLUDED.xp;
+    RETURN NULL;
+  END;
+$$ LANGUAGE PLPGSQL;
+
+CREATE TRIGGER member_daily_activity_member_experience AFTER INSERT ON member_experience
+  REFERENCING NEW TABLE AS new_exp
+  FOR EACH STATEMENT EXECUTE PROCEDURE member_daily_activity_xp_trigger();
+
 -- }}}
 
 -- Activity Rank Data {{{
@@ -965,9 +1185,207 @@ CREATE TABLE season_stats(
   season_start TIMESTAMPTZ,
   updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
   PRIMARY KEY (guildid, userid),
-  FOREIGN KEY (guildid, userid) REFERENCES members (guildid, userid)
+  FOREIGN KEY (guildid, userid) REFERENCES members (guildid, userid) ON DELETE CASCADE
 );
 
+-- Incrementally maintained season statistics.
+-- Completed voice time, experience and messages are added to season_stats as they are saved.
+-- Rows record the season_start they were computed against, and stale rows are never incremented.
+-- Stale guilds must be rebuilt with season_stats_rebuild() after the season start changes.
+-- Voice sessions are summed rather than merged, since the sessions of a member in one guild never overlap.
+-- Rebuilds and the maintenance triggers are serialised per guild with the advisory lock keyed below,
+-- rather than row locks on guild_config, so they never block guild configuration updates.
+CREATE FUNCTION season_stats_lock_key(_guildid BIGINT)
+  RETURNS BIGINT
+AS $$
+  SELECT hashtextextended('season_stats', _guildid);
+$$ LANGUAGE SQL IMMUTABLE;
+
+CREATE FUNCTION season_stats_compute(_guildid BIGINT)
+  RETURNS TABLE (
+    guildid BIGINT,
+    userid BIGINT,
+    voice_stats INTEGER,
+    xp_stats INTEGER,
+    message_stats INTEGER,
+    season_start TIMESTAMPTZ
+  )
+AS $$
+  WITH
+    season AS (
+      SELECT guild_config.season_start AS _start
+      FROM guild_config
+      WHERE guild_config.guildid = _guildid
+    ),
+    parts AS (
+      SELECT
+        v.userid,
+        GREATEST(
+          EXTRACT(EPOCH FROM (
+            (v.start_time + v.duration * interval '1 second') - GREATEST(v.start_time, season._start)
+          )),
+          0
+        )::INTEGER AS voice,
+        0 AS xp,
+        0 AS messages
+      FROM voice_sessions v, season
+      WHERE
+        v.guildid = _guildid
+        AND (season._start IS NULL OR (v.start_time + v.duration * interval '1 second') > season._start)
+      UNION ALL
+      SELECT e.userid, 0, e.amount, 0
+      FROM member_experience e, season
+      WHERE
+        e.guildid = _guildid
+        AND (season._start IS NULL OR e.earned_at >= season._start)
+      UNION ALL
+      SELECT t.userid, 0, 0, t.messages
+      FROM text_sessions t, season
+      WHERE
+        t.guildid = _guildid
+        AND (season._start IS NULL OR t.start_time >= season._start)
+    )
+  SELECT
+    _guildid,
+    parts.userid,
+    SUM(parts.voice)::INTEGER,
+    SUM(parts.xp)::INTEGER,
+    SUM(parts.messages)::INTEGER,
+    (SELECT _start FROM season)
+  FROM parts
+  GROUP BY parts.userid;
+$$ LANGUAGE SQL STABLE;
+
+CREATE FUNCTION season_stats_rebuild(_guildid BIGINT)
+  RETURNS INTEGER
+AS $$
+  DECLARE
+    _count INTEGER;
+  BEGIN
+    -- Conflicts with the shared lock taken by the maintenance triggers,
+    -- so sessions saved while we rebuild are applied after the rebuild completes.
+    PERFORM pg_advisory_xact_lock(season_stats_lock_key(_guildid));
+    DELETE FROM season_stats WHERE season_stats.guildid = _guildid;
+    INSERT INTO season_stats (guildid, userid, voice_stats, xp_stats, message_stats, season_start)
+      SELECT * FROM season_stats_compute(_guildid);
+    GET DIAGNOSTICS _count = ROW_COUNT;
+    RETURN _count;
+  END;
+$$ LANGUAGE PLPGSQL;
+
+CREATE FUNCTION season_stats_voice_trigger()
+  RETURNS TRIGGER
+AS $$
+  BEGIN
+    -- Wait for any rebuild of these guilds to complete
+    PERFORM pg_advisory_xact_lock_shared(season_stats_lock_key(g.guildid))
+    FROM (SELECT DISTINCT guildid FROM new_sessions ORDER BY guildid) g;
+    WITH
+      seasons AS (
+        SELECT guildid, season_start
+        FROM guild_config
+        WHERE guildid IN (SELECT guildid FROM new_sessions)
+      ),
+      totals AS (
+        SELECT
+          s.guildid, s.userid, seasons.season_start,
+          SUM(
+            GREATEST(
+              EXTRACT(EPOCH FROM (
+                (s.start_time + s.duration * interval '1 second') - GREATEST(s.start_time, seasons.season_start)
+              )),
+              0
+            )::INTEGER
+          ) AS total
+        FROM new_sessions s
+        JOIN seasons USING (guildid)
+        GROUP BY s.guildid, s.userid, seasons.season_start
+      )
+    INSERT INTO season_stats (guildid, userid, voice_stats, season_start)
+      SELECT guildid, userid, total, season_start FROM totals
+    ON CONFLICT (guildid, userid) DO UPDATE
+      SET
+        voice_stats = season_stats.voice_stats + EXCLUDED.voice_stats,
+        updated_at = now()
+      WHERE season_stats.season_start IS NOT DISTINCT FROM EXCLUDED.season_start;
+    RETURN NULL;
+  END;
+$$ LANGUAGE PLPGSQL;
+
+CREATE TRIGGER season_stats_voice_sessions AFTER INSERT ON voice_sessions
+  REFERENCING NEW TABLE AS new_sessions
+  FOR EACH STATEMENT EXECUTE PROCEDURE season_stats_voice_trigger();
+
+CREATE FUNCTION season_stats_text_trigger()
+  RETURNS TRIGGER
+AS $$
+  BEGIN
+    -- Wait for any rebuild of these guilds to complete
+    PERFORM pg_advisory_xact_lock_shared(season_stats_lock_key(g.guildid))
+    FROM (SELECT DISTINCT guildid FROM new_sessions ORDER BY guildid) g;
+    WITH
+      seasons AS (
+        SELECT guildid, season_start
+        FROM guild_config
+        WHERE guildid IN (SELECT guildid FROM new_sessions)
+      ),
+      totals AS (
+        SELECT s.guildid, s.userid, seasons.season_start, SUM(s.messages) AS total
+        FROM new_sessions s
+        JOIN seasons USING (guildid)
+        WHERE seasons.season_start IS NULL OR s.start_time >= seasons.season_start
+        GROUP BY s.guildid, s.userid, seasons.season_start
+      )
+    INSERT INTO season_stats (guildid, userid, message_stats, season_start)
+      SELECT guildid, userid, total, season_start FROM totals
+    ON CONFLICT (guildid, userid) DO UPDATE
+      SET
+        message_stats = season_stats.message_stats + EXCLUDED.message_stats,
+        updated_at = now()
+      WHERE season_stats.season_start IS NOT DISTINCT FROM EXCLUDED.season_start;
+    RETURN NULL;
+  END;
+$$ LANGUAGE PLPGSQL;
+
+CREATE TRIGGER season_stats_text_sessions AFTER INSERT ON text_sessions
+  REFERENCING NEW TABLE AS new_sessions
+  FOR EACH STATEMENT EXECUTE PROCEDURE season_stats_text_trigger();
+
+CREATE FUNCTION season_stats_xp_trigger()
+  RETURNS TRIGGER
+AS $$
+  BEGIN
+    -- Wait for any rebuild of these guilds to complete
+    PERFORM pg_advisory_xact_lock_shared(season_stats_lock_key(g.guildid))
+    FROM (SELECT DISTINCT guildid FROM new_exp ORDER BY guildid) g;
+    WITH
+      seasons AS (
+        SELECT guildid, season_start
+        FROM guild_config
+        WHERE guildid IN (SELECT guildid FROM new_exp)
+      ),
+      totals AS (
+        SELECT e.guildid, e.userid, seasons.season_start, SUM(e.amount) AS total
+        FROM new_exp e
+        JOIN seasons USING (guildid)
+        WHERE seasons.season_start IS NULL OR e.earned_at >= seasons.season_start
+        GROUP BY e.guildid, e.userid, seasons.season_start
+      )
+    INSERT INTO season_stats (guildid, userid, xp_stats, season_start)
+      SELECT guildid, userid, total, season_start FROM totals
+    ON CONFLICT (guildid, userid) DO UPDATE
+      SET
+        xp_stats = season_stats.xp_stats + EXCLUDED.xp_stats,
+        updated_at = now()
+      WHERE season_stats.season_start IS NOT DISTINCT FROM EXCLUDED.season_start;
+    RETURN NULL;
+  END;
+$$ LANGUAGE PLPGSQL;
+
+CREATE TRIGGER season_stats_member_experience AFTER INSERT ON member_experience
+  REFERENCING NEW TABLE AS new_exp
+  FOR EACH STATEMENT EXECUTE PROCEDURE season_stats_xp_trigger();
+
 -- }}}
 
 -- Rented Room data {{{
@@ -1242,6 +1660,221 @@ CREATE TABLE topgg_guild_whitelist(
 );
 -- }}}
 
+-- Achievement progress {{{
+-- Progress towards each member achievement, maintained by the bot as sessions close,
+-- tasks are completed, scheduled sessions are attended, and votes are received.
+-- Voice days are taken in the recorded timezone, and members are rebuilt on read when their timezone changes.
+CREATE TABLE member_achievement_progress(
+  guildid BIGINT NOT NULL,
+  userid BIGINT NOT NULL,
+  timezone TEXT NOT NULL,
+  workouts INTEGER NOT NULL DEFAULT 0,
+  voice_seconds BIGINT NOT NULL DEFAULT 0,
+  voice_days INTEGER NOT NULL DEFAULT 0,
+  last_voice_day DATE,
+  last_voice_start TIMESTAMPTZ,
+  current_streak INTEGER NOT NULL DEFAULT 0,
+  longest_streak INTEGER NOT NULL DEFAULT 0,
+  voice_month DATE,
+  month_seconds INTEGER NOT NULL DEFAULT 0,
+  best_month_seconds INTEGER NOT NULL DEFAULT 0,
+  votes INTEGER NOT NULL DEFAULT 0,
+  tasks_complete INTEGER NOT NULL DEFAULT 0,
+  scheduled_sessions INTEGER NOT NULL DEFAULT 0,
+  built_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (guildid, userid),
+  FOREIGN KEY (guildid, userid) REFERENCES members (guildid, userid) ON DELETE CASCADE
+);
+CREATE INDEX member_achievement_progress_users ON member_achievement_progress (userid);
+
+-- Achievement progress computed from history for the given member, or every member of the guild if _userid is NULL.
+-- Voice days are taken in the given timezone, or each member's timezone if _tz is NULL.
+CREATE FUNCTION member_achievement_progress_compute(_guildid BIGINT, _userid BIGINT, _tz TEXT)
+  RETURNS SETOF member_achievement_progress
+AS $$
+  WITH
+    targets AS (
+      SELECT m.guildid, m.userid, COALESCE(_tz, u.timezone, g.timezone, 'UTC') AS timezone
+      FROM members m
+      JOIN guild_config g ON g.guildid = m.guildid
+      LEFT JOIN user_config u ON u.userid = m.userid
+      WHERE m.guildid = _guildid AND (_userid IS NULL OR m.userid = _userid)
+    ),
+    days AS (
+      SELECT t.userid, p.day, SUM(p.seconds) AS seconds
+      FROM targets t
+      JOIN voice_sessions v ON v.guildid = t.guildid AND v.userid = t.userid
+      CROSS JOIN LATERAL activity_day_parts(v.start_time, v.start_time + v.duration * interval '1 second', t.timezone) p
+      GROUP BY t.userid, p.day
+    ),
+    islands AS (
+      -- Consecutive days share an island
+      SELECT
+        days.userid, days.day, days.seconds,
+        days.day - (row_number() OVER (PARTITION BY days.userid ORDER BY days.day))::INTEGER AS island
+      FROM days
+    ),
+    streaks AS (
+      SELECT islands.userid, COUNT(*) AS length, MAX(islands.day) AS last_day
+      FROM islands
+      GROUP BY islands.userid, islands.island
+    ),
+    months AS (
+      SELECT days.userid, date_trunc('month', days.day)::DATE AS month, SUM(days.seconds) AS seconds
+      FROM days
+      GROUP BY 1, 2
+    ),
+    voice AS (
+      SELECT days.userid, SUM(days.seconds) AS seconds, COUNT(*) AS days, MAX(days.day) AS last_day
+      FROM days
+      GROUP BY days.userid
+    ),
+    last_sessions AS (
+      SELECT t.userid, MAX(v.start_time) AS start_time
+      FROM targets t
+      JOIN voice_sessions v ON v.guildid = t.guildid AND v.userid = t.userid
+      GROUP BY t.userid
+    )
+  SELECT
+    t.guildid,
+    t.userid,
+    t.timezone,
+    (SELECT COUNT(*) FROM workout_sessions w WHERE w.guildid = t.guildid AND w.userid = t.userid)::INTEGER,
+    COALESCE(voice.seconds, 0)::BIGINT,
+    COALESCE(voice.days, 0)::INTEGER,
+    voice.last_day,
+    last_sessions.start_time,
+    COALESCE((SELECT s.length FROM streaks s WHERE s.userid = t.userid AND s.last_day = voice.last_day), 0)::INTEGER,
+    COALESCE((SELECT MAX(s.length) FROM streaks s WHERE s.userid = t.userid), 0)::INTEGER,
+    date_trunc('month', voice.last_day)::DATE,
+    COALESCE((
+      SELECT mo.seconds FROM months mo
+      WHERE mo.userid = t.userid AND mo.month = date_trunc('month', voice.last_day)::DATE
+    ), 0)::INTEGER,
+    COALESCE((SELECT MAX(mo.seconds) FROM months mo WHERE mo.userid = t.userid), 0)::INTEGER,
+    (SELECT COUNT(*) FROM topgg v WHERE v.userid = t.userid)::INTEGER,
+    (SELECT COUNT(*) FROM tasklist k WHERE k.userid = t.userid AND k.completed_at IS NOT NULL)::INTEGER,
+    (
+      SELECT COUNT(*) FROM schedule_session_members s
+      WHERE s.guildid = t.guildid AND s.userid = t.userid AND s.attended
+    )::INTEGER,
+    now(),
+    now()
+  FROM targets t
+  LEFT JOIN voice ON voice.userid = t.userid
+  LEFT JOIN last_sessions ON last_sessions.userid = t.userid;
+$$ LANGUAGE SQL STABLE;
+
+CREATE FUNCTION member_achievement_progress_rebuild(_guildid BIGINT, _userid BIGINT, _tz TEXT)
+  RETURNS INTEGER
+AS $$
+  DECLARE
+    _count INTEGER;
+  BEGIN
+    INSERT INTO member_achievement_progress
+      SELECT * FROM member_achievement_progress_compute(_guildid, _userid, _tz)
+    ON CONFLICT (guildid, userid) DO UPDATE
+      SET
+        timezone = EXCLUDED.timezone,
+        workouts = EXCLUDED.workouts,
+        voice_seconds = EXCLUDED.voice_seconds,
+        voice_days = EXCLUDED.voice_days,
+        last_voice_day = EXCLUDED.last_voice_day,
+        last_voice_start = EXCLUDED.last_voice_start,
+        current_streak = EXCLUDED.current_streak,
+        longest_streak = EXCLUDED.longest_streak,
+        voice_month = EXCLUDED.voice_month,
+        month_seconds = EXCLUDED.month_seconds,
+        best_month_seconds = EXCLUDED.best_month_seconds,
+        votes = EXCLUDED.votes,
+        tasks_complete = EXCLUDED.tasks_complete,
+        scheduled_sessions = EXCLUDED.scheduled_sessions,
+        built_at = EXCLUDED.built_at,
+        updated_at = EXCLUDED.updated_at;
+    GET DIAGNOSTICS _count = ROW_COUNT;
+    RETURN _count;
+  END;
+$$ LANGUAGE PLPGSQL;
+
+-- Achievement progress of the given member, rebuilt first if it was built in a different timezone
+CREATE FUNCTION member_achievement_progress_fetch(_guildid BIGINT, _userid BIGINT, _tz TEXT)
+  RETURNS SETOF member_achievement_progress
+AS $$
+  BEGIN
+    IF NOT EXISTS (
+      SELECT 1 FROM member_achievement_progress p
+      WHERE p.guildid = _guildid AND p.userid = _userid AND p.timezone = _tz
+    ) THEN
+      PERFORM member_achievement_progress_rebuild(_guildid, _userid, _tz);
+    END IF;
+    RETURN QUERY
+      SELECT * FROM member_achievement_progress p
+      WHERE p.guildid = _guildid AND p.userid = _userid;
+  END;
+$$ LANGUAGE PLPGSQL;
+
+-- Add a completed voice session to the progress of the given member, if they have progress
+-- Sessions of a member do not overlap, so sessions starting by last_voice_start were already counted by a rebuild
+CREATE FUNCTION member_achievement_progress_voice(_guildid BIGINT, _userid BIGINT, _start TIMESTAMPTZ, _end TIMESTAMPTZ)
+  RETURNS VOID
+AS $$
+  DECLARE
+    _progress member_achievement_progress%ROWTYPE;
+    _part RECORD;
+    _month DATE;
+  BEGIN
+    SELECT * INTO _progress
+    FROM member_achievement_progress p
+    WHERE p.guildid = _guildid AND p.userid = _userid
+    FOR UPDATE;
+    IF NOT FOUND OR _start <= _progress.last_voice_start THEN
+      RETURN;
+    END IF;
+    _progress.last_voice_start := _start;
+
+    FOR _part IN
+      SELECT parts.day, parts.seconds FROM activity_day_parts(_start, _end, _progress.timezone) parts ORDER BY parts.day
+    LOOP
+      _progress.voice_seconds := _progress.voice_seconds + _part.seconds;
+      -- Days before the last voice day were already counted
+      IF _progress.last_voice_day IS NULL OR _part.day > _progress.last_voice_day THEN
+        IF _part.day = _progress.last_voice_day + 1 THEN
+          _progress.current_streak := _progress.current_streak + 1;
+        ELSE
+          _progress.current_streak := 1;
+        END IF;
+        _progress.voice_days := _progress.voice_days + 1;
+        _progress.longest_streak := GREATEST(_progress.longest_streak, _progress.current_streak);
+        _progress.last_voice_day := _part.day;
+      END IF;
+      _month := date_trunc('month', _part.day)::DATE;
+      IF _month = _progress.voice_month THEN
+        _progress.month_seconds := _progress.month_seconds + _part.seconds;
+      ELSIF _progress.voice_month IS NULL OR _month > _progress.voice_month THEN
+        _progress.voice_month := _month;
+        _progress.month_seconds := _part.seconds;
+      END IF;
+      _progress.best_month_seconds := GREATEST(_progress.best_month_seconds, _progress.month_seconds);
+    END LOOP;
+
+    UPDATE member_achievement_progress p
+    SET
+      voice_seconds = _progress.voice_seconds,
+      voice_days = _progress.voice_days,
+      last_voice_day = _progress.last_voice_day,
+      last_voice_start = _progress.last_voice_start,
+      current_streak = _progress.current_streak,
+      longest_streak = _progress.longest_streak,
+      voice_month = _progress.voice_month,
+      month_seconds = _progress.month_seconds,
+      best_month_seconds = _progress.best_month_seconds,
+      updated_at = now()
+    WHERE p.guildid = _guildid AND p.userid = _userid;
+  END;
+$$ LANGUAGE PLPGSQL;
+-- }}}
+
 -- Sponsor Data {{{
 CREATE TABLE sponsor_guild_whitelist(
   appid TEXT,
@@ -1416,8 +2049,11 @@ CREATE TABLE analytics.voice_sessions(
 
 CREATE TABLE analytics.gui_renders(
   cardname TEXT NOT NULL,
-  duration INTEGER NOT NULL
+  duration INTEGER NOT NULL,
+  skin TEXT,
+  data_duration INTEGER
 ) INHERITS (analytics.events);
+CREATE INDEX gui_renders_created_at ON analytics.gui_renders (created_at);
 -- }}}
 
 -- vim: set fdm=marker:
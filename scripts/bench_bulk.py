@@ -0,0 +1,134 @@
+# !/bin/python3
+"""
+Benchmark for bulk row ingestion.
+
+Inserts batches of synthetic rows into a scratch table, and applies batches of member coin updates,
+either as a single `VALUES` list statement (the legacy behaviour), or through a binary COPY staging table.
+Reports the time taken for each batch size.
+All writes are made in transactions which are rolled back, so the database is left unchanged.
+
+Run from the repository root with the bot configuration in place, as with `scripts/start_leo.py`,
+against a scratch database, e.g. a local PostgreSQL.
+Usage: python scripts/bench_bulk.py [--sizes 100,1000,10000] [--repeats N] [--mode values|copy|both]
+"""
+import sys
+import os
+import argparse
+import asyncio
+import datetime as dt
+import random
+import statistics
+import time
+
+sys.path.insert(0, os.path.join(os.getcwd()))
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+parser = argparse.ArgumentParser(description="Bulk ingestion benchmark.")
+parser.add_argument('--sizes', type=str, default='100,1000,10000')
+parser.add_argument('--repeats', type=int, default=5)
+parser.add_argument('--mode', choices=('values', 'copy', 'both'), default='both')
+args, remaining = parser.parse_known_args()
+# Leave any remaining arguments for the bot argument parser
+sys.argv = [sys.argv[0], *remaining]
+
+from psycopg import sql  # noqa
+
+from meta import conf  # noqa
+from data import Database, Table  # noqa
+from data.queries import Insert  # noqa
+from utils.data import TemporaryTable  # noqa
+
+
+class Rollback(Exception):
+    pass
+
+
+def make_rows(count: int, seed=0):
+    rng = random.Random(seed)
+    now = dt.datetime.now(tz=dt.timezone.utc)
+    return [
+        (
+            rng.randrange(10**17, 10**18), rng.randrange(10**17, 10**18),
+            now - dt.timedelta(seconds=rng.randrange(86400)), rng.randrange(3600),
+            rng.randrange(100), rng.randrange(1000), rng.randrange(10),
+        )
+        for _ in range(count)
+    ]
+
+
+async def bench_insert(db: Database, table: Table, rows, copy: bool) -> float:
+    Insert.copy_threshold = 1 if copy else None
+    async with db.connection() as conn:
+        start = time.perf_counter()
+        try:
+            async with conn.transaction():
+                await table.insert_many(
+                    ('guildid', 'userid', 'start_time', 'duration', 'messages', 'words', 'periods'),
+                    *rows
+                ).with_connection(conn)
+                duration = time.perf_counter() - start
+                raise Rollback
+        except Rollback:
+            pass
+    return duration
+
+
+async def bench_update(db: Database, rows, copy: bool) -> float:
+    TemporaryTable.copy_threshold = 1 if copy else 10**9
+    tmp = TemporaryTable('_guildid', '_userid', '_amount', types=('BIGINT', 'BIGINT', 'INTEGER'), copy=True)
+    tmp.set_values(*((guildid, userid, duration) for guildid, userid, _, duration, *_ in rows))
+    async with db.connection() as conn:
+        start = time.perf_counter()
+        try:
+            async with conn.transaction():
+                async with conn.cursor() as cursor:
+                    await tmp.stage(cursor)
+                    expr, values = tmp.as_tuple()
+                    await cursor.execute(
+                        sql.SQL(
+                            "UPDATE bench_bulk SET duration = bench_bulk.duration + _t._amount "
+                            "FROM {} WHERE bench_bulk.guildid = _t._guildid AND bench_bulk.userid = _t._userid"
+                        ).format(expr),
+                        tuple(values)
+                    )
+                duration = time.perf_counter() - start
+                raise Rollback
+        except Rollback:
+            pass
+    return duration
+
+
+async def main():
+    db = Database(conf.data['args'])
+    table = Table('bench_bulk').bind(db)
+    sizes = [int(size) for size in args.sizes.split(',')]
+    modes = ('values', 'copy') if args.mode == 'both' else (args.mode,)
+
+    async with db.open():
+        async with db.connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(
+                    "CREATE TABLE IF NOT EXISTS bench_bulk("
+                    "guildid BIGINT, userid BIGINT, start_time TIMESTAMPTZ, duration INTEGER, "
+                    "messages INTEGER, words INTEGER, periods INTEGER)"
+                )
+        try:
+            for size in sizes:
+                rows = make_rows(size)
+                for mode in modes:
+                    copy = (mode == 'copy')
+                    inserts = [await bench_insert(db, table, rows, copy) for _ in range(args.repeats)]
+                    updates = [await bench_update(db, rows, copy) for _ in range(args.repeats)]
+                    print(
+                        f"{size:>6} rows {mode:>6}: "
+                        f"insert {statistics.median(inserts) * 1000:.1f}ms, "
+                        f"update {statistics.median(updates) * 1000:.1f}ms"
+                    )
+        finally:
+            async with db.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute("DROP TABLE bench_bulk")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,128 @@
+# !/bin/python3
+"""
+Benchmark for shard analytics event delivery.
+
+Sends synthetic voice events to a loopback ShardTalk peer, either with one request per event
+(the legacy behaviour), or buffered by an `EventEmitter` and sent in batches.
+Reports the number of events per second delivered to and decoded by the peer.
+
+Run from the repository root.
+Usage: python scripts/bench_emitter.py [--events N] [--batch N] [--mode single|batched|both]
+"""
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+sys.path.insert(0, os.path.join(os.getcwd()))
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+parser = argparse.ArgumentParser(description="Analytics event emitter benchmark.")
+parser.add_argument('--events', type=int, default=100000)
+parser.add_argument('--batch', type=int, default=100)
+parser.add_argument('--mode', choices=('single', 'batched', 'both'), default='both')
+args, remaining = parser.parse_known_args()
+# Leave any remaining arguments for the bot argument parser
+sys.argv = [sys.argv[0], *remaining]
+
+from meta.ipc import AppRoute, AppPayload, StructCodec  # noqa
+from meta.ipc.connection import MAGIC, FrameKind, PeerConnections, accept_handshake, read_frame, write_frame  # noqa
+from analytics.data import VoiceAction  # noqa
+from analytics.emitter import EventEmitter  # noqa
+from analytics.events import VoiceEvent, voice_event_handler  # noqa
+from utils.lib import utc_now  # noqa
+
+
+SECRET = b'bench'
+
+
+class LoopbackPeer:
+    """
+    Minimal multiplexed ShardTalk peer, decoding and counting the received events.
+    """
+    def __init__(self, routes: dict[str, AppRoute]):
+        self.routes = routes
+        self.received = 0
+        self.done = asyncio.Event()
+        self.target = 0
+
+    async def serve(self, reader, writer):
+        await reader.readexactly(len(MAGIC))
+        if not await accept_handshake(reader, writer, SECRET):
+            writer.close()
+            return
+        try:
+            while True:
+                rqid, kind, codecid, body = await read_frame(reader)
+                name, data = AppPayload.unframe(body)
+                (events,), _ = self.routes[name].codec.decode_args(data)
+                self.received += len(events) if isinstance(events, list) else 1
+                if kind is FrameKind.REQUEST:
+                    write_frame(writer, rqid, FrameKind.REPLY, codecid, b'')
+                if self.received >= self.target:
+                    self.done.set()
+        except asyncio.IncompleteReadError:
+            pass
+
+
+class LoopbackClient:
+    """
+    Sending side of a ShardTalk client, with the loopback peer as its only peer.
+    """
+    def __init__(self, address):
+        self.peers = {'analytics': address}
+        self.connections = PeerConnections(SECRET)
+
+    async def request(self, appid, payload, wait_for_reply=True, **kwargs):
+        return await self.connections.send(appid, self.peers[appid], payload, wait_for_reply=wait_for_reply)
+
+
+def make_events(count: int):
+    now = utc_now()
+    return [
+        VoiceEvent('bench', i % 1000, i, VoiceAction.JOINED if i % 2 else VoiceAction.LEFT, now)
+        for i in range(count)
+    ]
+
+
+async def main():
+    single_route = AppRoute(None, name='voice_event_single', codec=StructCodec(VoiceEvent))
+    batch_route = AppRoute(voice_event_handler.handle_event, name='voice_event', codec=voice_event_handler.route.codec)
+    peer = LoopbackPeer({route.name: route for route in (single_route, batch_route)})
+    server = await asyncio.start_server(peer.serve, host='127.0.0.1', port=0)
+    address = {'host': '127.0.0.1', 'port': server.sockets[0].getsockname()[1]}
+
+    client = LoopbackClient(address)
+    single_route._client = client
+    batch_route._client = client
+
+    events = make_events(args.events)
+    modes = ('single', 'batched') if args.mode == 'both' else (args.mode,)
+    for mode in modes:
+        peer.received = 0
+        peer.target = len(events)
+        peer.done.clear()
+        start = time.perf_counter()
+        if mode == 'single':
+            for event in events:
+                await single_route(event).send('analytics', wait_for_reply=False)
+        else:
+            emitter = EventEmitter('analytics', batch_size=args.batch, capacity=len(events))
+            emitter.register(batch_route)
+            emitter.start()
+            for i, event in enumerate(events):
+                emitter.emit(batch_route, event)
+                if i % args.batch == 0:
+                    # Let the flusher run, as the event listeners would between events
+                    await asyncio.sleep(0)
+            await emitter.close()
+        await peer.done.wait()
+        duration = time.perf_counter() - start
+        print(f"{mode:>8}: {len(events)} events in {duration:.2f}s, {len(events) / duration:.0f} events/s")
+
+    server.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
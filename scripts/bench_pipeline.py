@@ -0,0 +1,90 @@
+# !/bin/python3
+"""
+Benchmark for pipelined card data queries.
+
+Fetches the database data for the profile and stats cards of a member,
+either awaiting each query in turn (the legacy behaviour), or queueing them in a single `Connector.pipeline`.
+Reports the mean, median, and 99th percentile latency of each data gathering pass.
+
+Run from the repository root with the bot configuration in place, as with `scripts/start_leo.py`,
+against a database containing the given member, e.g. a local PostgreSQL.
+Usage: python scripts/bench_pipeline.py --guildid N --userid N [--iterations N] [--mode sequential|pipeline|both]
+"""
+import sys
+import os
+import argparse
+import asyncio
+import statistics
+import time
+
+sys.path.insert(0, os.path.join(os.getcwd()))
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+parser = argparse.ArgumentParser(description="Pipelined card data benchmark.")
+parser.add_argument('--guildid', type=int, required=True)
+parser.add_argument('--userid', type=int, required=True)
+parser.add_argument('--timezone', type=str, default='UTC')
+parser.add_argument('--iterations', type=int, default=200)
+parser.add_argument('--mode', choices=('sequential', 'pipeline', 'both'), default='both')
+args, remaining = parser.parse_known_args()
+# Leave any remaining arguments for the bot argument parser
+sys.argv = [sys.argv[0], *remaining]
+
+from meta import conf  # noqa
+from data import Database  # noqa
+from modules.statistics.data import StatsData  # noqa
+from utils.lib import utc_now  # noqa
+
+
+async def sequential(data: StatsData, guildid: int, userid: int, timezone: str, today):
+    await data.MemberDailyActivity.fetch_activity(guildid, userid, timezone, today)
+    await data.AchievementProgress.fetch_progress(guildid, userid, timezone)
+    await data.ProfileTag.fetch_tags(guildid, userid)
+    await data.UserExp.xp_since(userid, utc_now())
+
+
+async def pipelined(db: Database, data: StatsData, guildid: int, userid: int, timezone: str, today):
+    async with db.pipeline() as pipe:
+        futures = [
+            pipe.add(data.MemberDailyActivity.activity_query(guildid, userid, timezone, today)),
+            pipe.add(data.AchievementProgress.progress_query(guildid, userid, timezone)),
+            pipe.add(data.ProfileTag.tags_query(guildid, userid)),
+            pipe.add(data.UserExp.xp_since_query(userid, utc_now())),
+        ]
+    await asyncio.gather(*futures)
+
+
+def report(name: str, times: list[float]):
+    times = sorted(times)
+    print(
+        f"{name:>10}: mean {statistics.mean(times) * 1000:.2f}ms, "
+        f"p50 {times[len(times) // 2] * 1000:.2f}ms, "
+        f"p99 {times[int(len(times) * 0.99)] * 1000:.2f}ms"
+    )
+
+
+async def main():
+    db = Database(conf.data['args'])
+    data = db.load_registry(StatsData())
+    today = utc_now().date()
+
+    async with db.open():
+        runners = {
+            'sequential': lambda: sequential(data, args.guildid, args.userid, args.timezone, today),
+            'pipeline': lambda: pipelined(db, data, args.guildid, args.userid, args.timezone, today),
+        }
+        modes = runners.keys() if args.mode == 'both' else (args.mode,)
+        for mode in modes:
+            # Warm up the connection pool and the server plan caches
+            for _ in range(10):
+                await runners[mode]()
+            times = []
+            for _ in range(args.iterations):
+                start = time.perf_counter()
+                await runners[mode]()
+                times.append(time.perf_counter() - start)
+            report(mode, times)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
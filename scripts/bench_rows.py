@@ -0,0 +1,100 @@
+# !/bin/python3
+"""
+Benchmark for RowModel row storage.
+
+Loads the given number of synthetic member rows into the row cache of a members model,
+with row data stored either as dict rows (the default), or as compact tuple rows (`_compact_`).
+Reports the memory retained by the cached rows, the peak memory while loading, and the load time.
+The rows are written to a scratch `bench_members` table, which is dropped afterwards.
+
+Run from the repository root with the bot configuration in place, as with `scripts/start_leo.py`,
+against a scratch database, e.g. a local PostgreSQL.
+Usage: python scripts/bench_rows.py [--rows N] [--mode dict|compact|both]
+"""
+import sys
+import os
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.getcwd()))
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+parser = argparse.ArgumentParser(description="Row storage memory benchmark.")
+parser.add_argument('--rows', type=int, default=100000)
+parser.add_argument('--mode', choices=('dict', 'compact', 'both'), default='both')
+args, remaining = parser.parse_known_args()
+# Leave any remaining arguments for the bot argument parser
+sys.argv = [sys.argv[0], *remaining]
+
+from meta import conf  # noqa
+from data import Database, RowModel  # noqa
+from core.data import CoreData  # noqa
+
+
+def make_model(compact: bool):
+    """
+    Create a members model on the scratch table, with the columns of `CoreData.Member`.
+    """
+    namespace = {
+        '_tablename_': 'bench_members',
+        '_cache_': {},
+        '_compact_': compact,
+    }
+    for name, column in CoreData.Member._columns_.items():
+        namespace[name] = type(column)(primary=column.primary)
+    return type('CompactMember' if compact else 'DictMember', (RowModel,), namespace)
+
+
+async def bench(db: Database, compact: bool):
+    model = make_model(compact).bind(db)
+
+    gc.collect()
+    tracemalloc.start()
+    start_memory, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    async for _ in model.stream_where(batch=10000, cache=True):
+        pass
+    duration = time.perf_counter() - start
+    gc.collect()
+    memory, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    count = len(model._cache_)
+    retained = memory - start_memory
+    print(
+        f"{'compact' if compact else 'dict':>8}: {count} rows, "
+        f"retained {retained / 2**20:.1f}MiB ({retained / max(count, 1):.0f}B/row), "
+        f"peak {(peak - start_memory) / 2**20:.1f}MiB, "
+        f"load {duration * 1000:.0f}ms"
+    )
+    model._cache_.clear()
+
+
+async def main():
+    db = Database(conf.data['args'])
+    modes = (False, True) if args.mode == 'both' else (args.mode == 'compact',)
+
+    async with db.open():
+        async with db.connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute("CREATE TABLE bench_members (LIKE members INCLUDING DEFAULTS)")
+                await cursor.execute(
+                    "INSERT INTO bench_members (guildid, userid, tracked_time, coins, display_name) "
+                    "SELECT i / 1000, i, i % 3600, i % 1000, 'member ' || i FROM generate_series(1, %s) i",
+                    (args.rows,)
+                )
+                await cursor.execute("ALTER TABLE bench_members ADD PRIMARY KEY (guildid, userid)")
+        try:
+            for compact in modes:
+                await bench(db, compact)
+        finally:
+            async with db.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute("DROP TABLE bench_members")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,134 @@
+# !/bin/python3
+"""
+Loopback benchmark for ShardTalk requests.
+
+Starts a ShardTalk peer server on the loopback interface and sends it requests from a second client,
+either with a new connection per message (the legacy behaviour), or over a persistent multiplexed connection.
+Reports the sequential round-trip latency, and the throughput of concurrent requests and replyless messages.
+Also compares the encoded size and encoding time of analytics events with the pickle and struct codecs.
+
+Run from the repository root with the bot configuration in place, as with `scripts/start_leo.py`.
+Usage: python scripts/bench_shardtalk.py [--requests N] [--concurrency N] [--port N] [--mode single|multiplex|both]
+"""
+import sys
+import os
+import argparse
+import asyncio
+import statistics
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.getcwd()))
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+parser = argparse.ArgumentParser(description="ShardTalk loopback benchmark.")
+parser.add_argument('--requests', type=int, default=5000)
+parser.add_argument('--concurrency', type=int, default=50)
+parser.add_argument('--port', type=int, default=5199)
+parser.add_argument('--mode', choices=('single', 'multiplex', 'both'), default='both')
+args, remaining = parser.parse_known_args()
+# Leave any remaining arguments for the bot argument parser
+sys.argv = [sys.argv[0], *remaining]
+
+import meta  # noqa
+from meta.ipc import AppClient, PickleCodec, StructCodec  # noqa
+from analytics.events import CommandEvent, VoiceEvent, CommandStatus, VoiceAction  # noqa
+from utils.lib import utc_now  # noqa
+
+
+received = 0
+
+
+async def bench_echo(value):
+    global received
+    received += 1
+    return value
+
+
+async def run(mode: str, port: int):
+    global received
+    address = {'host': '127.0.0.1', 'port': port}
+    legacy = mode != 'multiplex'
+    server = AppClient('bench_server', 'bench', address, {}, secret='bench', legacy=legacy)
+    client = AppClient('bench_client', 'bench', {'host': '127.0.0.1', 'port': port + 1}, {}, secret='bench',
+                       multiplex=not legacy, legacy=legacy)
+    route = client.register_route('bench_echo')(bench_echo)
+    client.peers['bench_server'] = address
+
+    listener = await asyncio.start_server(server.handle_request, **address)
+    payload = ('lion' * 64,)
+
+    # Sequential round trips
+    latencies = []
+    for _ in range(min(args.requests, 2000)):
+        start = time.perf_counter()
+        await route(*payload).send('bench_server')
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def limited(wait_for_reply):
+        async with semaphore:
+            return await route(*payload).send('bench_server', wait_for_reply=wait_for_reply)
+
+    # Concurrent round trips
+    start = time.perf_counter()
+    results = await asyncio.gather(*(limited(True) for _ in range(args.requests)))
+    concurrent = args.requests / (time.perf_counter() - start)
+    failed = sum(result != payload[0] for result in results)
+
+    # Replyless messages, timed until the server has received them all
+    received = 0
+    start = time.perf_counter()
+    await asyncio.gather(*(limited(False) for _ in range(args.requests)))
+    while received < args.requests:
+        await asyncio.sleep(0.001)
+    notify = args.requests / (time.perf_counter() - start)
+
+    print(
+        f"{mode:>9}:"
+        f" latency mean {statistics.mean(latencies) * 1000:.3f}ms"
+        f" p50 {latencies[len(latencies) // 2] * 1000:.3f}ms"
+        f" p99 {latencies[int(len(latencies) * 0.99)] * 1000:.3f}ms"
+        f" | {concurrent:9.0f} requests/sec"
+        f" | {notify:9.0f} messages/sec"
+        f" | {failed} failed | {client.connections!r}"
+    )
+
+    client.connections.close()
+    # Let the server see the connection close before shutting down
+    await asyncio.sleep(0.1)
+    listener.close()
+    await listener.wait_closed()
+
+
+def bench_codecs(number=20000):
+    events = [
+        CommandEvent(
+            appname='StudyLion_00', cmdname='stats', userid=10**17, created_at=utc_now(),
+            status=CommandStatus.COMPLETED, execution_time=0.25, cogname='StatsCog', guildid=10**17, ctxid=10**17
+        ),
+        VoiceEvent(appname='StudyLion_00', guildid=10**17, userid=10**17, action=VoiceAction.JOINED, created_at=utc_now()),
+    ]
+    print("Codec comparison, bytes per event and microseconds per encode and decode:")
+    for event in events:
+        for codec in (PickleCodec(), StructCodec(type(event))):
+            encoded = codec.encode_args((event,), {})
+            elapsed = timeit.timeit(lambda: codec.decode_args(codec.encode_args((event,), {})), number=number)
+            print(
+                f"{type(event).__name__:>14} {type(codec).__name__:>12}:"
+                f" {len(encoded):4} bytes | {elapsed / number * 10**6:6.2f}us"
+            )
+
+
+def main():
+    bench_codecs()
+    print(f"Sending {args.requests} requests with concurrency {args.concurrency}.")
+    modes = ('single', 'multiplex') if args.mode == 'both' else (args.mode,)
+    for i, mode in enumerate(modes):
+        asyncio.run(run(mode, args.port + 2 * i))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+# !/bin/python3
+"""
+Benchmark for `TaskMonitor` scheduling.
+
+Compares the legacy sorted-list task monitor against the heap-based `TaskMonitor`
+with a large number of scheduled reminders, timing the initial bulk load,
+single task scheduling and rescheduling, cancellation, and popping due tasks.
+Per-operation times are reported in microseconds.
+
+Run from the repository root with the bot configuration in place, as with `scripts/start_leo.py`.
+Usage: python scripts/bench_task_monitor.py [--sizes 10000,100000,1000000] [--ops N] [--mode legacy|heap|both]
+"""
+import sys
+import os
+import gc
+import bisect
+import argparse
+import random
+import time
+
+sys.path.insert(0, os.path.join(os.getcwd()))
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+parser = argparse.ArgumentParser(description="Task monitor scheduling benchmark.")
+parser.add_argument('--sizes', type=str, default='10000,100000,1000000')
+parser.add_argument('--ops', type=int, default=1000)
+parser.add_argument('--mode', choices=('legacy', 'heap', 'both'), default='both')
+args, remaining = parser.parse_known_args()
+# Leave any remaining arguments for the bot argument parser
+sys.argv = [sys.argv[0], *remaining]
+
+import meta  # noqa
+from utils.monitor import TaskMonitor  # noqa
+
+
+class LegacyTaskMonitor(TaskMonitor):
+    """
+    Scheduling operations of the previous `TaskMonitor`,
+    which kept taskids in a reverse sorted list with the next task at the end.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._tasklist = []
+        self._taskmap = {}
+
+    def set_tasks(self, *tasks):
+        self._taskmap = dict(tasks)
+        self._tasklist = list(sorted(self._taskmap.keys(), key=lambda tid: -1 * self._taskmap[tid]))
+        self._wakeup.set()
+
+    def schedule_tasks(self, *tasks):
+        self._taskmap |= dict(tasks)
+        self._tasklist = list(sorted(self._taskmap.keys(), key=lambda tid: -1 * self._taskmap[tid]))
+        self._wakeup.set()
+
+    def schedule_task(self, taskid, timestamp):
+        if self._tasklist:
+            nextid = self._tasklist[-1]
+            wake = self._taskmap[nextid] >= timestamp
+            wake = wake or taskid == nextid
+        else:
+            wake = True
+        if taskid in self._taskmap:
+            self._tasklist.remove(taskid)
+        self._taskmap[taskid] = timestamp
+        bisect.insort_left(self._tasklist, taskid, key=lambda t: -1 * self._taskmap[t])
+        if wake:
+            self._wakeup.set()
+
+    def cancel_tasks(self, *taskids):
+        if self._tasklist:
+            nextid = self._tasklist[-1]
+            wake = (nextid in taskids)
+        else:
+            wake = False
+        for tid in taskids:
+            self._taskmap.pop(tid, None)
+        self._tasklist = [tid for tid in self._tasklist if tid not in taskids]
+        if wake:
+            self._wakeup.set()
+
+    def pop_due(self, now):
+        due = []
+        while self._tasklist and self._taskmap[self._tasklist[-1]] <= now:
+            taskid = self._tasklist.pop()
+            self._taskmap.pop(taskid, None)
+            due.append(taskid)
+        return due
+
+
+def timed(func, count=1):
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) / count * 10**6
+
+
+def bench(cls, size: int, ops: int, seed=0):
+    rng = random.Random(seed)
+    now = 1_700_000_000
+    tasks = [(taskid, now + rng.randrange(1, 365 * 24 * 3600)) for taskid in range(size)]
+    targets = [rng.randrange(size) for _ in range(ops)]
+    times = [now + rng.randrange(1, 365 * 24 * 3600) for _ in range(ops)]
+
+    gc.collect()
+    monitor = cls()
+    results = {}
+
+    results['load'] = timed(lambda: monitor.schedule_tasks(*tasks), size)
+
+    def schedule():
+        for taskid, timestamp in zip(range(size, size + ops), times):
+            monitor.schedule_task(taskid, timestamp)
+    results['schedule'] = timed(schedule, ops)
+
+    def reschedule():
+        for taskid, timestamp in zip(targets, times):
+            monitor.schedule_task(taskid, timestamp)
+    results['reschedule'] = timed(reschedule, ops)
+
+    def cancel():
+        for taskid in targets:
+            monitor.cancel_tasks(taskid)
+    results['cancel'] = timed(cancel, ops)
+
+    # Pop roughly `ops` due tasks in a single batch
+    cutoff = now + (365 * 24 * 3600) * ops // size
+    popped = []
+    results['pop'] = timed(lambda: popped.extend(monitor.pop_due(cutoff)), max(ops, 1))
+    return results, len(popped)
+
+
+def main():
+    sizes = [int(size) for size in args.sizes.split(',')]
+    modes = {'legacy': LegacyTaskMonitor, 'heap': TaskMonitor}
+    if args.mode != 'both':
+        modes = {args.mode: modes[args.mode]}
+
+    print(f"Per-operation times in microseconds, {args.ops} operations per size.")
+    print(f"{'mode':>8} {'tasks':>9} {'load':>9} {'schedule':>10} {'reschedule':>11} {'cancel':>10} {'pop':>9}")
+    for size in sizes:
+        for name, cls in modes.items():
+            results, popped = bench(cls, size, args.ops)
+            print(
+                f"{name:>8} {size:>9}"
+                f" {results['load']:>9.2f}"
+                f" {results['schedule']:>10.2f}"
+                f" {results['reschedule']:>11.2f}"
+                f" {results['cancel']:>10.2f}"
+                f" {results['pop']:>9.2f}"
+                f"  ({popped} popped)"
+            )
+
+
+if __name__ == '__main__':
+    main()
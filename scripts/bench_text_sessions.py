@@ -0,0 +1,161 @@
+# !/bin/python3
+"""
+Benchmark for text session expiry scheduling.
+
+Replays a synthetic message stream through `TextSession`s,
+scheduling session expiry either with one asyncio task per session (the legacy scheduler),
+or with the `ExpiryWheel` used by the `TextTrackerCog`.
+Reports the processed messages per second, the number of live scheduler objects, and the process RSS.
+
+Run from the repository root with the bot configuration in place, as with `scripts/start_leo.py`.
+Usage: python scripts/bench_text_sessions.py [--members N] [--messages N] [--guilds N] [--mode tasks|wheel|both]
+"""
+import sys
+import os
+import gc
+import argparse
+import asyncio
+import random
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.getcwd()))
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+parser = argparse.ArgumentParser(description="Text session expiry scheduling benchmark.")
+parser.add_argument('--guilds', type=int, default=100)
+parser.add_argument('--members', type=int, default=20000)
+parser.add_argument('--messages', type=int, default=200000)
+parser.add_argument('--mode', choices=('tasks', 'wheel', 'both'), default='both')
+args, remaining = parser.parse_known_args()
+# Leave any remaining arguments for the bot argument parser
+sys.argv = [sys.argv[0], *remaining]
+
+import meta  # noqa
+from tracking.text.session import TextSession  # noqa
+from tracking.text.wheel import ExpiryWheel  # noqa
+from utils.lib import utc_now  # noqa
+
+
+def rss_mb() -> float:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 / 1024
+    except ImportError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_stream(guilds: int, members: int, messages: int, seed=0):
+    rng = random.Random(seed)
+    words = ["study", "lion", "focus", "notes", "exam", "hello", "pomodoro", "break"]
+    authors = [
+        (SimpleNamespace(id=rng.randrange(10**17, 10**18)), SimpleNamespace(id=10**17 + rng.randrange(guilds)))
+        for _ in range(members)
+    ]
+    stream = []
+    for _ in range(messages):
+        author, guild = rng.choice(authors)
+        content = ' '.join(rng.choices(words, k=rng.randint(1, 20)))
+        stream.append((author, guild, content))
+    return stream
+
+
+class TaskScheduler:
+    """
+    Legacy expiry scheduling, one sleeping task per session, recreated on every message.
+    """
+    def __init__(self, expire):
+        self.expire = expire
+        self.tasks = {}
+
+    async def _timeout(self, session, diff):
+        if diff > 0:
+            await asyncio.sleep(diff)
+        self.expire(session)
+
+    def schedule(self, session):
+        if (task := self.tasks.get(session, None)) is not None and not task.cancelled():
+            task.cancel()
+        dist = (session.expires_at - utc_now()).total_seconds()
+        self.tasks[session] = asyncio.create_task(self._timeout(session, dist))
+
+    def objects(self):
+        return len(asyncio.all_tasks())
+
+
+class WheelScheduler:
+    def __init__(self, expire, resolution=1.0):
+        self.expire = expire
+        self.wheel = ExpiryWheel(resolution)
+
+    def schedule(self, session):
+        self.wheel.schedule(session, session.expires_at.timestamp())
+
+    def sweep(self):
+        for session in self.wheel.pop_due(utc_now().timestamp()):
+            self.expire(session)
+
+    def objects(self):
+        return len(asyncio.all_tasks()) + len(self.wheel._buckets)
+
+
+async def run(mode: str, stream, chunk=1000):
+    ongoing = defaultdict(dict)
+    completed = []
+
+    def expire(session):
+        if session.close():
+            ongoing[session.guildid].pop(session.userid, None)
+            completed.append(session)
+
+    scheduler = TaskScheduler(expire) if mode == 'tasks' else WheelScheduler(expire)
+
+    gc.collect()
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    peak_objects = 0
+    for i in range(0, len(stream), chunk):
+        now = utc_now()
+        for author, guild, content in stream[i:i+chunk]:
+            message = SimpleNamespace(author=author, guild=guild, created_at=now, content=content)
+            guild_sessions = ongoing[guild.id]
+            if (session := guild_sessions.get(author.id, None)) is None:
+                session = guild_sessions[author.id] = TextSession.from_message(message)
+            session.process(message)
+            scheduler.schedule(session)
+        if mode == 'wheel':
+            scheduler.sweep()
+        # Let the event loop run scheduled callbacks, as it would between gateway events
+        await asyncio.sleep(0)
+        peak_objects = max(peak_objects, scheduler.objects())
+    elapsed = time.perf_counter() - start
+    rss_after = rss_mb()
+
+    live = sum(len(sessions) for sessions in ongoing.values())
+    print(
+        f"{mode:>6}: {len(stream) / elapsed:12.0f} messages/sec"
+        f" | {live} live sessions"
+        f" | peak scheduler objects {peak_objects}"
+        f" | RSS {rss_after:.1f} MiB (+{rss_after - rss_before:.1f})"
+    )
+
+    # Clean up any remaining tasks
+    if mode == 'tasks':
+        for task in scheduler.tasks.values():
+            task.cancel()
+        await asyncio.gather(*scheduler.tasks.values(), return_exceptions=True)
+
+
+def main():
+    stream = make_stream(args.guilds, args.members, args.messages)
+    print(f"Replaying {args.messages} messages from {args.members} members in {args.guilds} guilds.")
+    modes = ('tasks', 'wheel') if args.mode == 'both' else (args.mode,)
+    for mode in modes:
+        # Run each mode in a fresh event loop so task objects do not leak between runs
+        asyncio.run(run(mode, stream))
+
+
+if __name__ == '__main__':
+    main()
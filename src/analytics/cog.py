@@ -15,18 +15,15 @@ from .data import AnalyticsData
 from .events import (
     CommandStatus, CommandEvent, command_event_handler,
     GuildAction, GuildEvent, guild_event_handler,
-    VoiceAction, VoiceEvent, voice_event_handler
+    VoiceAction, VoiceEvent, voice_event_handler,
+    gui_render_event_handler
 )
 from .snapshot import shard_snapshot
+from .emitter import EventEmitter
 
 logger = logging.getLogger(__name__)
 
 
-# TODO: Client side might be better handled as a single connection fed by a queue?
-# Maybe consider this again after the interactive REPL idea
-# Or if it seems like this is giving an absurd amount of traffic
-
-
 class Analytics(LionCog):
     def __init__(self, bot: LionBot):
         self.bot = bot
@@ -36,11 +33,29 @@ class Analytics(LionCog):
         self.talk_command_event = command_event_handler.bind(shard_talk).route
         self.talk_guild_event = guild_event_handler.bind(shard_talk).route
         self.talk_voice_event = voice_event_handler.bind(shard_talk).route
+        self.talk_gui_render_event = gui_render_event_handler.bind(shard_talk).route
+
+        # Events are buffered and sent to the analytics app in batches
+        self.emitter = EventEmitter(
+            self.an_app,
+            batch_size=bot.config.analytics.getint('emit_batch_size', 100),
+            period=bot.config.analytics.getfloat('emit_period', 0.5),
+            capacity=bot.config.analytics.getint('emit_capacity', 10000),
+        )
+        self.emitter.register(self.talk_command_event)
+        self.emitter.register(self.talk_guild_event)
+        self.emitter.register(self.talk_voice_event)
+        # Card render timings, see `analytics.profiler`
+        self.emitter.register(self.talk_gui_render_event)
 
         self.talk_shard_snapshot = shard_talk.register_route()(shard_snapshot)
 
     async def cog_load(self):
         await self.data.init()
+        self.emitter.start()
+
+    async def cog_unload(self):
+        await self.emitter.close()
 
     @LionCog.listener()
     @log_wrap(action='AnEvent')
@@ -62,10 +77,7 @@ class Analytics(LionCog):
             action=action,
             created_at=utc_now()
         )
-        if self.an_app not in shard_talk.peers:
-            logger.warning(f"Analytics peer not found, discarding event: {event}")
-        else:
-            await self.talk_voice_event(event).send(self.an_app, wait_for_reply=False)
+        self.emitter.emit(self.talk_voice_event, event)
 
     @LionCog.listener()
     @log_wrap(action='AnEvent')
@@ -79,10 +91,7 @@ class Analytics(LionCog):
             action=GuildAction.JOINED,
             created_at=utc_now()
         )
-        if self.an_app not in shard_talk.peers:
-            logger.warning(f"Analytics peer not found, discarding event: {event}")
-        else:
-            await self.talk_guild_event(event).send(self.an_app, wait_for_reply=False)
+        self.emitter.emit(self.talk_guild_event, event)
 
     @LionCog.listener()
     @log_wrap(action='AnEvent')
@@ -96,10 +105,7 @@ class Analytics(LionCog):
             action=GuildAction.LEFT,
             created_at=utc_now()
         )
-        if self.an_app not in shard_talk.peers:
-            logger.warning(f"Analytics peer not found, discarding event: {event}")
-        else:
-            await self.talk_guild_event(event).send(self.an_app, wait_for_reply=False)
+        self.emitter.emit(self.talk_guild_event, event)
 
     @LionCog.listener()
     @log_wrap(action='AnEvent')
@@ -119,10 +125,7 @@ class Analytics(LionCog):
             guildid=ctx.guild.id if ctx.guild else None,
             ctxid=ctx.message.id
         )
-        if self.an_app not in shard_talk.peers:
-            logger.warning(f"Analytics peer not found, discarding event: {event}")
-        else:
-            await self.talk_command_event(event).send(self.an_app, wait_for_reply=False)
+        self.emitter.emit(self.talk_command_event, event)
 
     @LionCog.listener()
     @log_wrap(action='AnEvent')
@@ -171,7 +174,4 @@ class Analytics(LionCog):
             guildid=ctx.guild.id if ctx.guild else None,
             ctxid=ctx.message.id
         )
-        if self.an_app not in shard_talk.peers:
-            logger.warning(f"Analytics peer not found, discarding event: {event}")
-        else:
-            await self.talk_command_event(event).send(self.an_app, wait_for_reply=False)
+        self.emitter.emit(self.talk_command_event, event)
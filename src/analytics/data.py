@@ -1,5 +1,9 @@
+from typing import Optional
+from datetime import datetime
 from enum import Enum
 
+from psycopg import sql
+
 from data.registry import Registry
 from data.adapted import RegisterEnum
 from data.models import RowModel
@@ -173,8 +177,11 @@ class AnalyticsData(Registry, name='analytics'):
         ------
         CREATE TABLE analytics.gui_renders(
             cardname TEXT NOT NULL,
-            duration INTEGER NOT NULL
+            duration INTEGER NOT NULL,
+            skin TEXT,
+            data_duration INTEGER
         ) INHERITS (analytics.events);
+        CREATE INDEX gui_renders_created_at ON analytics.gui_renders (created_at);
         """
         _schema_ = 'analytics'
         _tablename_ = 'gui_renders'
@@ -186,4 +193,39 @@ class AnalyticsData(Registry, name='analytics'):
         created_at = Timestamp()
 
         cardname = String()
+        # Time taken to render the card, in milliseconds
         duration = Integer()
+        skin = String()
+        # Time taken to gather the card data, in milliseconds
+        data_duration = Integer()
+
+        @classmethod
+        async def percentiles(cls, since: datetime, cardname: Optional[str] = None) -> list[dict]:
+            """
+            Compute data gathering and render time percentiles for each card and skin,
+            over the renders recorded since the given time.
+
+            Rows are ordered by the 90th percentile render time, slowest first.
+            """
+            query = sql.SQL(
+                """
+                SELECT
+                    cardname,
+                    skin,
+                    COUNT(*) AS renders,
+                    percentile_cont(0.5) WITHIN GROUP (ORDER BY data_duration) AS data_p50,
+                    percentile_cont(0.9) WITHIN GROUP (ORDER BY data_duration) AS data_p90,
+                    percentile_cont(0.99) WITHIN GROUP (ORDER BY data_duration) AS data_p99,
+                    percentile_cont(0.5) WITHIN GROUP (ORDER BY duration) AS render_p50,
+                    percentile_cont(0.9) WITHIN GROUP (ORDER BY duration) AS render_p90,
+                    percentile_cont(0.99) WITHIN GROUP (ORDER BY duration) AS render_p99
+                FROM analytics.gui_renders
+                WHERE created_at >= %s AND (%s::TEXT IS NULL OR cardname = %s)
+                GROUP BY cardname, skin
+                ORDER BY render_p90 DESC
+                """
+            )
+            async with cls._connector.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(query, (since, cardname, cardname))
+                    return await cursor.fetchall()
@@ -0,0 +1,150 @@
+from typing import Any, Optional
+from collections import deque
+import asyncio
+import logging
+
+from meta.ipc import AppRoute
+from meta.logger import log_wrap
+
+
+logger = logging.getLogger(__name__)
+
+
+class EventEmitter:
+    """
+    Shard side buffer for analytics events, sending them to the analytics app in batches.
+
+    Events are buffered per route in bounded ring buffers.
+    Every buffer is sent as a single frame once any buffer holds `batch_size` events,
+    or at most `period` seconds after an event was buffered.
+    Each frame waits for the (empty) reply from the analytics app, so failed sends are detected.
+    While the analytics app is unreachable, or a send fails, the events stay buffered,
+    and once a buffer is full the oldest events are dropped to make room for new ones.
+    A frame which was delivered but whose reply was lost is sent again.
+
+    Routes must take a single list of events, see `EventHandler`.
+    """
+
+    def __init__(self, appid: str, batch_size: int = 100, period: float = 0.5, capacity: int = 10000):
+        self.appid = appid
+        self.batch_size = batch_size
+        self.period = period
+        self.capacity = capacity
+
+        # route name -> (route, buffered events)
+        self._buffers: dict[str, tuple[AppRoute, deque]] = {}
+        self._wakeup = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+
+        # Statistics
+        self.emitted = 0  # Events buffered
+        self.sent = 0  # Events sent to the analytics app
+        self.dropped = 0  # Events dropped from full buffers
+        self.frames = 0  # Batches sent
+        self.failures = 0  # Batches which failed to send
+
+    def __repr__(self):
+        return (
+            "<"
+                f"{self.__class__.__name__}"
+                f" appid={self.appid!r}"
+                f" buffered={len(self)}"
+                f" emitted={self.emitted}"
+                f" sent={self.sent}"
+                f" dropped={self.dropped}"
+                f" frames={self.frames}"
+                f" failures={self.failures}"
+                ">"
+        )
+
+    def __len__(self):
+        return sum(len(buffer) for _, buffer in self._buffers.values())
+
+    def register(self, route: AppRoute):
+        """
+        Add a buffer for events sent on the given route.
+        """
+        self._buffers[route.name] = (route, deque(maxlen=self.capacity))
+        return route
+
+    def emit(self, route: AppRoute, event: Any):
+        """
+        Buffer an event to be sent on the given route, which must have been registered.
+        """
+        _, buffer = self._buffers[route.name]
+        if len(buffer) == buffer.maxlen:
+            self.dropped += 1
+        buffer.append(event)
+        self.emitted += 1
+        if len(buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flusher(), name='analytics-emitter')
+
+    async def close(self):
+        """
+        Stop the periodic flush, and try to send any buffered events.
+        """
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+        await self.flush()
+
+    @log_wrap(action='Analytics Emitter')
+    async def _flusher(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.period)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Unexpected exception while flushing analytics events. Continuing.")
+
+    async def flush(self) -> int:
+        """
+        Send every buffered event, as one frame per route.
+
+        Returns the number of events sent.
+        Events are kept buffered if the analytics app is not currently a peer, or the send fails.
+        """
+        sent = 0
+        for route, buffer in self._buffers.values():
+            if not buffer:
+                continue
+            if self.appid not in route._client.peers:
+                logger.debug(
+                    f"Analytics peer '{self.appid}' not found, keeping {len(buffer)} buffered '{route.name}' events."
+                )
+                continue
+            events = list(buffer)
+            buffer.clear()
+            try:
+                await route(events).send(self.appid, raise_errors=True)
+            except Exception:
+                self.failures += 1
+                self._rebuffer(buffer, events)
+                logger.warning(
+                    f"Failed to send {len(events)} '{route.name}' events to analytics peer '{self.appid}'. "
+                    f"Keeping {len(buffer)} buffered events."
+                )
+                continue
+            self.frames += 1
+            sent += len(events)
+        self.sent += sent
+        return sent
+
+    def _rebuffer(self, buffer: deque, events: list):
+        """
+        Return unsent events to the front of their buffer, dropping the oldest events if it overflows.
+        """
+        events.extend(buffer)
+        if (overflow := len(events) - self.capacity) > 0:
+            self.dropped += overflow
+            del events[:overflow]
+        buffer.clear()
+        buffer.extend(events)
@@ -4,7 +4,7 @@ import logging
 from collections import namedtuple
 from typing import NamedTuple, Optional, Generic, Type, TypeVar
 
-from meta.ipc import AppRoute, AppClient
+from meta.ipc import AppRoute, AppClient, StructBatchCodec
 from meta.logger import logging_context, log_wrap, set_logging_context
 
 from data import RowModel
@@ -41,16 +41,20 @@ class EventHandler(Generic[T]):
     @property
     def route(self):
         if self._route is None:
-            self._route = AppRoute(self.handle_event, name=self.route_name)
+            self._route = AppRoute(self.handle_event, name=self.route_name, codec=StructBatchCodec(self.struct))
         return self._route
 
-    async def handle_event(self, data):
-        try:
-            await self.queue.put(data)
-        except asyncio.QueueFull:
-            logger.warning(
-                f"Queue on event handler {self.route_name} is full! Discarding event {data}"
-            )
+    async def handle_event(self, events: list[T]):
+        """
+        Queue a batch of events sent by a shard `EventEmitter`.
+        """
+        for event in events:
+            try:
+                self.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning(
+                    f"Queue on event handler {self.route_name} is full! Discarding event {event}"
+                )
 
     @log_wrap(action='consumer')
     async def consumer(self):
@@ -59,6 +63,9 @@ class EventHandler(Generic[T]):
                 item = await self.queue.get()
                 self.batch.append(item)
                 if len(self.batch) > self.batch_size:
+                    # Take any backlog along with the batch, large batches are cheaper per row
+                    while not self.queue.empty():
+                        self.batch.append(self.queue.get_nowait())
                     await self.process_batch()
             except asyncio.CancelledError:
                 # Try and process the last batch
@@ -79,7 +86,7 @@ class EventHandler(Generic[T]):
     @log_wrap(action='batch')
     async def process_batch(self):
         logger.debug("Processing Batch")
-        # TODO: copy syntax might be more efficient here
+        # Large batches are streamed with COPY by the Insert query
         await self.model.table.insert_many(
             self.struct._fields,
             *map(tuple, self.batch)
@@ -178,3 +185,19 @@ class VoiceEvent(NamedTuple):
 voice_event_handler: EventHandler[VoiceEvent] = EventHandler(
     'voice_event', AnalyticsData.VoiceSession, VoiceEvent, batchsize=5
 )
+
+
+class GuiRenderEvent(NamedTuple):
+    appname: str
+    cardname: str
+    skin: Optional[str]
+    data_duration: int
+    duration: int
+    created_at: datetime.datetime
+    guildid: Optional[int] = None
+    ctxid: Optional[int] = None
+
+
+gui_render_event_handler: EventHandler[GuiRenderEvent] = EventHandler(
+    'gui_render_event', AnalyticsData.GuiRender, GuiRenderEvent, batchsize=20
+)
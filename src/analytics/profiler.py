@@ -0,0 +1,75 @@
+"""
+Render latency profiling for GUI cards.
+
+Card renders are split into two phases,
+gathering the card data (the `get_*_card` coroutine, including the skin lookup),
+and rendering the card on the GUI server.
+`profile_render` times both phases, and sends a `GuiRenderEvent` through the analytics emitter,
+to be stored in `analytics.gui_renders`.
+"""
+from typing import Awaitable, Optional, TypeVar
+import time
+
+from meta.app import appname
+from meta.context import context, ctx_bot, ctx_skin
+from utils.lib import utc_now
+from utils.cardcache import card_cache
+
+from .events import GuiRenderEvent
+
+CardT = TypeVar('CardT')
+
+
+async def profile_render(
+    card_getter: Awaitable[Optional[CardT]], guildid: Optional[int] = None
+) -> tuple[Optional[CardT], Optional[bytes]]:
+    """
+    Await the given card getter and render the resulting card, recording the time taken by each.
+
+    The card is tagged with its `card_id`, and the skin label set in `ctx_skin` by the skin lookup.
+    Returns the card and the rendered image data, or `(None, None)` if the getter did not return a card.
+    Renders served from the card cache are not recorded.
+    """
+    token = ctx_skin.set(None)
+    try:
+        start = time.perf_counter()
+        card = await card_getter
+        if card is None:
+            return None, None
+        gathered = time.perf_counter()
+        data = await card.render()
+        rendered = time.perf_counter()
+        skin = ctx_skin.get()
+    finally:
+        ctx_skin.reset(token)
+
+    if getattr(card, 'cache_hit', False):
+        return card, data
+
+    ctx = context.get()
+    event = GuiRenderEvent(
+        appname=appname,
+        cardname=getattr(card, 'card_id', card.__class__.__name__),
+        skin=skin,
+        data_duration=int((gathered - start) * 1000),
+        duration=int((rendered - gathered) * 1000),
+        created_at=utc_now(),
+        guildid=guildid,
+        ctxid=ctx.message.id if ctx is not None else None,
+    )
+    if (bot := ctx_bot.get()) is not None and (cog := bot.get_cog('Analytics')) is not None:
+        cog.emitter.emit(cog.talk_gui_render_event, event)
+    return card, data
+
+
+async def sample_card(card_cls, args: Optional[dict] = None):
+    """
+    Create and render a card of the given class with the given arguments, or its sample arguments.
+
+    Sample renders are not recorded, since they do not reflect the data gathering or render times of member cards.
+    """
+    if args is None:
+        args = await card_cls.sample_args(None)
+    card = card_cache.card(card_cls, **args)
+    await card.render()
+    return card
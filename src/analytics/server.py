@@ -10,7 +10,7 @@ from meta.sharding import shard_count
 
 from data import Database
 
-from .events import command_event_handler, guild_event_handler, voice_event_handler
+from .events import command_event_handler, guild_event_handler, voice_event_handler, gui_render_event_handler
 from .snapshot import shard_snapshot, ShardSnapshot
 from .data import AnalyticsData
 
@@ -35,14 +35,19 @@ class AnalyticsServer:
         self.event_handlers = [
             command_event_handler,
             guild_event_handler,
-            voice_event_handler
+            voice_event_handler,
+            gui_render_event_handler
         ]
 
         self.talk = AppClient(
             conf.analytics['appname'],
             appname,
             {'host': conf.analytics['server_host'], 'port': int(conf.analytics['server_port'])},
-            {'host': conf.appipc['server_host'], 'port': int(conf.appipc['server_port'])}
+            {'host': conf.appipc['server_host'], 'port': int(conf.appipc['server_port'])},
+            secret=conf.appipc.get('secret', ''),
+            multiplex=conf.appipc.getboolean('multiplex', True),
+            legacy=conf.appipc.getboolean('legacy_pickle', False),
+            reply_timeout=conf.appipc.getfloat('reply_timeout', 60)
         )
         self.talk_shard_snapshot = self.talk.register_route()(shard_snapshot)
 
@@ -101,6 +106,7 @@ class AnalyticsServer:
 
     @log_wrap(action='SnapLoop')
     async def snapshot_loop(self):
+        self.db.set_lane('background')
         while True:
             try:
                 result = await self.take_snapshot()
@@ -19,10 +19,11 @@ async def shard_snapshot():
         # We cannot take a snapshot without Bot
         # Just quietly fail
         return None
+    stats = bot.core.shard_stats
     snap = ShardSnapshot(
-        guild_count=len(bot.guilds),
-        voice_count=sum(len(channel.members) for guild in bot.guilds for channel in guild.voice_channels),
-        member_count=sum(guild.member_count for guild in bot.guilds),
-        user_count=len(set(m.id for guild in bot.guilds for m in guild.members))
+        guild_count=stats.guild_count,
+        voice_count=stats.in_voice,
+        member_count=stats.member_count,
+        user_count=stats.user_count
     )
     return snap
@@ -1,3 +1,4 @@
+from typing import Optional
 import asyncio
 import logging
 
@@ -12,6 +13,7 @@ from meta.context import ctx_bot
 from meta.monitor import ComponentMonitor, StatusLevel, ComponentStatus
 
 from data import Database
+from data.metrics import QueryMetrics
 
 from babel.translator import LeoBabel, ctx_translator
 
@@ -27,7 +29,39 @@ logging_queue = setup_main_logger()
 
 logger = logging.getLogger(__name__)
 
-db = Database(conf.data['args'])
+
+def _pool_lanes() -> Optional[dict[str, tuple[int, int]]]:
+    """
+    Read the connection pool lanes and their sizes from the data configuration.
+
+    Lanes without a configured size use the default size for that lane, if there is one.
+    """
+    lanes = {}
+    for lane in conf.data.getlist('pool_lanes', []):
+        sizes = conf.data.getintlist(f"pool_{lane}", None)
+        if sizes is None:
+            if lane not in Database.default_lanes:
+                raise ValueError(
+                    f"Connection pool lane '{lane}' is listed in 'pool_lanes', "
+                    f"but has no 'pool_{lane} = min, max' size in the data configuration."
+                )
+            sizes = Database.default_lanes[lane]
+        if len(sizes) != 2:
+            raise ValueError(f"Connection pool lane size 'pool_{lane}' must be given as 'min, max'.")
+        lanes[lane] = tuple(sizes)
+    return lanes or None
+
+
+db = Database(
+    conf.data['args'],
+    lanes=_pool_lanes(),
+    shape_cache_size=conf.data.getint('shape_cache_size', 512),
+    prepare_threshold=conf.data.getint('prepare_threshold', 5),
+    metrics=QueryMetrics(
+        slow_threshold=conf.data.getfloat('slow_query_threshold', 0.5),
+        action_getter=log_action_stack.get,
+    ),
+)
 
 
 async def _data_monitor() -> ComponentStatus:
@@ -35,7 +69,10 @@ async def _data_monitor() -> ComponentStatus:
     Component monitor callback for the database.
     """
     data = {
-        'stats': str(db.pool.get_stats())
+        'stats': str(db.pool.get_stats()),
+        'shapes': str(db.shapes.stats() if db.shapes is not None else None),
+        'queries': str(db.metrics.stats()),
+        'lanes': str(db.pool_stats()),
     }
     if not db.pool._opened:
         level = StatusLevel.WAITING
@@ -45,7 +82,10 @@ async def _data_monitor() -> ComponentStatus:
         info = "(ERROR) Database Pool is closed."
     else:
         level = StatusLevel.OKAY
-        info = "(OK) Database Pool statistics: {stats}"
+        info = (
+            "(OK) Database Pool statistics: {stats}, lanes: {lanes}, "
+            "query shapes: {shapes}, query latency: {queries}"
+        )
     return ComponentStatus(level, info, info, data)
 
 
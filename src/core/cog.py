@@ -15,6 +15,7 @@ from settings.groups import SettingGroup
 
 from .data import CoreData
 from .lion import Lions
+from .shardstats import ShardStats
 from .lion_guild import GuildConfig
 from .lion_member import MemberConfig
 from .lion_user import UserConfig
@@ -38,6 +39,7 @@ class CoreCog(LionCog):
         self.data = CoreData()
         bot.db.load_registry(self.data)
         self.lions = Lions(bot, self.data)
+        self.shard_stats = ShardStats(bot)
 
         self.app_config: Optional[CoreData.AppConfig] = None
         self.bot_config: Optional[CoreData.BotConfig] = None
@@ -75,6 +77,7 @@ class CoreCog(LionCog):
         self.bot.add_listener(self.shard_update_guilds, name='on_guild_remove')
 
         await self.bot.add_cog(self.lions)
+        await self.bot.add_cog(self.shard_stats)
 
         # Load the app command cache
         await self.reload_appcmd_cache()
@@ -116,6 +119,7 @@ class CoreCog(LionCog):
 
     async def cog_unload(self):
         await self.bot.remove_cog(self.lions.qualified_name)
+        await self.bot.remove_cog(self.shard_stats.qualified_name)
         self.bot.remove_listener(self.shard_update_guilds, name='on_guild_join')
         self.bot.remove_listener(self.shard_update_guilds, name='on_guild_leave')
         self.bot.core = None
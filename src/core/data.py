@@ -1,6 +1,6 @@
 from enum import Enum
-from itertools import chain
 from psycopg import sql
+from psycopg.rows import tuple_row
 from cachetools import TTLCache
 import discord
 
@@ -9,6 +9,7 @@ from meta.logger import log_wrap
 from data import Table, Registry, Column, RowModel, RegisterEnum
 from data.models import WeakCache
 from data.columns import Integer, String, Bool, Timestamp
+from utils.data import TemporaryTable
 
 
 class RankType(Enum):
@@ -272,6 +273,7 @@ class CoreData(Registry, name="core"):
         """
         _tablename_ = 'members'
         _cache_: WeakCache[tuple[int, int], 'CoreData.Member'] = WeakCache(TTLCache(5000, ttl=60*5))
+        _compact_ = True
 
         guildid = Integer(primary=True)
         userid = Integer(primary=True)
@@ -301,34 +303,113 @@ class CoreData(Registry, name="core"):
             pending:
                 List of tuples of the form `(guildid, userid, pending_coins)`.
             """
+            pending_table = TemporaryTable(
+                'guildid', 'userid', 'coin_diff',
+                name='t',
+                types=('BIGINT', 'BIGINT', 'INTEGER'),
+                copy=True
+            )
+            pending_table.set_values(*pending)
+            async with cls.table.connector.connection() as conn:
+                async with conn.transaction():
+                    async with conn.cursor() as cursor:
+                        await pending_table.stage(cursor)
+                        pending_expr, pending_values = pending_table.as_tuple()
+                        query = sql.SQL("""
+                            UPDATE members
+                            SET
+                                coins = LEAST(coins + t.coin_diff, 2147483647)
+                            FROM
+                                {}
+                            WHERE
+                                members.guildid = t.guildid
+                            AND
+                                members.userid = t.userid
+                            RETURNING *
+                        """).format(pending_expr)
+                        await cursor.execute(query, tuple(pending_values))
+                        rows = await cursor.fetchall()
+                        return cls._make_rows(*rows)
+
+        @classmethod
+        @log_wrap(action='Hydrate Members')
+        async def hydrate(cls, *memberids: tuple[int, int]) -> list[tuple[dict, dict, dict]]:
+            """
+            Fetch or create the guild, user, and member rows for each of the given members in one statement.
+
+            Returns a list of `(guild_data, user_data, member_data)` tuples.
+            New members are created with the guild starting funds.
+            Rows created concurrently by another transaction are not visible to the statement,
+            so the corresponding members may be missing from the result, and should be fetched separately.
+            """
+            memberids = list(dict.fromkeys(memberids))
+            if not memberids:
+                return []
             query = sql.SQL("""
-                UPDATE members
-                SET
-                    coins = LEAST(coins + t.coin_diff, 2147483647)
-                FROM
-                    (VALUES {})
-                AS
-                    t (guildid, userid, coin_diff)
-                WHERE
-                    members.guildid = t.guildid
-                AND
-                    members.userid = t.userid
-                RETURNING *
-            """).format(
-                sql.SQL(', ').join(
-                    sql.SQL("({}, {}, {})").format(sql.Placeholder(), sql.Placeholder(), sql.Placeholder())
-                    for _ in pending
+                WITH
+                input (guildid, userid) AS (
+                    SELECT * FROM unnest(%s::BIGINT[], %s::BIGINT[])
+                ),
+                new_guilds AS (
+                    INSERT INTO guild_config (guildid)
+                    SELECT DISTINCT guildid FROM input
+                    ON CONFLICT DO NOTHING
+                    RETURNING *
+                ),
+                guilds AS (
+                    SELECT * FROM new_guilds
+                    UNION ALL
+                    SELECT * FROM guild_config WHERE guildid IN (SELECT guildid FROM input)
+                ),
+                new_users AS (
+                    INSERT INTO user_config (userid)
+                    SELECT DISTINCT userid FROM input
+                    ON CONFLICT DO NOTHING
+                    RETURNING *
+                ),
+                users AS (
+                    SELECT * FROM new_users
+                    UNION ALL
+                    SELECT * FROM user_config WHERE userid IN (SELECT userid FROM input)
+                ),
+                new_members AS (
+                    INSERT INTO members (guildid, userid, coins)
+                    SELECT input.guildid, input.userid, COALESCE(guilds.starting_funds, 0)
+                    FROM input
+                    JOIN guilds USING (guildid)
+                    JOIN users USING (userid)
+                    ON CONFLICT DO NOTHING
+                    RETURNING *
+                ),
+                member_rows AS (
+                    SELECT * FROM new_members
+                    UNION ALL
+                    SELECT members.* FROM members JOIN input USING (guildid, userid)
                 )
-            )
-            # TODO: Replace with copy syntax/query?
+                SELECT
+                    NULL AS "__guild", guilds.*,
+                    NULL AS "__user", users.*,
+                    NULL AS "__member", member_rows.*
+                FROM member_rows
+                JOIN guilds USING (guildid)
+                JOIN users USING (userid)
+            """)
             async with cls.table.connector.connection() as conn:
-                async with conn.cursor() as cursor:
+                async with conn.cursor(row_factory=tuple_row) as cursor:
                     await cursor.execute(
                         query,
-                        tuple(chain(*pending))
+                        ([gid for gid, _ in memberids], [uid for _, uid in memberids])
                     )
                     rows = await cursor.fetchall()
-                    return cls._make_rows(*rows)
+                    names = [column.name for column in cursor.description]
+
+            # Split each row into the guild, user, and member data
+            g, u, m = names.index('__guild'), names.index('__user'), names.index('__member')
+            sections = ((g + 1, u), (u + 1, m), (m + 1, len(names)))
+            return [
+                tuple(dict(zip(names[start:end], row[start:end])) for start, end in sections)
+                for row in rows
+            ]
 
         @classmethod
         @log_wrap(action='get_member_rank')
@@ -0,0 +1,197 @@
+from typing import Optional, TYPE_CHECKING
+from collections import Counter, deque
+import asyncio
+import logging
+
+import discord
+
+from meta.logger import log_wrap
+
+if TYPE_CHECKING:
+    from .lion_guild import LionGuild
+
+logger = logging.getLogger(__name__)
+
+
+class EventLogQueue:
+    """
+    Queue of event log embeds for a single guild, sent to the guild event log webhook in batches.
+
+    Embeds are packed into messages of up to `max_embeds` embeds and `max_chars` characters.
+    The queue is flushed once a full message is waiting, or `delay` seconds after the first queued embed.
+    Sends are limited by the rate limit bucket of the event log `HookedChannel`,
+    and while the bucket is full, new embeds build up in the queue and are packed into fewer messages.
+    Once `capacity` embeds are waiting, the oldest embeds are dropped.
+
+    The flusher task only runs while there are queued embeds.
+    """
+    # Discord limits per message
+    max_embeds = 10
+    max_chars = 6000
+
+    # Counts over the event log queues of every guild
+    totals: Counter[str] = Counter()
+
+    def __init__(self, lguild: 'LionGuild', delay: float = 1, capacity: int = 100):
+        self.lguild = lguild
+        self.delay = delay
+
+        self._queue: deque[discord.Embed] = deque(maxlen=capacity)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        # Counts of queued, sent, merged, dropped and failed embeds, and sent messages
+        self.stats: Counter[str] = Counter()
+
+    def __repr__(self):
+        return (
+            "<"
+                f"{self.__class__.__name__}"
+                f" guildid={self.lguild.guildid}"
+                f" queued={len(self._queue)}"
+                f" stats={dict(self.stats)}"
+                ">"
+        )
+
+    def __len__(self):
+        return len(self._queue)
+
+    @classmethod
+    def summary(cls) -> str:
+        keys = ('queued', 'sent', 'messages', 'merged', 'dropped', 'failed')
+        return ' '.join(f"{key}={cls.totals[key]}" for key in keys)
+
+    def _count(self, key: str, n: int = 1):
+        self.stats[key] += n
+        self.totals[key] += n
+
+    def put(self, embed: discord.Embed):
+        """
+        Queue an embed to be sent to the event log.
+        """
+        if len(self._queue) == self._queue.maxlen:
+            self._count('dropped')
+        self._queue.append(embed)
+        self._count('queued')
+
+        if len(self._queue) >= self.max_embeds:
+            self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flusher(), name='event-log')
+
+    @log_wrap(action="Event Log")
+    async def _flusher(self):
+        while self._queue:
+            if len(self._queue) < self.max_embeds:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.delay)
+                except asyncio.TimeoutError:
+                    pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception(
+                    f"Unexpected exception while flushing event log for <gid: {self.lguild.guildid}>."
+                )
+
+    def _next_batch(self) -> list[discord.Embed]:
+        """
+        Take the next message worth of embeds from the queue.
+        """
+        batch = [self._queue.popleft()]
+        chars = len(batch[0])
+        while self._queue and len(batch) < self.max_embeds:
+            if chars + (size := len(self._queue[0])) > self.max_chars:
+                break
+            batch.append(self._queue.popleft())
+            chars += size
+        return batch
+
+    async def flush(self):
+        """
+        Send every queued embed, waiting on the webhook rate limit between messages.
+
+        Embeds are discarded if the event log is not set up, or the webhook cannot be created.
+        """
+        hook = await self.lguild.get_event_hook()
+        if hook is None:
+            self._queue.clear()
+            return
+
+        while self._queue:
+            batch = self._next_batch()
+            # Later events keep queueing while we wait
+            await self._wait_bucket()
+            hook = await self._send(hook, batch)
+            if hook is None:
+                self._queue.clear()
+                return
+
+    async def _wait_bucket(self):
+        if (hooked := self.lguild.eventlogger) is not None:
+            await hooked.bucket.wait()
+            hooked.bucket.request()
+
+    async def _send(self, hook: discord.Webhook, batch: list[discord.Embed]) -> Optional[discord.Webhook]:
+        """
+        Send a batch of embeds through the given webhook, recreating the webhook once if it was deleted.
+        If Discord rejects the batch as a bad request, each embed is retried in its own message,
+        so a single invalid embed does not fail the rest of the batch.
+
+        Returns the webhook to use for the next batch.
+        """
+        logger.debug(f"Logging {len(batch)} event log events: {[embed.to_dict() for embed in batch]}")
+        try:
+            try:
+                await hook.send(embeds=batch)
+            except discord.NotFound:
+                logger.info(
+                    f"Event log in <gid: {self.lguild.guildid}> invalidated. Recreating."
+                )
+                hooked = self.lguild.eventlogger
+                if hooked is not None:
+                    await hooked.invalidate(hook)
+                hook = await self.lguild.get_event_hook()
+                if hook is None:
+                    self._count('failed', len(batch))
+                    return None
+                await hook.send(embeds=batch)
+        except discord.HTTPException as e:
+            if e.status == 400 and len(batch) > 1:
+                logger.info(
+                    f"Discord rejected a batch of {len(batch)} event log events "
+                    f"to <gid: {self.lguild.guildid}>. Retrying individually."
+                )
+                await self._send_each(hook, batch)
+                return hook
+            logger.warning(
+                f"Discord exception occurred sending {len(batch)} event log events "
+                f"to <gid: {self.lguild.guildid}>.",
+                exc_info=True
+            )
+            self._count('failed', len(batch))
+        else:
+            self._count('sent', len(batch))
+            self._count('messages')
+            self._count('merged', len(batch) - 1)
+        return hook
+
+    async def _send_each(self, hook: discord.Webhook, batch: list[discord.Embed]):
+        """
+        Send each embed in the batch as a separate message.
+        """
+        for embed in batch:
+            await self._wait_bucket()
+            try:
+                await hook.send(embed=embed)
+            except discord.HTTPException:
+                logger.warning(
+                    f"Discord exception occurred sending event log event to <gid: {self.lguild.guildid}>: "
+                    f"{embed.to_dict()}",
+                    exc_info=True
+                )
+                self._count('failed')
+            else:
+                self._count('sent')
+                self._count('messages')
@@ -5,6 +5,7 @@ import asyncio
 import discord
 
 from meta import LionBot
+from utils.ratelimits import Bucket
 
 from .data import CoreData
 
@@ -24,6 +25,10 @@ class HookedChannel:
 
         self.lock = asyncio.Lock()
 
+        # Rate limit for messages sent through the webhook
+        # Discord allows bursts of 5 webhook messages, and 30 messages per minute in a channel
+        self.bucket = Bucket(5, 10)
+
     @property
     def channel(self) -> Optional[discord.TextChannel | discord.VoiceChannel | discord.StageChannel]:
         if not self.bot.is_ready():
@@ -1,11 +1,13 @@
 from typing import Optional
+from collections import deque
 from cachetools import LRUCache
 import itertools
 import datetime
+import time
 import discord
 
-from meta import LionCog, LionBot, LionContext
-from utils.data import MEMBERS
+from meta import LionCog, LionBot, LionContext, conf
+from meta.monitor import ComponentMonitor, ComponentStatus, StatusLevel
 from data import WeakCache
 
 from .data import CoreData
@@ -13,6 +15,8 @@ from .data import CoreData
 from .lion_guild import LionGuild
 from .lion_user import LionUser
 from .lion_member import LionMember
+from .writebehind import WriteBehind
+from .eventlog import EventLogQueue
 
 
 class Lions(LionCog):
@@ -26,6 +30,61 @@ class Lions(LionCog):
         self.lion_users = WeakCache(LRUCache(2000))
         self.lion_members = WeakCache(LRUCache(5000))
 
+        # Buffer for the Discord model updates made when Lions are touched
+        self.write_behind = WriteBehind(conf.bot.getfloat('touch_flush_period', 10))
+
+        # Recent command pre-processing times, in seconds
+        self.check_times = deque(maxlen=1000)
+        # Number of members hydrated in one query, and number fetched separately
+        self.hydrated = 0
+        self.fallbacks = 0
+        self.monitor = ComponentMonitor('Lions', self._monitor)
+
+    async def _monitor(self):
+        state = (
+            "<"
+                "Lions"
+                " guilds={guilds}"
+                " users={users}"
+                " members={members}"
+                " hydrated={hydrated}"
+                " fallbacks={fallbacks}"
+                " check_p50={p50}"
+                " check_p99={p99}"
+                " write_behind={write_behind}"
+                " event_logs=<{event_logs}>"
+                ">"
+        )
+        times = sorted(self.check_times)
+        data = dict(
+            guilds=len(self.lion_guilds),
+            users=len(self.lion_users),
+            members=len(self.lion_members),
+            hydrated=self.hydrated,
+            fallbacks=self.fallbacks,
+            p50=f"'{times[len(times) // 2] * 1000:.1f}ms'" if times else None,
+            p99=f"'{times[int(len(times) * 0.99)] * 1000:.1f}ms'" if times else None,
+            write_behind=repr(self.write_behind),
+            event_logs=EventLogQueue.summary(),
+        )
+        if self.write_behind._flush_task is None or self.write_behind._flush_task.done():
+            level = StatusLevel.ERRORED
+            info = f"(ERROR) Write-behind flusher not running. {state}"
+        elif self.write_behind.errors:
+            level = StatusLevel.UNSURE
+            info = f"(UNSURE) Errors occurred while flushing the write-behind buffer. {state}"
+        else:
+            level = StatusLevel.OKAY
+            info = f"(OK) Lion caches operational. {state}"
+        return ComponentStatus(level, info, info, data)
+
+    async def cog_load(self):
+        self.bot.system_monitor.add_component(self.monitor)
+        self.write_behind.start()
+
+    async def cog_unload(self):
+        await self.write_behind.close()
+
     async def bot_check_once(self, ctx: LionContext):
         """
         Insert the high-level Lion objects into context before command execution.
@@ -34,8 +93,8 @@ class Lions(LionCog):
         Updates relevant saved data from the Discord models,
         and updates last seen for the LionUser (for data lifetime).
         """
+        start = time.perf_counter()
         if ctx.guild:
-            # TODO: Consider doing all updates in one query, maybe with a View trigger on Member
             lmember = ctx.lmember = await self.fetch_member(ctx.guild.id, ctx.author.id, ctx.author)
             await lmember.touch_discord_model(ctx.author)
 
@@ -54,6 +113,7 @@ class Lions(LionCog):
             await luser.touch_discord_model(ctx.author)
 
             ctx.alion = luser
+        self.check_times.append(time.perf_counter() - start)
         return True
 
     async def fetch_user(self, userid, user: Optional[discord.User] = None) -> LionUser:
@@ -145,19 +205,54 @@ class Lions(LionCog):
 
         Creates the LionGuild, LionUser, and LionMember if they do not already exist.
         """
-        # TODO: Can we do this more efficiently with one query, while keeping cache? Multiple joins?
         key = (guildid, userid)
         if (lmember := self.lion_members.get(key, None)) is None:
-            lguild = await self.fetch_guild(guildid, member.guild if member is not None else None)
-            luser = await self.fetch_user(userid, member)
-            data = await self.data.Member.fetch_or_create(
-                guildid, userid,
-                coins=lguild.config.get('starting_funds').value
-            )
-            lmember = LionMember(self.bot, data, lguild, luser, member)
-            self.lion_members[key] = lmember
+            hydrated = await self._hydrate_members(key, member=member)
+            if (lmember := hydrated.get(key, None)) is None:
+                lmember = await self._load_member(guildid, userid, member)
+        return lmember
+
+    async def _load_member(self, guildid, userid, member: Optional[discord.Member] = None) -> LionMember:
+        """
+        Fetch or create the given LionMember, fetching the guild, user, and member data separately.
+        """
+        self.fallbacks += 1
+        lguild = await self.fetch_guild(guildid, member.guild if member is not None else None)
+        luser = await self.fetch_user(userid, member)
+        data = await self.data.Member.fetch_or_create(
+            guildid, userid,
+            coins=lguild.config.get('starting_funds').value
+        )
+        lmember = LionMember(self.bot, data, lguild, luser, member)
+        self.lion_members[(guildid, userid)] = lmember
         return lmember
 
+    async def _hydrate_members(self, *memberids: tuple[int, int],
+                               member: Optional[discord.Member] = None) -> dict[tuple[int, int], LionMember]:
+        """
+        Fetch or create the data for the given members, along with their guilds and users, in a single query.
+
+        Constructs and caches the LionMembers, and any LionGuilds and LionUsers which were not cached.
+        The given `member`, if any, is attached to the created objects.
+        Members which could not be hydrated are omitted from the result.
+        """
+        member_map = {}
+        for guild_data, user_data, member_data in await self.data.Member.hydrate(*memberids):
+            guildid, userid = key = (member_data['guildid'], member_data['userid'])
+            if (lguild := self.lion_guilds.get(guildid, None)) is None:
+                row, = self.data.Guild._make_rows(guild_data)
+                lguild = LionGuild(self.bot, row, guild=member.guild if member is not None else None)
+                self.lion_guilds[guildid] = lguild
+            if (luser := self.lion_users.get(userid, None)) is None:
+                row, = self.data.User._make_rows(user_data)
+                luser = LionUser(self.bot, row, user=member)
+                self.lion_users[userid] = luser
+            row, = self.data.Member._make_rows(member_data)
+            lmember = LionMember(self.bot, row, lguild, luser, member)
+            self.lion_members[key] = member_map[key] = lmember
+        self.hydrated += len(member_map)
+        return member_map
+
     async def fetch_members(self, *memberids: tuple[int, int]) -> dict[tuple[int, int], LionMember]:
         """
         Fetch or create multiple members simultaneously.
@@ -174,30 +269,12 @@ class Lions(LionCog):
 
         # Fetch or create members that weren't in cache
         if missing:
-            # First fetch or create the guilds and users
-            lguilds = await self.fetch_guilds(*(gid for gid, _ in missing))
-            lusers = await self.fetch_users(*(uid for _, uid in missing))
-
-            # Now attempt to load members from data
-            rows = await self.data.Member.fetch_where(MEMBERS(*missing))
-            missing.difference_update((row.guildid, row.userid) for row in rows)
+            hydrated = await self._hydrate_members(*missing)
+            member_map.update(hydrated)
+            missing.difference_update(hydrated)
 
-            # Create any member rows that are still missing
-            if missing:
-                new_rows = await self.data.Member.table.insert_many(
-                    ('guildid', 'userid', 'coins'),
-                    *((gid, uid, lguilds[gid].config.get('starting_funds').value) for gid, uid in missing)
-                ).with_adapter(self.data.Member._make_rows)
-                rows = itertools.chain(rows, new_rows)
-
-            # We have all the data, now construct the member objects
-            for row in rows:
-                key = (row.guildid, row.userid)
-                self.lion_members[key] = member_map[key] = LionMember(
-                    self.bot,
-                    row,
-                    lguilds[row.guildid],
-                    lusers[row.userid]
-                )
+            # Members whose rows were created concurrently are fetched separately
+            for guildid, userid in missing:
+                member_map[(guildid, userid)] = await self._load_member(guildid, userid)
 
         return member_map
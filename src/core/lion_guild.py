@@ -13,6 +13,7 @@ from settings.groups import ModelConfig, SettingDotDict
 from babel.translator import ctx_locale
 
 from .hooks import HookedChannel
+from .eventlog import EventLogQueue
 from .data import CoreData
 from . import babel
 
@@ -121,7 +122,7 @@ class LionGuild(Timezoned):
         '_guild',
         'voice_lock',
         '_eventlogger',
-        '_tasks',
+        '_eventlog',
         '__weakref__'
     )
 
@@ -146,10 +147,9 @@ class LionGuild(Timezoned):
         # May be None if no event log is set or if the channel does not exist
         self._eventlogger: Optional[HookedChannel] = None
 
-        # Set of background tasks associated with this guild (e.g. event logs)
-        # In theory we should ensure these are finished before the lguild is gcd
-        # But this is *probably* not an actual problem in practice
-        self._tasks = set()
+        # Queue of event log embeds waiting to be sent to the event log webhook
+        # The flusher task keeps the queue alive until it is empty, even if the lguild is evicted
+        self._eventlog = EventLogQueue(self)
 
     @property
     def eventlogger(self) -> Optional[HookedChannel]:
@@ -182,9 +182,11 @@ class LionGuild(Timezoned):
     async def touch_discord_model(self, guild: discord.Guild):
         """
         Update saved Discord model attributes for this guild.
+
+        Changes are written to data by the next write-behind flush.
         """
         if self.data.name != guild.name:
-            await self.data.update(name=guild.name)
+            self.bot.core.lions.write_behind.update(self.data, name=guild.name)
 
     @log_wrap(action='get event hook')
     async def get_event_hook(self) -> Optional[discord.Webhook]:
@@ -231,33 +233,6 @@ class LionGuild(Timezoned):
                     )
             return hook
 
-    @log_wrap(action="Log Event")
-    async def _log_event(self, embed: discord.Embed, retry=True):
-        logger.debug(f"Logging event log event: {embed.to_dict()}")
-
-        hook = await self.get_event_hook()
-        if hook is not None:
-            try:
-                await hook.send(embed=embed)
-            except discord.NotFound:
-                logger.info(
-                    f"Event log in <gid: {self.guildid}> invalidated. Recreating: {retry}"
-                )
-                hooked = self.eventlogger
-                if hooked is not None:
-                    await hooked.invalidate(hook)
-                    if retry:
-                        await self._log_event(embed, retry=False)
-            except discord.HTTPException:
-                logger.warning(
-                    f"Discord exception occurred sending event log event: {embed.to_dict()}.",
-                    exc_info=True
-                )
-            except Exception:
-                logger.exception(
-                    f"Unknown exception occurred sending event log event: {embed.to_dict()}."
-                )
-
     def log_event(self,
                   title: Optional[str]=None, description: Optional[str]=None,
                   timestamp: Optional[dt.datetime]=None,
@@ -269,6 +244,7 @@ class LionGuild(Timezoned):
         """
         Synchronously log an event to the guild event log.
 
+        The event is queued and sent shortly afterwards, along with any other recent events.
         Does nothing if the event log has not been set up.
 
         Parameters
@@ -346,7 +322,5 @@ class LionGuild(Timezoned):
                 name=error_name, value=error_value, inline=False
             )
 
-        # Send embed
-        task = asyncio.create_task(self._log_event(embed=base), name='event-log')
-        self._tasks.add(task)
-        task.add_done_callback(self._tasks.discard)
+        # Queue embed, to be sent with any other recent events
+        self._eventlog.put(base)
@@ -86,11 +86,24 @@ class LionMember(Timezoned):
     async def touch_discord_model(self, member: discord.Member):
         """
         Update saved Discord model attributes for this member.
+
+        Changes are written to data by the next write-behind flush.
         """
         if member.display_name != self.data.display_name:
-            await self.data.update(display_name=member.display_name)
-        else:
-            await self.data.refresh()
+            self.bot.core.lions.write_behind.update(self.data, display_name=member.display_name)
+
+    async def refresh_coins(self) -> int:
+        """
+        Reload the member's coin balance from data, and return it.
+
+        Only the coins column is read, so updates waiting in the write-behind buffer are kept.
+        """
+        rows = await self.data.table.select_where(
+            guildid=self.guildid, userid=self.userid
+        ).select('coins').with_no_adapter()
+        if rows:
+            self.data._update_data({'coins': rows[0]['coins']})
+        return self.data.coins
 
     async def fetch_member(self) -> Optional[discord.Member]:
         """
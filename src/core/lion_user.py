@@ -54,6 +54,8 @@ class LionUser(Timezoned):
     async def touch_discord_model(self, user: discord.User, seen=True):
         """
         Updated stored Discord model attributes for this user.
+
+        Changes are written to data by the next write-behind flush.
         """
         to_update = {}
 
@@ -68,4 +70,4 @@ class LionUser(Timezoned):
             to_update['last_seen'] = utc_now()
 
         if to_update:
-            await self.data.update(**to_update)
+            self.bot.core.lions.write_behind.update(self.data, **to_update)
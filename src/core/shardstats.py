@@ -0,0 +1,212 @@
+from typing import Optional
+from collections import Counter
+import asyncio
+import datetime
+import logging
+
+import discord
+
+from meta import LionCog, LionBot
+from meta.logger import log_wrap
+from meta.monitor import ComponentMonitor, ComponentStatus, StatusLevel
+from utils.lib import utc_now
+
+logger = logging.getLogger(__name__)
+
+
+class ShardStats(LionCog):
+    """
+    Statistics for the guilds on this shard, kept up to date from gateway events.
+
+    Counts are maintained incrementally so they may be read in constant time,
+    for example by the presence updater and the analytics snapshots.
+    Events which are not seen, such as members cached without joining,
+    are corrected by a full reconciliation pass every `reconcile_interval` seconds.
+
+    Member counts are the guild member counts reported by Discord,
+    while unique users are counted from the cached members.
+    Members in voice are counted over voice and stage channels, while `voice_channels` only counts voice channels.
+    """
+    reconcile_interval = 900
+
+    def __init__(self, bot: LionBot):
+        self.bot = bot
+
+        self.member_count = 0
+        self.in_voice = 0
+        self.voice_channels = 0
+        # userid -> number of guilds the user is cached in
+        self._user_guilds: Counter[int] = Counter()
+
+        # Total correction applied by the last reconciliation
+        self.drift = 0
+        self.reconciled_at: Optional[datetime.datetime] = None
+        self._reconcile_task: Optional[asyncio.Task] = None
+
+        self.monitor = ComponentMonitor('ShardStats', self._monitor)
+
+    @property
+    def guild_count(self) -> int:
+        return len(self.bot.guilds)
+
+    @property
+    def user_count(self) -> int:
+        return len(self._user_guilds)
+
+    async def _monitor(self):
+        state = (
+            "<"
+                "ShardStats"
+                " guilds={guilds}"
+                " members={members}"
+                " users={users}"
+                " in_voice={in_voice}"
+                " voice_channels={voice_channels}"
+                " drift={drift}"
+                " reconciled_at={reconciled_at}"
+                ">"
+        )
+        data = dict(
+            guilds=self.guild_count,
+            members=self.member_count,
+            users=self.user_count,
+            in_voice=self.in_voice,
+            voice_channels=self.voice_channels,
+            drift=self.drift,
+            reconciled_at=self.reconciled_at,
+        )
+        if self._reconcile_task is None or self._reconcile_task.done():
+            level = StatusLevel.WAITING
+            info = f"(WAITING) Statistics not yet reconciled. {state}"
+        else:
+            level = StatusLevel.OKAY
+            info = f"(OK) Shard statistics maintained. {state}"
+        return ComponentStatus(level, info, info, data)
+
+    async def cog_load(self):
+        self.bot.system_monitor.add_component(self.monitor)
+        if self.bot.is_ready():
+            self._start()
+
+    async def cog_unload(self):
+        if self._reconcile_task is not None and not self._reconcile_task.done():
+            self._reconcile_task.cancel()
+        self._reconcile_task = None
+
+    def _start(self):
+        if self._reconcile_task is None or self._reconcile_task.done():
+            self._reconcile_task = asyncio.create_task(self._reconciler(), name='shard-stats-reconcile')
+
+    @log_wrap(action='Reconcile Shard Stats')
+    async def _reconciler(self):
+        while True:
+            try:
+                self.reconcile()
+            except Exception:
+                logger.exception("Unexpected exception while reconciling shard statistics. Continuing.")
+            await asyncio.sleep(self.reconcile_interval)
+
+    # ----- Counting -----
+    @staticmethod
+    def _vocal_channels(guild: discord.Guild):
+        return (*guild.voice_channels, *guild.stage_channels)
+
+    def _guild_counts(self, guild: discord.Guild) -> tuple[int, int, int]:
+        """
+        Count the members, members in voice, and voice channels of the given guild.
+        """
+        channels = self._vocal_channels(guild)
+        return (
+            guild.member_count or 0,
+            sum(len(channel.voice_states) for channel in channels),
+            sum(1 for channel in channels if channel.type is discord.ChannelType.voice),
+        )
+
+    def _add_user(self, userid: int):
+        self._user_guilds[userid] += 1
+
+    def _remove_user(self, userid: int):
+        if (count := self._user_guilds.get(userid, 0)) > 1:
+            self._user_guilds[userid] = count - 1
+        else:
+            self._user_guilds.pop(userid, None)
+
+    def reconcile(self):
+        """
+        Recount every statistic from the client cache, recording the total correction in `drift`.
+        """
+        member_count = in_voice = voice_channels = 0
+        user_guilds = Counter()
+        for guild in self.bot.guilds:
+            members, voice, channels = self._guild_counts(guild)
+            member_count += members
+            in_voice += voice
+            voice_channels += channels
+            user_guilds.update(member.id for member in guild.members)
+
+        self.drift = (
+            abs(member_count - self.member_count)
+            + abs(in_voice - self.in_voice)
+            + abs(voice_channels - self.voice_channels)
+            + abs(len(user_guilds) - self.user_count)
+        )
+        if self.drift:
+            logger.debug(f"Corrected shard statistics drift of {self.drift}.")
+
+        self.member_count = member_count
+        self.in_voice = in_voice
+        self.voice_channels = voice_channels
+        self._user_guilds = user_guilds
+        self.reconciled_at = utc_now()
+
+    # ----- Event Handlers -----
+    @LionCog.listener('on_ready')
+    async def handle_ready(self):
+        self._start()
+
+    @LionCog.listener('on_guild_join')
+    async def handle_guild_join(self, guild: discord.Guild):
+        members, voice, channels = self._guild_counts(guild)
+        self.member_count += members
+        self.in_voice += voice
+        self.voice_channels += channels
+        for member in guild.members:
+            self._add_user(member.id)
+
+    @LionCog.listener('on_guild_remove')
+    async def handle_guild_remove(self, guild: discord.Guild):
+        members, voice, channels = self._guild_counts(guild)
+        self.member_count -= members
+        self.in_voice -= voice
+        self.voice_channels -= channels
+        for member in guild.members:
+            self._remove_user(member.id)
+
+    @LionCog.listener('on_member_join')
+    async def handle_member_join(self, member: discord.Member):
+        self.member_count += 1
+        self._add_user(member.id)
+
+    @LionCog.listener('on_raw_member_remove')
+    async def handle_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        self.member_count -= 1
+        if isinstance(payload.user, discord.Member):
+            # The member was cached, and counted as a user of the guild
+            self._remove_user(payload.user.id)
+
+    @LionCog.listener('on_voice_state_update')
+    async def handle_voice_state(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        if before.channel is None and after.channel is not None:
+            self.in_voice += 1
+        elif before.channel is not None and after.channel is None:
+            self.in_voice -= 1
+
+    @LionCog.listener('on_guild_channel_create')
+    async def handle_channel_create(self, channel: discord.abc.GuildChannel):
+        if channel.type is discord.ChannelType.voice:
+            self.voice_channels += 1
+
+    @LionCog.listener('on_guild_channel_delete')
+    async def handle_channel_delete(self, channel: discord.abc.GuildChannel):
+        if channel.type is discord.ChannelType.voice:
+            self.voice_channels -= 1
@@ -0,0 +1,161 @@
+from typing import Any, Optional, Type
+from collections import defaultdict
+import asyncio
+import logging
+
+from psycopg import sql
+
+from meta.logger import log_wrap
+from data import RowModel
+
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehind:
+    """
+    Write-behind buffer for low priority row updates which tolerate some staleness in data,
+    such as refreshing stored Discord names, avatars, and last seen times.
+
+    Updates are applied to the cached row immediately, and coalesced per row until the next flush,
+    which writes each model's pending updates with bulk `UPDATE ... FROM (VALUES ...)` statements.
+    Updates which fail to write are kept for the next flush, unless superseded.
+    """
+    # Maximum number of rows to write in a single statement
+    batch_size = 1000
+
+    def __init__(self, period: float):
+        self.period = period
+
+        # model -> rowid -> column -> value
+        self._pending: dict[Type[RowModel], dict[tuple, dict[str, Any]]] = defaultdict(dict)
+        self._lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+        # Statistics
+        self.writes = 0  # Requested row updates
+        self.absorbed = 0  # Requested row updates coalesced into an already pending update
+        self.written = 0  # Row updates written to data
+        self.flushes = 0
+        self.errors = 0
+
+    def __repr__(self):
+        return (
+            "<"
+                f"{self.__class__.__name__}"
+                f" period={self.period}"
+                f" pending={len(self)}"
+                f" writes={self.writes}"
+                f" absorbed={self.absorbed}"
+                f" written={self.written}"
+                f" flushes={self.flushes}"
+                f" errors={self.errors}"
+                ">"
+        )
+
+    def __len__(self):
+        return sum(len(rows) for rows in self._pending.values())
+
+    def update(self, row: RowModel, **values):
+        """
+        Set the given column values on the row, and schedule them to be written to data.
+        """
+        if not values:
+            return
+        row._update_data(values)
+        self.writes += 1
+        pending = self._pending[type(row)]
+        if (existing := pending.get(row._rowid_, None)) is not None:
+            existing.update(values)
+            self.absorbed += 1
+        else:
+            pending[row._rowid_] = dict(values)
+
+    def start(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flusher(), name='write-behind-flusher')
+
+    async def close(self):
+        """
+        Stop the periodic flush, and write any pending updates.
+        """
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+        await self.flush()
+
+    @log_wrap(action='Write Behind')
+    async def _flusher(self):
+        while True:
+            await asyncio.sleep(self.period)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Unexpected exception while flushing write-behind buffer. Continuing.")
+
+    async def flush(self) -> int:
+        """
+        Write every pending update to data.
+
+        Returns the number of rows written.
+        """
+        async with self._lock:
+            pending, self._pending = self._pending, defaultdict(dict)
+            written = 0
+            for model, rows in pending.items():
+                # Rows with the same updated columns are written together
+                groups: dict[tuple[str, ...], list[tuple]] = defaultdict(list)
+                for rowid, values in rows.items():
+                    groups[tuple(sorted(values))].append(rowid)
+                for columns, rowids in groups.items():
+                    for i in range(0, len(rowids), self.batch_size):
+                        batch = rowids[i:i+self.batch_size]
+                        values = [(*rowid, *(rows[rowid][col] for col in columns)) for rowid in batch]
+                        try:
+                            await self._write(model, columns, values)
+                        except Exception:
+                            self.errors += 1
+                            logger.exception(
+                                f"Failed to write {len(batch)} pending updates to {model.__name__}. Retrying next flush."
+                            )
+                            # Keep the failed updates, unless they were superseded while writing
+                            for rowid in batch:
+                                newer = self._pending[model].get(rowid, {})
+                                self._pending[model][rowid] = {**rows[rowid], **newer}
+                        else:
+                            written += len(batch)
+            self.written += written
+            self.flushes += 1
+            if written:
+                logger.debug(f"Write-behind buffer flushed {written} row updates.")
+            return written
+
+    async def _write(self, model: Type[RowModel], columns: tuple[str, ...], values: list[tuple]):
+        keys = model._key_
+        query = sql.SQL("""
+            UPDATE {table} AS target
+            SET
+                {assignments}
+            FROM
+                (VALUES {values})
+            AS
+                t ({columns})
+            WHERE
+                {conditions}
+        """).format(
+            table=model.table.identifier,
+            assignments=sql.SQL(', ').join(
+                sql.SQL("{} = t.{}").format(sql.Identifier(col), sql.Identifier(col)) for col in columns
+            ),
+            values=sql.SQL(', ').join(
+                sql.SQL("({})").format(sql.SQL(', ').join(sql.Placeholder() * (len(keys) + len(columns))))
+                for _ in values
+            ),
+            columns=sql.SQL(', ').join(sql.Identifier(col) for col in (*keys, *columns)),
+            conditions=sql.SQL(' AND ').join(
+                sql.SQL("target.{} = t.{}").format(sql.Identifier(key), sql.Identifier(key)) for key in keys
+            ),
+        )
+        async with model.table.connector.connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(query, tuple(value for row in values for value in row))
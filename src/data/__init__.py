@@ -1,9 +1,11 @@
 from .conditions import Condition, condition, NULL
 from .database import Database
 from .models import RowModel, RowTable, WeakCache
+from .compact import CompactRow
 from .table import Table
 from .base import Expression, RawExpr
 from .columns import ColumnExpr, Column, Integer, String
 from .registry import Registry, AttachableClass, Attachable
 from .adapted import RegisterEnum
-from .queries import ORDER, NULLS, JOINTYPE
+from .queries import ORDER, NULLS, JOINTYPE, RawQuery
+from .pipeline import Pipeline
@@ -0,0 +1,89 @@
+"""
+Bulk row ingestion through binary COPY into temporary staging tables.
+
+Sending many rows as a single `VALUES` list costs one placeholder per value,
+which psycopg must adapt and the server must parse and plan.
+Streaming the rows with `COPY ... FROM STDIN (FORMAT BINARY)` into a staging table,
+and then running a set-based statement from the staging table,
+is much cheaper for large batches, at the price of a few extra statements.
+"""
+from typing import Any, Iterable, Optional, Sequence
+import logging
+
+from psycopg import AsyncCursor, sql, pq, ProgrammingError
+
+logger = logging.getLogger(__name__)
+
+
+# Cache of column type oids by key, or None if the types cannot be dumped in binary
+_type_cache: dict[Any, Optional[list[int]]] = {}
+
+
+async def column_types(cursor: AsyncCursor, source: sql.Composable, columns: Sequence[str],
+                       key: Optional[Any] = None) -> Optional[list[int]]:
+    """
+    Retrieve the type oids of the given columns of the given table.
+
+    Returns None if any column type has no binary dumper on this connection,
+    in which case COPY cannot be used and the caller should fall back to another method.
+    The result is cached under `key`, by default the source and columns.
+    """
+    key = key if key is not None else (source.as_string(cursor), tuple(columns))
+    if key in _type_cache:
+        return _type_cache[key]
+
+    await cursor.execute(
+        sql.SQL("SELECT {columns} FROM {source} LIMIT 0").format(
+            columns=sql.SQL(', ').join(map(sql.Identifier, columns)),
+            source=source
+        )
+    )
+    types = [column.type_code for column in cursor.description]
+    try:
+        for oid in types:
+            cursor.adapters.get_dumper_by_oid(oid, pq.Format.BINARY)
+    except ProgrammingError:
+        logger.info(
+            f"Cannot use binary COPY for columns {columns} of {key}, types {types} have no binary dumper."
+        )
+        types = None
+    _type_cache[key] = types
+    return types
+
+
+async def copy_rows(cursor: AsyncCursor, target: sql.Composable, columns: Sequence[str],
+                    types: list[int], rows: Iterable[Sequence[Any]]):
+    """
+    Stream the given rows into the given columns of `target` with binary COPY.
+    """
+    query = sql.SQL("COPY {target} ({columns}) FROM STDIN (FORMAT BINARY)").format(
+        target=target,
+        columns=sql.SQL(', ').join(map(sql.Identifier, columns))
+    )
+    async with cursor.copy(query) as copy:
+        copy.set_types(types)
+        for row in rows:
+            await copy.write_row(row)
+
+
+async def stage_like(cursor: AsyncCursor, staging: sql.Identifier, source: sql.Composable,
+                     columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> bool:
+    """
+    Create a temporary staging table with the given columns of `source`, and COPY the rows into it.
+
+    Must be called inside a transaction, as the staging table is dropped on commit.
+    Returns False without staging if the column types do not support binary COPY.
+    """
+    types = await column_types(cursor, source, columns)
+    if types is None:
+        return False
+
+    await cursor.execute(
+        sql.SQL("CREATE TEMPORARY TABLE {staging} ON COMMIT DROP AS SELECT {columns} FROM {source} WITH NO DATA").format(
+            staging=staging,
+            columns=sql.SQL(', ').join(map(sql.Identifier, columns)),
+            source=source
+        )
+    )
+    await copy_rows(cursor, staging, columns, types, rows)
+    return True
@@ -113,6 +113,8 @@ class Column(ColumnExpr, Generic[T]):
         self.name: str = name  # type: ignore
         self.owner: Optional['RowModel'] = None
         self._type = type
+        # Position in the CompactRow of the owner, if the owner is compact
+        self.index: Optional[int] = None
 
         self.expr = sql.Identifier(name) if name else sql.SQL('')
         self.values = ()
@@ -135,8 +137,10 @@ class Column(ColumnExpr, Generic[T]):
         # Get value from row data or session
         if obj is None:
             return self
-        else:
-            return obj.data[self.name]
+        data = obj.data
+        if self.index is not None and data.__class__ is self.owner._row_class_:
+            return tuple.__getitem__(data, self.index)
+        return data[self.name]
 
 
 class Integer(Column[int]):
@@ -0,0 +1,118 @@
+"""
+Compact tuple-backed row storage for RowModels.
+
+A psycopg `DictRow` is a full dict per row, which is a significant overhead
+for models cached by the tens of thousands.
+Models with `_compact_` set instead store each row as a `CompactRow`,
+a tuple of the column values in model column order,
+built directly from the tuple of values returned by the cursor.
+Column descriptors read values by their precomputed index,
+and rows still support the read-only dict interface by column name.
+"""
+from typing import Any, Sequence, Type, TYPE_CHECKING
+
+from psycopg.rows import dict_row, no_result
+
+if TYPE_CHECKING:
+    from psycopg import BaseCursor
+    from psycopg.rows import RowMaker
+    from .models import RowModel
+
+
+class CompactRow(tuple):
+    """
+    Immutable row of column values, addressable by column name or position.
+
+    Subclassed for each compact model with the class attributes `_names_` and `_index_`,
+    giving the column names and the name -> position map.
+    Iterating over a row yields the column names, as for a dict.
+    """
+    __slots__ = ()
+
+    _names_: tuple[str, ...] = ()
+    _index_: dict[str, int] = {}
+
+    def __getitem__(self, key):
+        if key.__class__ is str:
+            return tuple.__getitem__(self, self._index_[key])
+        return tuple.__getitem__(self, key)
+
+    def __iter__(self):
+        return iter(self._names_)
+
+    def __contains__(self, key):
+        return key in self._index_
+
+    def __repr__(self):
+        return "{}({})".format(
+            self.__class__.__name__,
+            ', '.join(f"{name}={value!r}" for name, value in self.items())
+        )
+
+    def get(self, key, default=None):
+        if key in self._index_:
+            return tuple.__getitem__(self, self._index_[key])
+        return default
+
+    def keys(self):
+        return self._names_
+
+    def values(self):
+        return tuple(tuple.__iter__(self))
+
+    def items(self):
+        return zip(self._names_, tuple.__iter__(self))
+
+    def replace(self, values: dict[str, Any]) -> 'CompactRow':
+        """
+        Return a copy of this row with the given column values replaced.
+        """
+        row = list(tuple.__iter__(self))
+        index = self._index_
+        for key, value in values.items():
+            row[index[key]] = value
+        return tuple.__new__(self.__class__, row)
+
+    @classmethod
+    def for_columns(cls, name: str, columns: Sequence[str]) -> Type['CompactRow']:
+        """
+        Create the row class for the given columns.
+        """
+        return type(name, (cls,), {
+            '__slots__': (),
+            '_names_': tuple(columns),
+            '_index_': {column: i for i, column in enumerate(columns)},
+        })
+
+
+def compact_row(model: Type['RowModel']):
+    """
+    Create a psycopg row factory building the `CompactRow` class of the given model.
+
+    Results whose columns are not exactly the model columns,
+    for example selections of particular columns or expressions,
+    fall back to ordinary dict rows.
+    """
+    row_class = model._row_class_
+    names = row_class._names_
+    # Column positions in the result for each result column order seen
+    orders: dict[tuple[str, ...], tuple[int, ...]] = {}
+
+    def factory(cursor: 'BaseCursor') -> 'RowMaker':
+        description = cursor.description
+        if description is None:
+            return no_result
+
+        result_names = tuple(column.name for column in description)
+        if result_names == names:
+            return row_class
+        if (positions := orders.get(result_names, None)) is None:
+            if len(result_names) != len(names) or set(result_names) != set(names):
+                return dict_row(cursor)
+            positions = orders[result_names] = tuple(result_names.index(name) for name in names)
+
+        def make_row(values: Sequence[Any]) -> CompactRow:
+            return tuple.__new__(row_class, [values[i] for i in positions])
+        return make_row
+
+    return factory
@@ -1,5 +1,6 @@
 from typing import Protocol, runtime_checkable, Callable, Awaitable, Optional
 import logging
+import time
 
 from contextvars import ContextVar
 from contextlib import asynccontextmanager
@@ -8,6 +9,8 @@ from psycopg_pool import AsyncConnectionPool
 from psycopg.pq import TransactionStatus
 
 from .cursor import AsyncLoggingCursor
+from .shapes import ShapeCache
+from .metrics import QueryMetrics, LatencyHistogram
 
 logger = logging.getLogger(__name__)
 
@@ -15,18 +18,53 @@ row_factory = psq.rows.dict_row
 
 ctx_connection: Optional[ContextVar[psq.AsyncConnection]] = ContextVar('connection', default=None)
 
+# Pool lane to request connections from when no lane is given, defaulting to the connector default lane
+ctx_lane: ContextVar[Optional[str]] = ContextVar('lane', default=None)
+
 
 class Connector:
     cursor_factory = AsyncLoggingCursor
 
-    def __init__(self, conn_args):
+    # Pool lanes as name -> (min_size, max_size), the first lane is the default
+    default_lanes = {
+        'interactive': (4, 8),
+        'background': (1, 4),
+    }
+
+    def __init__(self, conn_args, shape_cache_size: int = 512, prepare_threshold: Optional[int] = 5,
+                 metrics: Optional[QueryMetrics] = None, lanes: Optional[dict[str, tuple[int, int]]] = None):
         self._conn_args = conn_args
-        self._conn_kwargs = dict(autocommit=True, row_factory=row_factory, cursor_factory=self.cursor_factory)
 
-        self.pool = self.make_pool()
+        # Query latency instrumentation, recorded by the cursors of this connector
+        self.metrics = metrics
+        cursor_factory = self.cursor_factory
+        if metrics is not None:
+            cursor_factory = cursor_factory.with_metrics(metrics)
+        self._conn_kwargs = dict(autocommit=True, row_factory=row_factory, cursor_factory=cursor_factory)
+
+        # Rendered query text for repeated query shapes, see ShapeCache
+        self.shapes: Optional[ShapeCache] = None
+        if shape_cache_size:
+            self.shapes = ShapeCache(shape_cache_size, prepare_threshold)
+
+        # Separate connection pools for each workload, so long background transactions cannot starve the others
+        self.lanes = dict(lanes or self.default_lanes)
+        if not self.lanes:
+            raise ValueError("Connector requires at least one pool lane.")
+        self.default_lane = next(iter(self.lanes))
+        self.pools: dict[str, AsyncConnectionPool] = {lane: self.make_pool(lane) for lane in self.lanes}
+        # Time spent waiting for a connection from each lane
+        self.wait_times: dict[str, LatencyHistogram] = {lane: LatencyHistogram() for lane in self.lanes}
 
         self.conn_hooks = []
 
+    @property
+    def pool(self) -> AsyncConnectionPool:
+        """
+        The connection pool of the default lane.
+        """
+        return self.pools[self.default_lane]
+
     @property
     def conn(self) -> Optional[psq.AsyncConnection]:
         """
@@ -42,40 +80,64 @@ class Connector:
         """
         ctx_connection.set(conn)
 
-    def make_pool(self) -> AsyncConnectionPool:
-        logger.info("Initialising connection pool.", extra={'action': "Pool Init"})
+    def set_lane(self, lane: Optional[str]):
+        """
+        Set the pool lane used for connections requested in the current context.
+        Always do this in an isolated context, e.g. a dedicated task!
+        """
+        ctx_lane.set(lane)
+
+    def _resolve_lane(self, lane: Optional[str]) -> str:
+        lane = lane or ctx_lane.get() or self.default_lane
+        if lane not in self.pools:
+            logger.warning(f"Unknown pool lane '{lane}' requested, using the default lane.")
+            lane = self.default_lane
+        return lane
+
+    def make_pool(self, lane: Optional[str] = None) -> AsyncConnectionPool:
+        lane = lane or self.default_lane
+        min_size, max_size = self.lanes[lane]
+        logger.info(
+            f"Initialising connection pool for lane '{lane}' with sizes ({min_size}, {max_size}).",
+            extra={'action': "Pool Init"}
+        )
         return AsyncConnectionPool(
             self._conn_args,
             open=False,
-            min_size=4,
-            max_size=8,
+            min_size=min_size,
+            max_size=max_size,
             configure=self._setup_connection,
-            kwargs=self._conn_kwargs
+            kwargs=self._conn_kwargs,
+            name=lane,
         )
 
-    async def refresh_pool(self):
+    async def refresh_pool(self, lane: Optional[str] = None):
         """
-        Refresh the pool.
+        Refresh the pool of the given lane, or of every lane if not given.
 
         The point of this is to invalidate any existing connections so that the connection set up is run again.
         Better ways should be sought (a way to 
         """
-        logger.info("Pool refresh requested, closing and reopening.")
-        old_pool = self.pool
-        self.pool = self.make_pool()
-        await self.pool.open()
-        logger.info(f"Old pool statistics: {self.pool.get_stats()}")
-        await old_pool.close()
+        lanes = (lane,) if lane is not None else tuple(self.pools)
+        for lane in lanes:
+            logger.info(f"Pool refresh requested for lane '{lane}', closing and reopening.")
+            old_pool = self.pools[lane]
+            self.pools[lane] = self.make_pool(lane)
+            await self.pools[lane].open()
+            logger.info(f"Old pool statistics: {old_pool.get_stats()}")
+            await old_pool.close()
         logger.info("Pool refresh complete.")
 
     async def map_over_pool(self, callable):
         """
-        Dangerous method to call a method on each connection in the pool.
+        Dangerous method to call a method on each connection in the pool of every lane.
 
         Utilises private methods of the AsyncConnectionPool.
         """
-        async with self.pool._lock:
-            conns = list(self.pool._pool)
+        conns = []
+        for pool in self.pools.values():
+            async with pool._lock:
+                conns.extend(pool._pool)
         while conns:
             conn = conns.pop()
             try:
@@ -83,32 +145,77 @@ class Connector:
             except Exception:
                 logger.exception(f"Mapped connection task failed. {callable.__name__}")
 
+    def pool_stats(self) -> dict[str, dict]:
+        """
+        Statistics for the pool of each lane, including the connection wait time quantiles.
+        """
+        stats = {}
+        for lane, pool in self.pools.items():
+            waits = self.wait_times[lane]
+            pool_stats = pool.get_stats()
+            stats[lane] = {
+                'size': pool_stats.get('pool_size', 0),
+                'available': pool_stats.get('pool_available', 0),
+                'waiting': pool_stats.get('requests_waiting', 0),
+                'requests': waits.count,
+                'wait_p50': f"{waits.quantile(0.5) * 1000:.1f}ms",
+                'wait_p99': f"{waits.quantile(0.99) * 1000:.1f}ms",
+                'wait_max': f"{waits.max * 1000:.1f}ms",
+            }
+        return stats
+
     @asynccontextmanager
     async def open(self):
         try:
-            logger.info("Opening database pool.")
-            await self.pool.open()
+            logger.info("Opening database pools.")
+            for pool in self.pools.values():
+                await pool.open()
             yield
         finally:
-            # May be a different pool!
-            logger.info(f"Closing database pool. Pool statistics: {self.pool.get_stats()}")
-            await self.pool.close()
+            # May be different pools!
+            for lane, pool in self.pools.items():
+                logger.info(f"Closing database pool for lane '{lane}'. Pool statistics: {pool.get_stats()}")
+                await pool.close()
 
     @asynccontextmanager
-    async def connection(self) -> psq.AsyncConnection:
+    async def connection(self, lane: Optional[str] = None) -> psq.AsyncConnection:
         """
         Asynchronous context manager to get and manage a connection.
 
         If the context connection is set, uses this and does not manage the lifetime.
-        Otherwise, requests a new connection from the pool and returns it when done.
+        Otherwise, requests a new connection from the pool of the given lane,
+        or the context lane, and returns it when done.
         """
         logger.debug("Database connection requested.", extra={'action': "Data Connect"})
         if (conn := self.conn):
             yield conn
         else:
-            async with self.pool.connection() as conn:
+            lane = self._resolve_lane(lane)
+            start = time.perf_counter()
+            async with self.pools[lane].connection() as conn:
+                self.wait_times[lane].record(time.perf_counter() - start)
                 yield conn
 
+    @asynccontextmanager
+    async def pipeline(self, lane: Optional[str] = None):
+        """
+        Asynchronous context manager providing a Pipeline to queue independent queries.
+
+        The queued queries are sent together when the context exits,
+        on the context connection if set, or on a single connection from the given lane.
+        Their futures may be awaited after the context exits.
+        """
+        from .pipeline import Pipeline
+
+        pipe = Pipeline(self, lane=lane)
+        try:
+            yield pipe
+        except BaseException:
+            pipe.cancel()
+            raise
+        else:
+            await pipe.flush()
+
     async def _setup_connection(self, conn: psq.AsyncConnection):
         logger.debug("Initialising new connection.", extra={'action': "Conn Init"})
         for hook in self.conn_hooks:
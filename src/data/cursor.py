@@ -1,14 +1,28 @@
 import logging
+import time
 from typing import Optional
 
 from psycopg import AsyncCursor, sql
 from psycopg.abc import Query, Params
 from psycopg._encodings import pgconn_encoding
 
+from .metrics import QueryMetrics
+
 logger = logging.getLogger(__name__)
 
 
 class AsyncLoggingCursor(AsyncCursor):
+    # Latency metrics to record executions into, if any
+    metrics: Optional[QueryMetrics] = None
+    _metrics_key = None
+
+    @classmethod
+    def with_metrics(cls, metrics: QueryMetrics):
+        """
+        Create a cursor factory recording its executions into the given QueryMetrics.
+        """
+        return type(cls.__name__, (cls,), {'metrics': metrics})
+
     def mogrify_query(self, query: Query):
         if isinstance(query, str):
             msg = query
@@ -28,7 +42,14 @@ class AsyncLoggingCursor(AsyncCursor):
                 extra={'action': "Query Execute"}
             )
         try:
-            return await super().execute(query, params=params, **kwargs)
+            if self.metrics is not None:
+                self._metrics_key = query if isinstance(query, (str, bytes)) else self.mogrify_query(query)
+                start = time.perf_counter()
+                result = await super().execute(query, params=params, **kwargs)
+                self.metrics.record_execute(self._metrics_key, params, time.perf_counter() - start)
+                return result
+            else:
+                return await super().execute(query, params=params, **kwargs)
         except Exception:
             msg = self.mogrify_query(query)
             logger.exception(
@@ -37,6 +58,27 @@ class AsyncLoggingCursor(AsyncCursor):
                 extra={'action': "Query Execute"},
                 stack_info=True
             )
-        else:
-            # TODO: Possibly log execution time
-            pass
+
+    async def fetchone(self):
+        if self.metrics is None:
+            return await super().fetchone()
+        start = time.perf_counter()
+        result = await super().fetchone()
+        self.metrics.record_fetch(self._metrics_key, time.perf_counter() - start)
+        return result
+
+    async def fetchmany(self, *args, **kwargs):
+        if self.metrics is None:
+            return await super().fetchmany(*args, **kwargs)
+        start = time.perf_counter()
+        result = await super().fetchmany(*args, **kwargs)
+        self.metrics.record_fetch(self._metrics_key, time.perf_counter() - start)
+        return result
+
+    async def fetchall(self):
+        if self.metrics is None:
+            return await super().fetchall()
+        start = time.perf_counter()
+        result = await super().fetchall()
+        self.metrics.record_fetch(self._metrics_key, time.perf_counter() - start)
+        return result
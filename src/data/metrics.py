@@ -0,0 +1,202 @@
+from typing import Any, Callable, Optional, Hashable
+from collections import OrderedDict, deque
+from bisect import bisect_left
+import datetime as dt
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket histogram of latencies, in seconds.
+
+    Recording is a single bisection and counter increment.
+    Quantiles are estimated as the upper bound of the containing bucket.
+    """
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    # Bucket upper bounds, in seconds. The final bucket is unbounded.
+    bounds = (
+        0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5
+    )
+
+    def __init__(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, duration: float):
+        self.counts[bisect_left(self.bounds, duration)] += 1
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+
+class QueryStats:
+    """
+    Execution and fetch latency histograms for a single query shape or action.
+    """
+    __slots__ = ('label', 'execute', 'fetch')
+
+    def __init__(self, label: str):
+        self.label = label
+        self.execute = LatencyHistogram()
+        self.fetch = LatencyHistogram()
+
+    def summary(self) -> str:
+        return (
+            f"n={self.execute.count} "
+            f"total={self.execute.total + self.fetch.total:.2f}s "
+            f"p50={self.execute.quantile(0.5) * 1000:.1f}ms "
+            f"p99={self.execute.quantile(0.99) * 1000:.1f}ms "
+            f"max={self.execute.max * 1000:.1f}ms "
+            f"fetch_p99={self.fetch.quantile(0.99) * 1000:.1f}ms"
+        )
+
+
+class SlowQuery:
+    __slots__ = ('query', 'params', 'duration', 'actions', 'created_at')
+
+    def __init__(self, query: str, params, duration: float, actions: tuple[str, ...]):
+        self.query = query
+        self.params = params
+        self.duration = duration
+        self.actions = actions
+        self.created_at = dt.datetime.now(tz=dt.timezone.utc)
+
+    def __str__(self):
+        return (
+            f"[{self.created_at:%H:%M:%S}] {self.duration * 1000:.1f}ms "
+            f"in {' > '.join(self.actions) or 'unknown'}: {self.query}"
+        )
+
+
+class QueryMetrics:
+    """
+    Latency instrumentation for queries executed through an AsyncLoggingCursor.
+
+    Latencies are recorded per query shape, keyed on the query text,
+    and per innermost logging action, obtained from `action_getter`.
+    The number of tracked shapes is bounded, discarding the least recently executed.
+    Executions slower than `slow_threshold` seconds are logged and kept in a ring buffer.
+    """
+
+    def __init__(self,
+                 slow_threshold: Optional[float] = 0.5,
+                 max_shapes: int = 512,
+                 slow_log_size: int = 100,
+                 action_getter: Callable[[], tuple[str, ...]] = tuple):
+        self.slow_threshold = slow_threshold
+        self.max_shapes = max_shapes
+        self.action_getter = action_getter
+
+        self.shapes: OrderedDict[Hashable, QueryStats] = OrderedDict()
+        self.actions: dict[Optional[str], QueryStats] = {}
+        self.slow: deque[SlowQuery] = deque(maxlen=slow_log_size)
+
+    @staticmethod
+    def _label(query: Any) -> str:
+        if isinstance(query, bytes):
+            query = query.decode('utf-8', 'replace')
+        return ' '.join(str(query).split())
+
+    def _shape_stats(self, key: Hashable) -> QueryStats:
+        stats = self.shapes.get(key, None)
+        if stats is None:
+            stats = self.shapes[key] = QueryStats(self._label(key))
+            if len(self.shapes) > self.max_shapes:
+                self.shapes.popitem(last=False)
+        else:
+            self.shapes.move_to_end(key)
+        return stats
+
+    def _action_stats(self, action: Optional[str]) -> QueryStats:
+        stats = self.actions.get(action, None)
+        if stats is None:
+            stats = self.actions[action] = QueryStats(action or 'unknown')
+        return stats
+
+    def record_execute(self, key: Hashable, params, duration: float):
+        actions = self.action_getter()
+        action = actions[-1] if actions else None
+        self._shape_stats(key).execute.record(duration)
+        self._action_stats(action).execute.record(duration)
+
+        if self.slow_threshold is not None and duration >= self.slow_threshold:
+            entry = SlowQuery(self._label(key), params, duration, actions)
+            self.slow.append(entry)
+            logger.warning(
+                f"Slow query took {duration * 1000:.1f}ms. Query ({entry.query}) with values {params}",
+                extra={'action': "Slow Query"}
+            )
+
+    def record_fetch(self, key: Hashable, duration: float):
+        if (stats := self.shapes.get(key, None)) is not None:
+            stats.fetch.record(duration)
+        actions = self.action_getter()
+        self._action_stats(actions[-1] if actions else None).fetch.record(duration)
+
+    def top_shapes(self, count: int = 10) -> list[QueryStats]:
+        """
+        The `count` shapes with the highest total time spent.
+        """
+        return sorted(
+            self.shapes.values(),
+            key=lambda stats: stats.execute.total + stats.fetch.total,
+            reverse=True
+        )[:count]
+
+    def top_actions(self, count: int = 10) -> list[QueryStats]:
+        """
+        The `count` actions with the highest total time spent.
+        """
+        return sorted(
+            self.actions.values(),
+            key=lambda stats: stats.execute.total + stats.fetch.total,
+            reverse=True
+        )[:count]
+
+    def stats(self) -> dict[str, Any]:
+        executions = sum(stats.execute.count for stats in self.actions.values())
+        total = sum(stats.execute.total for stats in self.actions.values())
+        return {
+            'executions': executions,
+            'total_time': f"{total:.2f}s",
+            'shapes': len(self.shapes),
+            'slow': len(self.slow),
+        }
+
+    def report(self, count: int = 10) -> str:
+        """
+        Multi-line report of the slowest shapes, actions, and the recent slow query log.
+        """
+        lines = ["# Actions"]
+        lines.extend(f"{stats.label}: {stats.summary()}" for stats in self.top_actions(count))
+        lines.append("\n# Query Shapes")
+        lines.extend(f"{stats.summary()}\n    {stats.label[:300]}" for stats in self.top_shapes(count))
+        lines.append("\n# Slow Queries")
+        lines.extend(str(entry)[:500] for entry in list(self.slow)[-count:])
+        return '\n'.join(lines)
+
+    def reset(self):
+        self.shapes.clear()
+        self.actions.clear()
+        self.slow.clear()
@@ -1,12 +1,13 @@
-from typing import TypeVar, Type, Optional, Generic, Union
+from typing import TypeVar, Type, Optional, Generic, Union, AsyncIterator
 # from typing_extensions import Self
 from weakref import WeakValueDictionary
 from collections.abc import MutableMapping
 
-from psycopg.rows import DictRow
+from psycopg.rows import DictRow, RowFactory
 
 from .table import Table
 from .columns import Column
+from .compact import CompactRow, compact_row
 from . import queries as q
 from .connector import Connector
 from .registry import Registry
@@ -43,6 +44,10 @@ class RowTable(Table, Generic[RowT]):
     def row_cache(self):
         return self.model._cache_
 
+    @property
+    def row_factory(self) -> Optional[RowFactory]:
+        return self.model._row_factory_
+
     def _many_query_adapter(self, *data):
         self.model._make_rows(*data)
         return data
@@ -68,9 +73,22 @@ class RowTable(Table, Generic[RowT]):
         return q.Select(
             self.identifier,
             row_adapter=self.model._make_rows,
+            row_factory=self.row_factory,
             connector=self.connector
         ).where(*args, **kwargs)
 
+    async def stream_rows_where(self, *args, batch: int = 1000, cache: bool = False,
+                                **kwargs) -> AsyncIterator[list[RowT]]:
+        """
+        Iterate over the rows matching the given conditions in batches, paging on the primary key.
+
+        Unless `cache` is set, rows not already in the row cache are returned detached,
+        so they are released as soon as the caller drops them.
+        """
+        adapter = self.model._make_rows if cache else self.model._make_detached_rows
+        async for data in self.stream_where(*args, key=self.id_col, batch=batch, **kwargs):
+            yield adapter(*data)
+
 
 WK = TypeVar('WK')
 WV = TypeVar('WV')
@@ -133,6 +151,12 @@ class RowModel:
     _cache_: Union[dict, WeakValueDictionary, WeakCache] = None  # type: ignore
 
     _key_: tuple[str, ...] = ()
+
+    # Whether to store row data as a CompactRow instead of a DictRow, see `data.compact`
+    _compact_: bool = False
+    _row_class_: Optional[Type[CompactRow]] = None
+    _row_factory_: Optional[RowFactory] = None
+
     _connector: Optional[Connector] = None
     _registry: Optional[Registry] = None
 
@@ -155,6 +179,13 @@ class RowModel:
             cls._columns_ = columns
             if not cls._key_:
                 cls._key_ = tuple(column.name for column in columns.values() if column.primary)
+            if cls._compact_:
+                cls._row_class_ = CompactRow.for_columns(
+                    f"{cls.__name__}Row", [column.name for column in columns.values()]
+                )
+                for i, column in enumerate(columns.values()):
+                    column.index = i
+                cls._row_factory_ = compact_row(cls)
             cls.table = RowTable(cls._tablename_, cls, schema=cls._schema_)
             if cls._cache_ is None:
                 cls._cache_ = WeakValueDictionary()
@@ -187,7 +218,16 @@ class RowModel:
         return self.data[key]
 
     def __setitem__(self, key, value):
-        self.data[key] = value
+        self._update_data({key: value})
+
+    def _update_data(self, values: dict):
+        """
+        Set the given column values on the local row data, without writing them to the database.
+        """
+        if isinstance(self.data, CompactRow):
+            self.data = self.data.replace(values)
+        else:
+            self.data.update(values)
 
     @classmethod
     def bind(cls, connector: Connector):
@@ -235,6 +275,22 @@ class RowModel:
         rows = [cls(data_row) for data_row in data_rows]
         return rows
 
+    @classmethod
+    def _make_detached_rows(cls: Type[RowT], *data_rows: DictRow) -> list[RowT]:
+        """
+        Create Row objects for each provided data row, without adding them to the row cache.
+        Rows which already exist in cache are updated and returned as in `_make_rows`.
+        """
+        cache = cls._cache_
+        rows = []
+        for data_row in data_rows:
+            row = cache.get(cls._id_from_data(data_row), None)
+            if row is None:
+                row = object.__new__(cls)
+            row.__init__(data_row)
+            rows.append(row)
+        return rows
+
     @classmethod
     def _delete_rows(cls, *data_rows):
         """
@@ -255,6 +311,11 @@ class RowModel:
     def fetch_where(cls: Type[RowT], *args, **kwargs):
         return cls.table.fetch_rows_where(*args, **kwargs)
 
+    @classmethod
+    def stream_where(cls: Type[RowT], *args, batch: int = 1000, cache: bool = False,
+                     **kwargs) -> AsyncIterator[list[RowT]]:
+        return cls.table.stream_rows_where(*args, batch=batch, cache=cache, **kwargs)
+
     @classmethod
     async def fetch(cls: Type[RowT], *rowid, cached=True) -> Optional[RowT]:
         """
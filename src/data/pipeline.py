@@ -0,0 +1,113 @@
+from typing import TYPE_CHECKING, Optional
+import asyncio
+import logging
+
+import psycopg as psq
+
+from .queries import Query, QueryResult
+
+if TYPE_CHECKING:
+    from .connector import Connector
+
+logger = logging.getLogger(__name__)
+
+
+class Pipeline:
+    """
+    Queue of independent queries to be sent to the database together.
+
+    Queries are queued with `add`, which returns a future for the adapted query result.
+    On `flush`, every queued query is sent on a single connection in psycopg pipeline mode,
+    so the batch costs one network round trip instead of one per query.
+    If the libpq in use does not support pipeline mode, the queries are executed sequentially instead.
+
+    Queries in a batch are not atomic.
+    If one query fails, its future receives the exception,
+    and the following queries in the batch fail with `PipelineAborted`.
+
+    Usually created through `Connector.pipeline`.
+    """
+
+    def __init__(self, connector: 'Connector', lane: Optional[str] = None):
+        self.connector = connector
+        self.lane = lane
+        self._queue: list[tuple[Query, asyncio.Future]] = []
+
+    def __len__(self):
+        return len(self._queue)
+
+    def add(self, query: Query[QueryResult]) -> 'asyncio.Future[QueryResult]':
+        """
+        Queue the given query, returning a future which resolves to its result after the next flush.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((query, future))
+        return future
+
+    def cancel(self):
+        """
+        Discard the queued queries, cancelling their futures.
+        """
+        queue, self._queue = self._queue, []
+        for _, future in queue:
+            future.cancel()
+
+    async def flush(self):
+        """
+        Send every queued query and resolve their futures.
+        """
+        queue, self._queue = self._queue, []
+        if not queue:
+            return
+
+        async with self.connector.connection(lane=self.lane) as conn:
+            if len(queue) > 1 and psq.Pipeline.is_supported():
+                await self._flush_pipelined(conn, queue)
+            else:
+                await self._flush_sequential(conn, queue)
+
+    async def _flush_sequential(self, conn: psq.AsyncConnection, queue):
+        for query, future in queue:
+            try:
+                async with conn.cursor() as cursor:
+                    result = await query._execute(cursor)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    async def _flush_pipelined(self, conn: psq.AsyncConnection, queue):
+        cursors = []
+        try:
+            async with conn.pipeline() as pipeline:
+                for query, _ in queue:
+                    cursor = conn.cursor()
+                    cursors.append(cursor)
+                    await query._send(cursor)
+                try:
+                    await pipeline.sync()
+                except psq.Error:
+                    # Raised again on the cursor of the failed query
+                    pass
+                for (query, future), cursor in zip(queue, cursors):
+                    try:
+                        result = await query._receive(cursor)
+                    except Exception as e:
+                        if not future.done():
+                            future.set_exception(e)
+                    else:
+                        if not future.done():
+                            future.set_result(result)
+        except Exception as e:
+            logger.exception(
+                f"Unexpected exception while flushing pipeline of {len(queue)} queries.",
+                extra={'action': "Pipeline Flush"}
+            )
+            for _, future in queue:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            for cursor in cursors:
+                await cursor.close()
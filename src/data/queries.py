@@ -1,15 +1,16 @@
-from typing import Optional, TypeVar, Any, Callable, Generic, List, Union
+from typing import Optional, TypeVar, Any, Callable, Generic, List, Union, AsyncIterator
 from enum import Enum
-from itertools import chain
+from itertools import chain, count
 from psycopg import AsyncConnection, AsyncCursor
 from psycopg import sql
-from psycopg.rows import DictRow
+from psycopg.rows import DictRow, RowFactory
 
 import logging
 
 from .conditions import Condition
 from .base import Expression, RawExpr
 from .connector import Connector
+from .bulk import stage_like
 
 
 logger = logging.getLogger(__name__)
@@ -20,16 +21,21 @@ SQueryT = TypeVar('SQueryT', bound='Select')
 
 QueryResult = TypeVar('QueryResult')
 
+# Unique suffixes for COPY staging tables, in case several are created in one transaction
+_staging_ids = count()
+# Unique names for server-side cursors opened by `Select.stream`
+_cursor_ids = count()
+
 
 class Query(Generic[QueryResult]):
     """
     ABC for an executable query statement.
     """
-    __slots__ = ('conn', 'cursor', '_adapter', 'connector', 'result')
+    __slots__ = ('conn', 'cursor', '_adapter', 'connector', 'result', 'lane', 'row_factory')
 
     _adapter: Callable[..., QueryResult]
 
-    def __init__(self, *args, row_adapter=None, connector=None, conn=None, cursor=None, **kwargs):
+    def __init__(self, *args, row_adapter=None, row_factory=None, connector=None, conn=None, cursor=None, **kwargs):
         self.connector: Optional[Connector] = connector
         self.conn: Optional[AsyncConnection] = conn
         self.cursor: Optional[AsyncCursor] = cursor
@@ -40,11 +46,22 @@ class Query(Generic[QueryResult]):
             self._adapter = self._no_adapter
 
         self.result: Optional[QueryResult] = None
+        self.lane: Optional[str] = None
+        # Row factory for the results, overriding the connection row factory
+        self.row_factory: Optional[RowFactory] = row_factory
 
     def bind(self, connector: Connector):
         self.connector = connector
         return self
 
+    def in_lane(self, lane: str):
+        """
+        Execute the query on a connection from the given connector pool lane.
+        Has no effect if a cursor or connection is provided.
+        """
+        self.lane = lane
+        return self
+
     def with_cursor(self, cursor: AsyncCursor):
         self.cursor = cursor
         return self
@@ -53,6 +70,13 @@ class Query(Generic[QueryResult]):
         self.conn = conn
         return self
 
+    def with_row_factory(self, row_factory: Optional[RowFactory]):
+        """
+        Build the result rows with the given psycopg row factory instead of the connection row factory.
+        """
+        self.row_factory = row_factory
+        return self
+
     def _no_adapter(self, *data: DictRow) -> tuple[DictRow, ...]:
         return data
 
@@ -76,18 +100,38 @@ class Query(Generic[QueryResult]):
     def build(self) -> Expression:
         raise NotImplementedError
 
-    async def _execute(self, cursor: AsyncCursor) -> QueryResult:
+    async def _send(self, cursor: AsyncCursor):
+        """
+        Execute the query on the given cursor, without retrieving the results.
+        """
         query, values = self.build().as_tuple()
-        # TODO: Move logging out to a custom cursor
-        # logger.debug(
-        #     f"Executing query ({query.as_string(cursor)}) with values {values}",
-        #     extra={'action': "Query"}
-        # )
-        await cursor.execute(sql.Composed((query,)), values)
-        data = await cursor.fetchall()
+        shapes = self.connector.shapes if self.connector is not None else None
+        if shapes is not None:
+            shape = shapes.get(query, cursor)
+            await cursor.execute(shape.query, values, prepare=shapes.prepare(shape))
+        else:
+            await cursor.execute(sql.Composed((query,)), values)
+
+    async def _receive(self, cursor: AsyncCursor) -> QueryResult:
+        """
+        Retrieve and adapt the results of the query last executed on the given cursor.
+        """
+        if self.row_factory is not None:
+            row_factory = cursor.row_factory
+            cursor.row_factory = self.row_factory
+            try:
+                data = await cursor.fetchall()
+            finally:
+                cursor.row_factory = row_factory
+        else:
+            data = await cursor.fetchall()
         self.result = self._adapter(*data)
         return self.result
 
+    async def _execute(self, cursor: AsyncCursor) -> QueryResult:
+        await self._send(cursor)
+        return await self._receive(cursor)
+
     async def execute(self, cursor=None) -> QueryResult:
         """
         Execute the query, optionally with the provided cursor, and return the result rows.
@@ -101,7 +145,7 @@ class Query(Generic[QueryResult]):
                 if self.connector is None:
                     raise ValueError("Cannot execute query without cursor, connection, or connector.")
                 else:
-                    async with self.connector.connection() as conn:
+                    async with self.connector.connection(lane=self.lane) as conn:
                         async with conn.cursor() as cursor:
                             data = await self._execute(cursor)
             else:
@@ -115,6 +159,22 @@ class Query(Generic[QueryResult]):
         return self.execute().__await__()
 
 
+class RawQuery(Query[QueryResult]):
+    """
+    Executable query with fixed query text and values.
+
+    Allows custom SQL to be awaited, or queued in a Pipeline, like the table queries.
+    """
+    __slots__ = ('expr',)
+
+    def __init__(self, query: sql.Composable, values: tuple[Any, ...] = (), *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.expr = RawExpr(query, values)
+
+    def build(self) -> Expression:
+        return self.expr
+
+
 class TableQuery(Query[QueryResult]):
     """
     ABC for an executable query statement expected to be run on a single table.
@@ -384,10 +444,16 @@ class GroupMixin(TableQuery[QueryResult]):
 class Insert(ExtraMixin, TableQuery[QueryResult]):
     """
     Query type representing a table insert query.
+
+    Inserts of at least `copy_threshold` rows are streamed with binary COPY into a staging table,
+    and inserted from there, instead of being sent as a `VALUES` list.
     """
     # TODO: Support ON CONFLICT for upserts
     __slots__ = ('_columns', '_values', '_conflict')
 
+    # Minimum number of rows to insert through COPY, or None to never use COPY
+    copy_threshold: Optional[int] = 500
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._columns: tuple[str, ...] = ()
@@ -460,6 +526,40 @@ class Insert(ExtraMixin, TableQuery[QueryResult]):
         sections = (section for section in sections if section is not None)
         return RawExpr.join(*sections)
 
+    def build_from(self, staging: sql.Identifier):
+        """
+        Build the insert query with the rows selected from the given staging table.
+        """
+        columns = sql.SQL(',').join(map(sql.Identifier, self._columns))
+        base = sql.SQL("INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging}").format(
+            table=self.tableid,
+            columns=columns,
+            staging=staging
+        )
+
+        sections = [
+            RawExpr(base),
+            self._conflict_section,
+            self._extra_section,
+            RawExpr(sql.SQL('RETURNING *'))
+        ]
+
+        sections = (section for section in sections if section is not None)
+        return RawExpr.join(*sections)
+
+    async def _execute(self, cursor: AsyncCursor) -> QueryResult:
+        if self.copy_threshold is None or len(self._values) < self.copy_threshold:
+            return await super()._execute(cursor)
+
+        staging = sql.Identifier(f"_copy_staging_{next(_staging_ids)}")
+        async with cursor.connection.transaction():
+            if not await stage_like(cursor, staging, self.tableid, self._columns, self._values):
+                # Column types do not support binary COPY
+                return await super()._execute(cursor)
+            query, values = self.build_from(staging).as_tuple()
+            await cursor.execute(query, values)
+            return await self._receive(cursor)
+
 
 class Select(WhereMixin, ExtraMixin, OrderMixin, LimitMixin, JoinMixin, GroupMixin, TableQuery[QueryResult]):
     """
@@ -523,6 +623,38 @@ class Select(WhereMixin, ExtraMixin, OrderMixin, LimitMixin, JoinMixin, GroupMix
         sections = (section for section in sections if section is not None)
         return RawExpr.join(*sections)
 
+    async def stream(self, batch: int = 1000) -> AsyncIterator[QueryResult]:
+        """
+        Execute the query with a server-side cursor,
+        and iterate over the adapted results of at most `batch` rows at a time.
+
+        Unlike awaiting the query, the full result set is never held in memory.
+        The connection, and a transaction on it, are held until the iteration completes,
+        so consumers should not wait on other work between batches for long.
+        Prefer `Table.stream_where` for long running scans of a single table.
+        """
+        if self.cursor is not None:
+            raise ValueError("Cannot stream query on an existing cursor.")
+        if self.conn is not None:
+            async for data in self._stream(self.conn, batch):
+                yield data
+        elif self.connector is not None:
+            async with self.connector.connection(lane=self.lane) as conn:
+                async for data in self._stream(conn, batch):
+                    yield data
+        else:
+            raise ValueError("Cannot stream query without connection or connector.")
+
+    async def _stream(self, conn: AsyncConnection, batch: int):
+        query, values = self.build().as_tuple()
+        # Server-side cursors only live inside a transaction, and our connections are autocommit
+        async with conn.transaction():
+            cursor_kwargs = {'row_factory': self.row_factory} if self.row_factory is not None else {}
+            async with conn.cursor(name=f"_stream_{next(_cursor_ids)}", **cursor_kwargs) as cursor:
+                await cursor.execute(sql.Composed((query,)), values)
+                while (data := await cursor.fetchmany(batch)):
+                    yield self._adapter(*data)
+
 
 class Delete(WhereMixin, ExtraMixin, TableQuery[QueryResult]):
     """
@@ -0,0 +1,116 @@
+from typing import Any, Optional
+from collections import OrderedDict
+import logging
+
+from psycopg import sql
+from psycopg.abc import AdaptContext
+
+logger = logging.getLogger(__name__)
+
+
+class QueryShape:
+    """
+    Cached rendering of a single query shape.
+
+    Tracks the number of times the shape has been requested,
+    so the caller can decide when to execute it as a prepared statement.
+    """
+    __slots__ = ('key', 'query', 'hits')
+
+    def __init__(self, key: tuple, query: bytes):
+        self.key = key
+        self.query = query
+        self.hits = 0
+
+
+class ShapeCache:
+    """
+    Bounded LRU cache of rendered query text, keyed on the structure of the composed query.
+
+    Two queries have the same shape when their composed trees are identical up to the parameter values,
+    e.g. every `fetch_where(guildid=..., userid=...)` on a given table.
+    Walking the tree to compute the key is much cheaper than rendering it,
+    which escapes every identifier through the connection.
+
+    Once a shape has been requested `prepare_threshold` times,
+    `prepare` returns True and the query should be executed as a server-side prepared statement.
+    A `prepare_threshold` of None disables explicit preparation,
+    deferring to the connection's own prepare threshold.
+    """
+
+    def __init__(self, maxsize: int = 512, prepare_threshold: Optional[int] = 5):
+        self.maxsize = maxsize
+        self.prepare_threshold = prepare_threshold
+
+        self._shapes: OrderedDict[tuple, QueryShape] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._shapes)
+
+    @classmethod
+    def shape_key(cls, composable: sql.Composable) -> tuple:
+        """
+        Compute a hashable structural key for the given composable.
+        """
+        if isinstance(composable, sql.Composed):
+            return tuple(map(cls.shape_key, composable.seq))
+        elif isinstance(composable, sql.Literal):
+            # Literals are rendered into the query text, so they are part of the shape
+            return (sql.Literal, type(composable._obj), repr(composable._obj))
+        elif isinstance(composable, sql.Placeholder):
+            return (sql.Placeholder, composable._obj, composable._format)
+        else:
+            return (type(composable), composable._obj)
+
+    def get(self, query: sql.Composable, context: AdaptContext) -> QueryShape:
+        """
+        Retrieve the cached shape for the given query, rendering it if required.
+        """
+        key = self.shape_key(query)
+        shape = self._shapes.get(key, None)
+        if shape is None:
+            self.misses += 1
+            shape = QueryShape(key, query.as_bytes(context))
+            self._shapes[key] = shape
+            if len(self._shapes) > self.maxsize:
+                self._shapes.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.hits += 1
+            self._shapes.move_to_end(key)
+        shape.hits += 1
+        return shape
+
+    def prepare(self, shape: QueryShape) -> Optional[bool]:
+        """
+        Whether the given shape should be executed as a prepared statement.
+
+        Returns None when explicit preparation is disabled,
+        so the connection default applies.
+        """
+        if self.prepare_threshold is None:
+            return None
+        return shape.hits >= self.prepare_threshold
+
+    def clear(self):
+        self._shapes.clear()
+
+    def top(self, count: int = 10) -> list[QueryShape]:
+        """
+        The `count` most requested shapes currently in the cache.
+        """
+        return sorted(self._shapes.values(), key=lambda shape: shape.hits, reverse=True)[:count]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'size': len(self._shapes),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'prepared': sum(self.prepare(shape) or 0 for shape in self._shapes.values()),
+        }
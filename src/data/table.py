@@ -1,8 +1,9 @@
-from typing import Optional
-from psycopg.rows import DictRow
+from typing import Optional, AsyncIterator, Sequence
+from psycopg.rows import DictRow, RowFactory
 from psycopg import sql
 
 from . import queries as q
+from .conditions import Condition, Joiner
 from .connector import Connector
 from .registry import Registry
 
@@ -33,6 +34,13 @@ class Table:
         self._registry = registry
         return self
 
+    @property
+    def row_factory(self) -> Optional[RowFactory]:
+        """
+        Row factory for queries on this table, or None to use the connection row factory.
+        """
+        return None
+
     def _many_query_adapter(self, *data: DictRow) -> tuple[DictRow, ...]:
         return data
 
@@ -49,13 +57,46 @@ class Table:
         return q.Select(
             self.identifier,
             row_adapter=self._many_query_adapter,
+            row_factory=self.row_factory,
             connector=self.connector
         ).where(*args, **kwargs)
 
+    async def stream_where(self, *args, key: Sequence[str], batch: int = 1000,
+                           **kwargs) -> AsyncIterator[tuple[DictRow, ...]]:
+        """
+        Iterate over the rows matching the given conditions, in batches of at most `batch` rows.
+
+        Rows are paged in order of the `key` columns, which must uniquely identify a row,
+        with each batch fetched by a separate query starting after the last key seen.
+        No connection is held between batches, so consumers may do other work while iterating.
+        The batches are not a consistent snapshot;
+        rows modified during the iteration may or may not be seen.
+        """
+        if not key:
+            raise ValueError("Cannot stream rows without a key to page on.")
+        key_expr = sql.SQL('({})').format(sql.SQL(', ').join(map(sql.Identifier, key)))
+        after_expr = sql.SQL('({})').format(sql.SQL(', ').join(sql.Placeholder() * len(key)))
+
+        last = None
+        while True:
+            query = self.select_where(*args, **kwargs).with_no_adapter()
+            if last is not None:
+                # (key) > (last)
+                query.where(Condition(key_expr, Joiner.LE, after_expr, last, negated=True))
+            for column in key:
+                query.order_by(column, q.ORDER.ASC)
+            rows = await query.limit(batch)
+            if rows:
+                yield rows
+            if len(rows) < batch:
+                break
+            last = tuple(rows[-1][column] for column in key)
+
     def select_one_where(self, *args, **kwargs) -> q.Select[DictRow]:
         return q.Select(
             self.identifier,
             row_adapter=self._single_query_adapter,
+            row_factory=self.row_factory,
             connector=self.connector
         ).where(*args, **kwargs)
 
@@ -63,6 +104,7 @@ class Table:
         return q.Update(
             self.identifier,
             row_adapter=self._many_query_adapter,
+            row_factory=self.row_factory,
             connector=self.connector
         ).where(*args, **kwargs)
 
@@ -70,6 +112,7 @@ class Table:
         return q.Delete(
             self.identifier,
             row_adapter=self._many_query_adapter,
+            row_factory=self.row_factory,
             connector=self.connector
         ).where(*args, **kwargs)
 
@@ -77,6 +120,7 @@ class Table:
         return q.Insert(
             self.identifier,
             row_adapter=self._single_query_adapter,
+            row_factory=self.row_factory,
             connector=self.connector
         ).insert(column_values.keys(), column_values.values())
 
@@ -84,6 +128,7 @@ class Table:
         return q.Insert(
             self.identifier,
             row_adapter=self._many_query_adapter,
+            row_factory=self.row_factory,
             connector=self.connector
         ).insert(*args, **kwargs)
 
@@ -37,7 +37,11 @@ shard_talk = AppClient(
     shardname,
     appname,
     {'host': args.host, 'port': args.port},
-    {'host': conf.appipc['server_host'], 'port': int(conf.appipc['server_port'])}
+    {'host': conf.appipc['server_host'], 'port': int(conf.appipc['server_port'])},
+    secret=conf.appipc.get('secret', ''),
+    multiplex=conf.appipc.getboolean('multiplex', True),
+    legacy=conf.appipc.getboolean('legacy_pickle', False),
+    reply_timeout=conf.appipc.getfloat('reply_timeout', 60)
 )
 
 
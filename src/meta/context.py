@@ -18,3 +18,6 @@ context: ContextVar[Optional['LionContext']] = ContextVar('context', default=Non
 
 # Contains the current LionBot instance
 ctx_bot: ContextVar[Optional['LionBot']] = ContextVar('bot', default=None)
+
+# Contains a label for the skin of the card being prepared in the current task, if applicable
+ctx_skin: ContextVar[Optional[str]] = ContextVar('skin', default=None)
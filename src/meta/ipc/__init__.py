@@ -1,2 +1,3 @@
 from .client import AppClient, AppPayload, AppRoute
 from .server import AppServer
+from .codecs import Codec, PickleCodec, StructCodec, StructBatchCodec
@@ -1,21 +1,22 @@
-from typing import Optional, TypeAlias, Any
+from typing import Optional
 import asyncio
+import json
 import logging
 import pickle
 
 from ..logger import logging_context, log_wrap, set_logging_context
+from .connection import Address, PeerConnections, FrameKind, MAGIC, accept_handshake, read_frame, write_frame
+from .codecs import Codec, PICKLE
 
 
 logger = logging.getLogger(__name__)
 
 
-Address: TypeAlias = dict[str, Any]
-
-
 class AppClient:
     routes: dict[str, 'AppRoute'] = {}  # route_name -> Callable[Any, Awaitable[Any]]
 
-    def __init__(self, appid: str, basename: str, client_address: Address, server_address: Address):
+    def __init__(self, appid: str, basename: str, client_address: Address, server_address: Address,
+                 secret: str, multiplex=True, legacy=False, reply_timeout: Optional[float] = 60):
         self.appid = appid  # String identifier for this ShardTalk client
         self.basename = basename  # Prefix used to recognise app peers
         self.address = client_address
@@ -27,6 +28,17 @@ class AppClient:
         self._server = None  # Connection to the registry server
         self._keepalive = None
 
+        # Shared secret which peers must prove they know before we decode their frames
+        if not secret:
+            raise ValueError("ShardTalk requires a shared secret, set 'secret' in the APPIPC configuration.")
+        self._secret = secret.encode()
+        # Whether to accept and send legacy single-message connections, which unpickle the socket input
+        self.legacy = legacy
+        # Persistent connections to the peers we send requests to
+        self.connections = PeerConnections(
+            self._secret, multiplex=multiplex, legacy=legacy, reply_timeout=reply_timeout
+        )
+
         self.register_route('new_peer')(self.new_peer)
         self.register_route('drop_peer')(self.drop_peer)
         self.register_route('peer_list')(self.peer_list)
@@ -35,9 +47,9 @@ class AppClient:
     def my_peers(self):
         return {peerid: peer for peerid, peer in self.peers.items() if peerid.startswith(self.basename)}
 
-    def register_route(self, name=None):
+    def register_route(self, name=None, codec: Optional[Codec] = None):
         def wrapper(coro):
-            route = AppRoute(coro, client=self, name=name)
+            route = AppRoute(coro, client=self, name=name, codec=codec)
             self.routes[route.name] = route
             return route
         return wrapper
@@ -48,12 +60,12 @@ class AppClient:
             reader, writer = await asyncio.open_connection(**self.server_address)
 
             payload = ('connect', (), {'appid': self.appid, 'address': self.address})
-            writer.write(pickle.dumps(payload))
+            writer.write(json.dumps(payload).encode())
             writer.write(b'\n')
             await writer.drain()
 
             data = await reader.readline()
-            peers = pickle.loads(data)
+            peers = json.loads(data)
             self.peers = peers
             self._server = (reader, writer)
         except Exception:
@@ -93,14 +105,22 @@ class AppClient:
 
     async def drop_peer(self, appid):
         self.peers.pop(appid, None)
+        self.connections.drop(appid)
 
     async def close(self):
+        # Close connections to our peers
+        self.connections.close()
         # Close connection to the server
         # TODO
         ...
 
     @log_wrap(action="Req")
-    async def request(self, appid, payload: 'AppPayload', wait_for_reply=True):
+    async def request(self, appid, payload: 'AppPayload', wait_for_reply=True, raise_errors=False):
+        """
+        Send the given payload to the given peer, returning the decoded reply if `wait_for_reply` is set.
+
+        Failures are logged and return `None`, unless `raise_errors` is set.
+        """
         set_logging_context(action=appid)
         try:
             if appid not in self.peers:
@@ -108,20 +128,16 @@ class AppClient:
             logger.debug(f"Sending request to app '{appid}' with payload {payload}")
 
             address = self.peers[appid]
-            reader, writer = await asyncio.open_connection(**address)
-
-            writer.write(payload.encoded())
-            await writer.drain()
-            writer.write_eof()
+            result = await self.connections.send(appid, address, payload, wait_for_reply=wait_for_reply)
             if wait_for_reply:
-                result = await reader.read()
-                writer.close()
                 decoded = payload.route.decode(result)
                 return decoded
             else:
                 return None
         except Exception:
-            logging.exception(f"Failed to send request to {appid}'")
+            logger.exception(f"Failed to send request to '{appid}'.")
+            if raise_errors:
+                raise
             return None
 
     @log_wrap(action="Broadcast")
@@ -135,7 +151,23 @@ class AppClient:
 
     async def handle_request(self, reader, writer):
         set_logging_context(action="SERV")
-        data = await reader.read()
+        try:
+            data = await reader.readexactly(len(MAGIC))
+        except asyncio.IncompleteReadError as e:
+            data = e.partial
+        if data == MAGIC:
+            await self.handle_connection(reader, writer)
+            return
+        if not self.legacy:
+            logger.warning(
+                f"AppClient {self.appid} received a legacy single-message connection, "
+                "but legacy connections are disabled. Closing."
+            )
+            writer.close()
+            return
+
+        # Single-message connection
+        data += await reader.read()
         loaded = pickle.loads(data)
         route, args, kwargs = loaded
 
@@ -152,6 +184,67 @@ class AppClient:
             logger.warning(f"Appclient '{self.appid}' recieved unknown route {route}. Ignoring.")
         writer.write_eof()
 
+    async def handle_connection(self, reader, writer):
+        """
+        Serve requests on a multiplexed connection, until the connection is closed.
+
+        No frames are read until the connecting peer has authenticated the handshake.
+        """
+        if not await accept_handshake(reader, writer, self._secret):
+            logger.warning(f"AppClient {self.appid} rejected a connection which failed to authenticate.")
+            writer.close()
+            return
+
+        tasks = set()
+        try:
+            while True:
+                rqid, kind, codecid, body = await read_frame(reader)
+                task = asyncio.create_task(self.handle_frame(writer, rqid, kind, codecid, body))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except asyncio.IncompleteReadError:
+            # Connection closed by the peer
+            pass
+        except Exception:
+            logger.exception("Multiplexed connection failed. Closing connection.")
+        finally:
+            writer.close()
+
+    async def handle_frame(self, writer, rqid, kind, codecid, body):
+        """
+        Handle a single request on a multiplexed connection.
+
+        The request arguments are only decoded if the frame codec is the route codec.
+        """
+        if kind is FrameKind.REPLY:
+            logger.warning(f"AppClient {self.appid} received unexpected reply frame for request {rqid}. Ignoring.")
+            return
+        route, data = AppPayload.unframe(body)
+
+        set_logging_context(action=route)
+
+        payload = b''
+        if (app_route := self.routes.get(route, None)) is None:
+            logger.warning(f"Appclient '{self.appid}' recieved unknown route {route}. Ignoring.")
+        elif app_route.codec.codecid != codecid:
+            logger.warning(
+                f"Appclient '{self.appid}' recieved codec {codecid} on route {route} "
+                f"which uses codec {app_route.codec.codecid}. Ignoring."
+            )
+        else:
+            try:
+                args, kwargs = app_route.codec.decode_args(data)
+            except Exception:
+                logger.exception(f"AppClient {self.appid} could not decode request on route '{route}'. Ignoring.")
+            else:
+                logger.debug(
+                    f"AppClient {self.appid} handling request on route '{route}' with args {args} and kwargs {kwargs}"
+                )
+                payload = await app_route.respond(args, kwargs)
+        if kind is FrameKind.REQUEST and not writer.is_closing():
+            write_frame(writer, rqid, FrameKind.REPLY, codecid, payload)
+            await writer.drain()
+
     @log_wrap(stack=("ShardTalk",))
     async def connect(self):
         """
@@ -176,9 +269,29 @@ class AppPayload:
     def __await__(self):
         return self.route.execute(*self.args, **self.kwargs).__await__()
 
+    @property
+    def codec(self) -> Codec:
+        return self.route.codec
+
     def encoded(self):
         return pickle.dumps((self.route.name, self.args, self.kwargs))
 
+    def framed(self):
+        """
+        Encode the payload for a multiplexed connection,
+        as the length-prefixed route name followed by the arguments encoded with the route codec.
+        """
+        name = self.route.name.encode()
+        return bytes((len(name),)) + name + self.route.codec.encode_args(self.args, self.kwargs)
+
+    @staticmethod
+    def unframe(body: bytes) -> tuple[str, bytes]:
+        """
+        Split a multiplexed request body into the route name and the encoded arguments.
+        """
+        length = body[0]
+        return body[1:length + 1].decode(), body[length + 1:]
+
     async def send(self, appid, **kwargs):
         return await self.route._client.request(appid, self, **kwargs)
 
@@ -187,25 +300,31 @@ class AppPayload:
 
 
 class AppRoute:
-    __slots__ = ('func', 'name', '_client')
+    """
+    A ShardTalk route, executing `func` when requested by a peer.
 
-    def __init__(self, func, client=None, name=None):
+    The route `codec` encodes the route results,
+    and the route arguments on multiplexed connections.
+    Hot routes may declare a compact codec from `Codec.registry`, such as `StructCodec`,
+    which must be the same on every peer.
+    """
+    __slots__ = ('func', 'name', '_client', 'codec')
+
+    def __init__(self, func, client=None, name=None, codec: Optional[Codec] = None):
         self.func = func
         self.name = name or func.__name__
         self._client = client
+        self.codec = codec or PICKLE
 
     def __call__(self, *args, **kwargs):
         return AppPayload(self, *args, **kwargs)
 
     def encode(self, output):
-        return pickle.dumps(output)
+        return self.codec.encode_result(output)
 
     def decode(self, encoded):
         # TODO: Handle exceptions here somehow
-        if len(encoded) > 0:
-            return pickle.loads(encoded)
-        else:
-            return ''
+        return self.codec.decode_result(encoded)
 
     def encoder(self, func):
         self.encode = func
@@ -219,12 +338,10 @@ class AppRoute:
         """
         return await self.func(*args, **kwargs)
 
-    async def run(self, connection, args, kwargs):
+    async def respond(self, args, kwargs) -> bytes:
         """
-        Run the route, with the given arguments, using the given connection.
+        Run the route with the given arguments, and return the encoded result.
         """
-        # TODO: ContextVar here for logging? Or in handle_request?
-        # Get encoded result
         # TODO: handle exceptions in the execution process
         try:
             result = await self.execute(*args, **kwargs)
@@ -232,6 +349,14 @@ class AppRoute:
         except Exception:
             logger.exception(f"Exception occured running route '{self.name}' with args: {args} and kwargs: {kwargs}")
             payload = b''
+        return payload
+
+    async def run(self, connection, args, kwargs):
+        """
+        Run the route, with the given arguments, using the given connection.
+        """
+        # TODO: ContextVar here for logging? Or in handle_request?
+        payload = await self.respond(args, kwargs)
         _, writer = connection
         writer.write(payload)
         await writer.drain()
@@ -0,0 +1,226 @@
+"""
+Payload codecs for ShardTalk routes.
+
+Every route has a codec, used to encode its results,
+and its arguments on multiplexed connections, where the codec is identified by `Codec.codecid` in the frame header.
+Routes use the `PickleCodec` unless they declare another codec,
+and single-message connections always pickle the route arguments.
+
+Multiplexed requests are only decoded with the codec declared by their route,
+so routes with other codecs never unpickle data received from the socket,
+and are only decoded at all once the peer has authenticated, see `connection`.
+"""
+from typing import Any, NamedTuple, Type, Union, get_args, get_origin, get_type_hints
+from enum import Enum
+import datetime as dt
+import pickle
+import struct
+
+
+class Codec:
+    """
+    Base class for route payload codecs.
+
+    Subclasses must set a unique `codecid`, and are registered in `Codec.registry` on definition.
+    """
+    codecid: int
+    registry: dict[int, Type['Codec']] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if (existing := Codec.registry.get(cls.codecid, None)) is not None:
+            raise ValueError(f"Codec id {cls.codecid} is already used by {existing.__name__}.")
+        Codec.registry[cls.codecid] = cls
+
+    def encode_args(self, args: tuple, kwargs: dict) -> bytes:
+        raise NotImplementedError
+
+    def decode_args(self, data: bytes) -> tuple[tuple, dict]:
+        raise NotImplementedError
+
+    def encode_result(self, result: Any) -> bytes:
+        raise NotImplementedError
+
+    def decode_result(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class PickleCodec(Codec):
+    """
+    Default codec, pickling arbitrary arguments and results.
+    """
+    codecid = 0
+
+    def encode_args(self, args: tuple, kwargs: dict) -> bytes:
+        return pickle.dumps((args, kwargs))
+
+    def decode_args(self, data: bytes) -> tuple[tuple, dict]:
+        return pickle.loads(data)
+
+    def encode_result(self, result: Any) -> bytes:
+        return pickle.dumps(result)
+
+    def decode_result(self, data: bytes) -> Any:
+        return pickle.loads(data) if data else ''
+
+
+class StructCodec(Codec):
+    """
+    Compact codec for routes taking a single `NamedTuple` argument and returning nothing.
+
+    The schema is read from the type annotations of the `NamedTuple`.
+    Supported field types are `int`, `float`, `bool`, `str`, `datetime.datetime`, `Enum` subclasses,
+    and `Optional` versions of each.
+    Fixed-size fields are packed together with `struct`, followed by the encoded strings.
+    Datetimes are sent as integer microseconds since the epoch, and received in UTC.
+    Integers must fit in a signed 64 bit integer.
+    """
+    codecid = 1
+
+    # type -> (struct format, to packed value, from packed value)
+    _fixed = {
+        int: ('q', None, None),
+        float: ('d', None, None),
+        bool: ('?', None, None),
+        dt.datetime: (
+            'q',
+            lambda value: (value - dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)) // dt.timedelta(microseconds=1),
+            lambda value: dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc) + dt.timedelta(microseconds=value),
+        ),
+    }
+
+    def __init__(self, struct_type: Type[NamedTuple]):
+        self.struct_type = struct_type
+
+        # Each field is (index, optional, is_str, to packed, from packed)
+        self._fields = []
+        fmt = ['!']
+        for i, (name, annotation) in enumerate(get_type_hints(struct_type).items()):
+            optional = False
+            if get_origin(annotation) is Union:
+                members = [arg for arg in get_args(annotation) if arg is not type(None)]
+                if len(members) != 1:
+                    raise TypeError(f"Unsupported field type {annotation!r} for field '{name}'.")
+                annotation = members[0]
+                optional = True
+            if optional:
+                fmt.append('?')
+
+            if annotation is str:
+                fmt.append('I')
+                self._fields.append((i, optional, True, None, None))
+            elif isinstance(annotation, type) and issubclass(annotation, Enum):
+                members = list(annotation)
+                index = {member: n for n, member in enumerate(members)}
+                fmt.append('H')
+                self._fields.append((i, optional, False, index.__getitem__, members.__getitem__))
+            elif annotation in self._fixed:
+                code, to_packed, from_packed = self._fixed[annotation]
+                fmt.append(code)
+                self._fields.append((i, optional, False, to_packed, from_packed))
+            else:
+                raise TypeError(f"Unsupported field type {annotation!r} for field '{name}'.")
+        self._struct = struct.Struct(''.join(fmt))
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} struct={self.struct_type.__name__} format={self._struct.format!r}>"
+
+    def encode_args(self, args: tuple, kwargs: dict) -> bytes:
+        if kwargs or len(args) != 1:
+            raise ValueError(f"{self!r} can only encode a single positional argument.")
+        item, = args
+        return self.encode_item(item)
+
+    def decode_args(self, data: bytes) -> tuple[tuple, dict]:
+        item, offset = self.decode_item(data)
+        if offset != len(data):
+            raise ValueError(f"{self!r} received {len(data) - offset} unexpected trailing bytes.")
+        return (item,), {}
+
+    def encode_item(self, item) -> bytes:
+        """
+        Encode a single struct.
+        """
+        packed = []
+        strings = []
+        for i, optional, is_str, to_packed, _ in self._fields:
+            value = item[i]
+            if optional:
+                packed.append(value is not None)
+                if value is None:
+                    packed.append(0)
+                    continue
+            if is_str:
+                encoded = value.encode()
+                strings.append(encoded)
+                packed.append(len(encoded))
+            else:
+                packed.append(to_packed(value) if to_packed is not None else value)
+        return self._struct.pack(*packed) + b''.join(strings)
+
+    def decode_item(self, data: bytes, offset: int = 0) -> tuple[Any, int]:
+        """
+        Decode a single struct starting at the given offset.
+        Returns the struct, and the offset of the end of the encoded struct.
+        """
+        unpacked = self._struct.unpack_from(data, offset)
+        offset += self._struct.size
+        values = []
+        j = 0
+        for _, optional, is_str, _, from_packed in self._fields:
+            present = True
+            if optional:
+                present = unpacked[j]
+                j += 1
+            packed = unpacked[j]
+            j += 1
+            if is_str:
+                if present:
+                    values.append(data[offset:offset + packed].decode())
+                    offset += packed
+                else:
+                    values.append(None)
+            elif not present:
+                values.append(None)
+            else:
+                values.append(from_packed(packed) if from_packed is not None else packed)
+        return self.struct_type(*values), offset
+
+    def encode_result(self, result: Any) -> bytes:
+        return b''
+
+    def decode_result(self, data: bytes) -> Any:
+        return None
+
+
+class StructBatchCodec(StructCodec):
+    """
+    Compact codec for routes taking a single list of `NamedTuple`s and returning nothing.
+
+    The list is sent as the number of structs, followed by each struct encoded as in `StructCodec`.
+    Each struct has a variable length, so the whole batch must be decoded in order.
+    """
+    codecid = 2
+
+    _count = struct.Struct('!I')
+
+    def encode_args(self, args: tuple, kwargs: dict) -> bytes:
+        if kwargs or len(args) != 1:
+            raise ValueError(f"{self!r} can only encode a single positional argument.")
+        items, = args
+        return self._count.pack(len(items)) + b''.join(map(self.encode_item, items))
+
+    def decode_args(self, data: bytes) -> tuple[tuple, dict]:
+        count, = self._count.unpack_from(data)
+        offset = self._count.size
+        items = []
+        for _ in range(count):
+            item, offset = self.decode_item(data, offset)
+            items.append(item)
+        if offset != len(data):
+            raise ValueError(f"{self!r} received {len(data) - offset} unexpected trailing bytes.")
+        return (items,), {}
+
+
+PICKLE = PickleCodec()
+
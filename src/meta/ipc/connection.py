@@ -0,0 +1,431 @@
+"""
+Persistent multiplexed connections between ShardTalk apps.
+
+A connecting app opens a single TCP connection to each peer,
+and identifies the multiplexed protocol by sending `MAGIC` and a random nonce.
+The listening peer echoes `MAGIC`, followed by the number and ids of the codecs it supports,
+its own nonce, and an HMAC of the connecting nonce under the shared ShardTalk secret.
+The connecting peer verifies the HMAC and replies with an HMAC of the listening nonce,
+so each peer has proven it knows the secret before any frame is decoded.
+Peers with different secrets never exchange frames, since the default codec unpickles the route arguments.
+Messages are then exchanged as length-prefixed frames, each carrying a request id and payload codec id,
+so any number of requests may be in flight on the same connection,
+with replies matched to their requests by id.
+Request bodies are the length-prefixed route name, followed by the route arguments encoded with the route codec.
+
+Peers which reply to the handshake without acknowledging it, or which cannot currently be reached,
+may be contacted with the legacy single-message connections instead,
+writing the pickled payload and EOF, and reading the reply until EOF.
+Since these connections are not authenticated and the receiving peer unpickles the raw socket input,
+legacy connections must be explicitly enabled.
+"""
+from typing import Optional, TypeAlias, Any, Protocol
+from enum import IntEnum
+import asyncio
+import hashlib
+import hmac
+import itertools
+import logging
+import os
+import struct
+import time
+
+from .codecs import Codec
+
+
+logger = logging.getLogger(__name__)
+
+
+Address: TypeAlias = dict[str, Any]
+
+
+MAGIC = b'STLK\x03'
+
+# Handshake nonce and proof sizes
+NONCE_SIZE = 16
+PROOF_SIZE = hashlib.sha256().digest_size
+
+# Seconds to wait for each step of the handshake
+HANDSHAKE_TIMEOUT = 5
+
+# Frame header: body length, request id, frame kind, codec id
+HEADER = struct.Struct('!IIBB')
+
+# Largest frame body we will accept, as a guard against a corrupted stream
+MAX_FRAME = 2 ** 27
+
+
+class FrameKind(IntEnum):
+    REQUEST = 0  # Request expecting a reply with the same request id
+    NOTIFY = 1  # Request which does not expect a reply
+    REPLY = 2  # Reply to the request with the same request id
+
+
+class Payload(Protocol):
+    codec: Codec
+
+    def encoded(self) -> bytes:
+        """Encoded request for a single-message connection."""
+        ...
+
+    def framed(self) -> bytes:
+        """Encoded request body for a multiplexed connection, using `codec`."""
+        ...
+
+
+def handshake_proof(secret: bytes, role: bytes, nonce: bytes) -> bytes:
+    """
+    Proof that a peer in the given handshake role knows the shared secret, for the other peer's nonce.
+    """
+    return hmac.new(secret, role + nonce, hashlib.sha256).digest()
+
+
+async def accept_handshake(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, secret: bytes) -> bool:
+    """
+    Complete the handshake of an incoming multiplexed connection, after `MAGIC` was read.
+
+    Replies with `MAGIC`, the supported codecs, and the listening proof,
+    and returns whether the connecting peer proved it knows the secret.
+    """
+    try:
+        nonce = await asyncio.wait_for(reader.readexactly(NONCE_SIZE), timeout=HANDSHAKE_TIMEOUT)
+        my_nonce = os.urandom(NONCE_SIZE)
+        writer.write(
+            MAGIC + bytes((len(Codec.registry), *Codec.registry))
+            + my_nonce + handshake_proof(secret, b'listen', nonce)
+        )
+        await writer.drain()
+        proof = await asyncio.wait_for(reader.readexactly(PROOF_SIZE), timeout=HANDSHAKE_TIMEOUT)
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+        return False
+    return hmac.compare_digest(proof, handshake_proof(secret, b'connect', my_nonce))
+
+
+async def read_frame(reader: asyncio.StreamReader) -> tuple[int, FrameKind, int, bytes]:
+    """
+    Read a single frame from the stream.
+
+    Raises `asyncio.IncompleteReadError` if the stream ends,
+    or `ConnectionError` if the frame header is invalid.
+    """
+    header = await reader.readexactly(HEADER.size)
+    length, rqid, kind, codecid = HEADER.unpack(header)
+    if length > MAX_FRAME:
+        raise ConnectionError(f"Received frame of length {length}, exceeding the maximum frame size.")
+    body = await reader.readexactly(length) if length else b''
+    return rqid, FrameKind(kind), codecid, body
+
+
+def write_frame(writer: asyncio.StreamWriter, rqid: int, kind: FrameKind, codecid: int, body: bytes):
+    """
+    Write a single frame to the stream.
+
+    The frame is written in one call, so frames written by concurrent tasks are never interleaved.
+    """
+    writer.write(HEADER.pack(len(body), rqid, kind, codecid) + body)
+
+
+class PeerConnection:
+    """
+    Outgoing multiplexed connection to a single peer.
+    """
+    handshake_timeout = HANDSHAKE_TIMEOUT
+    # Seconds to wait for the reply to a request before treating the connection as lost, or None to wait forever
+    reply_timeout: Optional[float] = 60
+
+    def __init__(self, appid: str, address: Address, codecs: frozenset[int],
+                 reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.appid = appid
+        self.address = address
+        # Ids of the codecs supported by the peer
+        self.codecs = codecs
+        self.reader = reader
+        self.writer = writer
+
+        self._ids = itertools.count(1)
+        # rqid -> Future waiting for the reply body
+        self._waiting: dict[int, asyncio.Future] = {}
+        self._closed = False
+        self._reader_task = asyncio.create_task(self._read_replies(), name=f'shardtalk-replies-{appid}')
+
+    def __repr__(self):
+        return (
+            "<"
+                f"{self.__class__.__name__}"
+                f" appid={self.appid!r}"
+                f" address={self.address!r}"
+                f" codecs={sorted(self.codecs)}"
+                f" waiting={len(self._waiting)}"
+                f" closed={self.closed}"
+                ">"
+        )
+
+    @classmethod
+    async def open(cls, appid: str, address: Address, secret: bytes) -> Optional['PeerConnection']:
+        """
+        Open a multiplexed connection to the given peer, authenticated with the shared secret.
+
+        Returns `None` if the peer replied to the handshake without acknowledging it.
+        Raises any exception raised while connecting, including `asyncio.TimeoutError` if the peer does not reply,
+        and `ConnectionError` if the peer closes the connection without replying or fails to authenticate.
+        """
+        reader, writer = await asyncio.open_connection(**address)
+        ack = None
+        try:
+            nonce = os.urandom(NONCE_SIZE)
+            writer.write(MAGIC + nonce)
+            await writer.drain()
+            ack = await asyncio.wait_for(reader.readexactly(len(MAGIC) + 1), timeout=cls.handshake_timeout)
+            if ack[:-1] != MAGIC:
+                writer.close()
+                return None
+            codecs, peer_nonce, proof = await asyncio.wait_for(
+                cls._read_ack(reader, ack[-1]), timeout=cls.handshake_timeout
+            )
+            if not hmac.compare_digest(proof, handshake_proof(secret, b'listen', nonce)):
+                raise ConnectionError(f"Peer '{appid}' failed to authenticate the handshake.")
+            writer.write(handshake_proof(secret, b'connect', peer_nonce))
+            await writer.drain()
+        except asyncio.IncompleteReadError as e:
+            writer.close()
+            if ack is None and e.partial and not MAGIC.startswith(e.partial[:len(MAGIC)]):
+                # The peer replied with something other than the acknowledgement
+                return None
+            raise ConnectionError(f"Peer '{appid}' closed the connection during the handshake.") from e
+        except BaseException:
+            writer.close()
+            raise
+        return cls(appid, address, frozenset(codecs), reader, writer)
+
+    @staticmethod
+    async def _read_ack(reader: asyncio.StreamReader, codec_count: int) -> tuple[bytes, bytes, bytes]:
+        codecs = await reader.readexactly(codec_count)
+        nonce = await reader.readexactly(NONCE_SIZE)
+        proof = await reader.readexactly(PROOF_SIZE)
+        return codecs, nonce, proof
+
+    @property
+    def closed(self):
+        return self._closed or self.writer.is_closing()
+
+    def _next_id(self) -> int:
+        return next(self._ids) % (2 ** 32)
+
+    async def _read_replies(self):
+        try:
+            while True:
+                rqid, kind, _, body = await read_frame(self.reader)
+                if kind is not FrameKind.REPLY:
+                    logger.warning(
+                        f"Connection to '{self.appid}' received unexpected frame {kind.name} for request {rqid}."
+                    )
+                    continue
+                future = self._waiting.pop(rqid, None)
+                if future is not None and not future.done():
+                    future.set_result(body)
+        except asyncio.IncompleteReadError:
+            logger.debug(f"Connection to peer '{self.appid}' closed by the peer.")
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            logger.exception(f"Connection to peer '{self.appid}' failed.")
+        finally:
+            self.close()
+
+    async def request(self, codecid: int, body: bytes, wait_for_reply=True) -> Optional[bytes]:
+        """
+        Send the request `body`, encoded with the given codec, to the peer,
+        and wait for the encoded reply if `wait_for_reply` is set.
+
+        Raises `ConnectionResetError` if the connection is closed before the request was written,
+        or before the reply was received.
+        Raises `asyncio.TimeoutError` if the reply does not arrive within `reply_timeout`,
+        closing the connection since it is presumed lost, so it is reopened on the next request.
+        """
+        if self.closed:
+            raise ConnectionResetError(f"Connection to peer '{self.appid}' is closed.")
+        rqid = self._next_id()
+        if not wait_for_reply:
+            write_frame(self.writer, rqid, FrameKind.NOTIFY, codecid, body)
+            await self.writer.drain()
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[rqid] = future
+        try:
+            write_frame(self.writer, rqid, FrameKind.REQUEST, codecid, body)
+            return await asyncio.wait_for(self._reply(future), timeout=self.reply_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"No reply from peer '{self.appid}' to request {rqid} within {self.reply_timeout} seconds. "
+                "Closing connection."
+            )
+            self.close()
+            raise
+        finally:
+            self._waiting.pop(rqid, None)
+
+    async def _reply(self, future: asyncio.Future) -> bytes:
+        await self.writer.drain()
+        return await future
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.writer.close()
+            if not self._reader_task.done() and self._reader_task is not asyncio.current_task():
+                self._reader_task.cancel()
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionResetError(f"Connection to peer '{self.appid}' closed."))
+            self._waiting.clear()
+
+
+class PeerConnections:
+    """
+    Persistent connections to every peer an app sends messages to.
+
+    Connections are opened on demand and reused for every subsequent message to the same peer.
+    When a peer cannot be reached, or does not reply to the handshake,
+    further connection attempts back off exponentially.
+    Until the next attempt, messages are sent with legacy single-message connections if `legacy` is set,
+    and otherwise fail with `ConnectionError`.
+    The same applies to peers which replied without acknowledging the handshake,
+    and to messages on routes with codecs the peer does not support.
+    """
+    backoff_initial = 1
+    backoff_max = 60
+
+    def __init__(self, secret: bytes, multiplex=True, legacy=False,
+                 reply_timeout: Optional[float] = PeerConnection.reply_timeout):
+        # Shared secret authenticating multiplexed connections
+        self._secret = secret
+        self.reply_timeout = reply_timeout
+        self.multiplex = multiplex
+        self.legacy = legacy
+
+        self._connections: dict[str, PeerConnection] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        # appid -> (time of next connection attempt, current backoff)
+        self._backoff: dict[str, tuple[float, float]] = {}
+        # Addresses of peers known not to support multiplexing
+        self._legacy: dict[str, Address] = {}
+
+        # Statistics
+        self.multiplexed = 0
+        self.fallbacks = 0
+        self.connects = 0
+        self.failures = 0
+
+    def __repr__(self):
+        return (
+            "<"
+                f"{self.__class__.__name__}"
+                f" multiplex={self.multiplex}"
+                f" legacy={self.legacy}"
+                f" connections={len(self._connections)}"
+                f" backoff={len(self._backoff)}"
+                f" legacy={len(self._legacy)}"
+                f" multiplexed={self.multiplexed}"
+                f" fallbacks={self.fallbacks}"
+                f" connects={self.connects}"
+                f" failures={self.failures}"
+                ">"
+        )
+
+    async def _connection(self, appid: str, address: Address) -> Optional[PeerConnection]:
+        """
+        Retrieve the open connection to the given peer, connecting if required.
+
+        Returns `None` if the legacy protocol should be used instead.
+        """
+        conn = self._connections.get(appid, None)
+        if conn is not None and not conn.closed and conn.address == address:
+            return conn
+        if self._legacy.get(appid, None) == address:
+            return None
+        if (backoff := self._backoff.get(appid, None)) is not None and backoff[0] > time.monotonic():
+            return None
+
+        lock = self._locks.setdefault(appid, asyncio.Lock())
+        async with lock:
+            # Another task may have connected while we were waiting
+            conn = self._connections.get(appid, None)
+            if conn is not None and not conn.closed and conn.address == address:
+                return conn
+            if conn is not None:
+                conn.close()
+                self._connections.pop(appid, None)
+            try:
+                conn = await PeerConnection.open(appid, address, self._secret)
+            except Exception:
+                self.failures += 1
+                delay = min(backoff[1] * 2, self.backoff_max) if backoff else self.backoff_initial
+                self._backoff[appid] = (time.monotonic() + delay, delay)
+                logger.warning(
+                    f"Could not open a connection to peer '{appid}'. "
+                    f"Retrying in {delay} seconds.",
+                    exc_info=True
+                )
+                return None
+            self._backoff.pop(appid, None)
+            if conn is None:
+                logger.info(f"Peer '{appid}' did not acknowledge the multiplexing handshake.")
+                self._legacy[appid] = address
+                return None
+            conn.reply_timeout = self.reply_timeout
+            self.connects += 1
+            self._connections[appid] = conn
+            logger.debug(f"Opened multiplexed connection {conn!r}")
+            return conn
+
+    async def send(self, appid: str, address: Address, payload: Payload, wait_for_reply=True) -> Optional[bytes]:
+        """
+        Send the given request payload to the given peer.
+
+        Returns the reply, encoded with the payload codec, if `wait_for_reply` is set, and otherwise `None`.
+        Raises `ConnectionError` if the message cannot be multiplexed and legacy connections are disabled.
+        """
+        conn = await self._connection(appid, address) if self.multiplex else None
+        if conn is not None and payload.codec.codecid in conn.codecs:
+            # If the connection is lost, the request may already have been delivered, so it is not resent
+            # The connection will be reopened on the next request
+            result = await conn.request(payload.codec.codecid, payload.framed(), wait_for_reply=wait_for_reply)
+            self.multiplexed += 1
+            return result
+        if not self.legacy:
+            raise ConnectionError(
+                f"Cannot send a multiplexed message to peer '{appid}', and legacy connections are disabled."
+            )
+        self.fallbacks += 1
+        return await self.send_single(address, payload.encoded(), wait_for_reply=wait_for_reply)
+
+    async def send_single(self, address: Address, body: bytes, wait_for_reply=True) -> Optional[bytes]:
+        """
+        Send the encoded request `body` over a new single-message connection.
+        """
+        reader, writer = await asyncio.open_connection(**address)
+        try:
+            writer.write(body)
+            await writer.drain()
+            writer.write_eof()
+            if wait_for_reply:
+                return await reader.read()
+            else:
+                return None
+        finally:
+            writer.close()
+
+    def drop(self, appid: str):
+        """
+        Close the connection to the given peer, and forget its connection state.
+        """
+        if (conn := self._connections.pop(appid, None)) is not None:
+            conn.close()
+        self._backoff.pop(appid, None)
+        self._legacy.pop(appid, None)
+        self._locks.pop(appid, None)
+
+    def close(self):
+        for appid in list(self._connections):
+            self.drop(appid)
@@ -1,11 +1,13 @@
 import asyncio
-import pickle
+import json
 import logging
 import string
 import random
 
 from ..logger import log_context, log_app, setup_main_logger, set_logging_context, log_wrap
 from ..config import conf
+from .connection import PeerConnections
+from .client import AppRoute
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +27,16 @@ class AppServer:
 
     def __init__(self):
         self.clients = {}  # AppID -> (info, connection)
+        # Persistent connections to the client peer servers
+        secret = conf.appipc.get('secret', '')
+        if not secret:
+            raise ValueError("ShardTalk requires a shared secret, set 'secret' in the APPIPC configuration.")
+        self.connections = PeerConnections(
+            secret.encode(),
+            multiplex=conf.appipc.getboolean('multiplex', True),
+            legacy=conf.appipc.getboolean('legacy_pickle', False),
+            reply_timeout=conf.appipc.getfloat('reply_timeout', 60)
+        )
 
         self.route('ping')(self.route_ping)
         self.route('whereis')(self.route_whereis)
@@ -56,7 +68,7 @@ class AppServer:
         """
         reader, writer = connection
         if appid in self.clients:
-            writer.write(pickle.dumps(self.clients[appid][0]))
+            writer.write(json.dumps(self.clients[appid][0]).encode())
         else:
             writer.write(b'')
         writer.write_eof()
@@ -67,7 +79,7 @@ class AppServer:
         """
         reader, writer = connection
         peers = self.peer_list()
-        payload = pickle.dumps(('peer_list', (peers,)))
+        payload = json.dumps(('peer_list', (peers,))).encode()
         writer.write(payload)
         writer.write_eof()
 
@@ -82,7 +94,7 @@ class AppServer:
 
         # Send the new client a client list
         peers = self.peer_list()
-        writer.write(pickle.dumps(peers))
+        writer.write(json.dumps(peers).encode())
         writer.write(b'\n')
         await writer.drain()
 
@@ -98,8 +110,14 @@ class AppServer:
             await self.deregister_client(appid)
 
     async def handle_connection(self, reader, writer):
+        # Registry requests are JSON lines, so untrusted socket input is never unpickled
         data = await reader.readline()
-        route, args, kwargs = pickle.loads(data)
+        try:
+            route, args, kwargs = json.loads(data)
+        except ValueError:
+            logger.warning("AppServer received a malformed request. Closing.")
+            writer.close()
+            return
 
         rqid = short_uuid()
         
@@ -120,12 +138,13 @@ class AppServer:
 
     async def deregister_client(self, appid):
         self.clients.pop(appid, None)
+        self.connections.drop(appid)
         await self.broadcast('drop_peer', (), {'appid': appid})
 
     @log_wrap(action="broadcast")
     async def broadcast(self, route, args, kwargs):
         logger.debug(f"Sending broadcast on route '{route}' with args {args} and kwargs {kwargs}.")
-        payload = pickle.dumps((route, args, kwargs))
+        payload = AppRoute(None, name=route)(*args, **kwargs)
         if self.clients:
             await asyncio.gather(
                 *(self._send(appid, payload) for appid in self.clients),
@@ -141,20 +160,16 @@ class AppServer:
         if appid not in self.clients:
             raise ValueError(f"Client '{appid}' is not connected.")
 
-        payload = pickle.dumps((route, args, kwargs))
+        payload = AppRoute(None, name=route)(*args, **kwargs)
         return await self._send(appid, payload)
 
     async def _send(self, appid, payload):
         """
-        Send the encoded `payload` to the client `appid`.
+        Send the `AppPayload` to the client `appid`.
         """
         address, _ = self.clients[appid]
         try:
-            reader, writer = await asyncio.open_connection(**address)
-            writer.write(payload)
-            writer.write_eof()
-            await writer.drain()
-            writer.close()
+            await self.connections.send(appid, address, payload, wait_for_reply=False)
         except Exception as ex:
             # TODO: Close client if we can't connect?
             logger.exception(f"Failed to send message to '{appid}'")
@@ -790,6 +790,7 @@ class Economy(LionCog):
                 async with conn.transaction():
                     # We do this in a transaction so that if something goes wrong,
                     # the coins deduction is rolled back atomicly
+                    await ctx.alion.data.refresh()
                     balance = ctx.alion.data.coins
                     if amount > balance:
                         await ctx.interaction.edit_original_response(
@@ -149,6 +149,7 @@ class MemberAdminCog(LionCog):
 
             t = self.bot.translator.t
             ctx_locale.set(lion.lguild.locale)
+            await lion.refresh_coins()
             lion.lguild.log_event(
                 title=t(_p(
                     'eventlog|event:welcome|title',
@@ -237,6 +238,7 @@ class MemberAdminCog(LionCog):
 
             t = self.bot.translator.t
             ctx_locale.set(lion.lguild.locale)
+            await lion.refresh_coins()
             lion.lguild.log_event(
                 title=t(_p(
                     'eventlog|event:returning|title',
@@ -278,6 +280,7 @@ class MemberAdminCog(LionCog):
             return
 
         # Set lion last_left, creating the lion_member if needed
+        # The update returns the current row, so the balance logged below is fresh
         lion = await self.bot.core.lions.fetch_member(guildid, userid)
         await lion.data.update(last_left=utc_now())
 
@@ -573,6 +576,7 @@ class MemberAdminCog(LionCog):
             query.where(userid=userids)
         query.limit(limit)
         query.with_no_adapter()
+        query.in_lane('background')
 
         # Request bucket
         try:
@@ -586,17 +590,20 @@ class MemberAdminCog(LionCog):
                 "Too many requests! Please wait a few minutes before using this command again."
             )))
 
-        # Run query
+        # Run query, writing the results as they arrive
         await ctx.interaction.response.defer(thinking=True)
-        results = await query
+        with StringIO() as stream:
+            written = 0
+            async for results in query.stream(batch=1000):
+                write_records(results, stream, header=not written)
+                written += len(results)
 
-        if results:
-            with StringIO() as stream:
-                write_records(results, stream)
+            if written:
                 stream.seek(0)
                 file = discord.File(stream, filename='data.csv')
                 await ctx.reply(file=file)
-        else:
+
+        if not written:
             await ctx.error_reply(
                 t(_p(
                     'cmd:admin_data|error:no_results',
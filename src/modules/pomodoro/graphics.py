@@ -1,7 +1,9 @@
 from typing import TYPE_CHECKING
+import math
 
 from meta import LionBot
 from utils.lib import utc_now
+from utils.cardcache import card_cache
 
 from gui.cards import FocusTimerCard, BreakTimerCard
 
@@ -11,12 +13,19 @@ if TYPE_CHECKING:
 
 
 async def get_timer_card(bot: LionBot, timer: 'Timer', stage: 'Stage'):
+    """
+    Build the status card for the given timer stage.
+
+    The remaining time changes with every scheduled status update, so timer cards are never requested again.
+    They are kept out of the shared card cache, and the timer compares fingerprints with its last render instead.
+    """
     voicecog: 'VoiceTrackerCog' = bot.get_cog('VoiceTrackerCog')
 
     name = timer.base_name
     if stage is not None:
         duration = stage.duration
-        remaining = (stage.end - utc_now()).total_seconds()
+        # Times are passed with minute precision, so status updates with no visible change share a fingerprint
+        remaining = 60 * math.ceil((stage.end - utc_now()).total_seconds() / 60)
     else:
         remaining = duration = timer.data.focus_length
 
@@ -27,7 +36,7 @@ async def get_timer_card(bot: LionBot, timer: 'Timer', stage: 'Stage'):
             session = voicecog.get_session(guildid, member.id)
             tag = session.tag
             if session.start_time:
-                session_duration = (utc_now() - session.start_time).total_seconds()
+                session_duration = 60 * ((utc_now() - session.start_time).total_seconds() // 60)
             else:
                 session_duration = 0
         else:
@@ -50,9 +59,11 @@ async def get_timer_card(bot: LionBot, timer: 'Timer', stage: 'Stage'):
         timer.data.guildid, None, card_cls.card_id
     )
 
-    return card_cls(
+    return card_cache.card(
+        card_cls,
         name,
         remaining,
         duration,
         users=card_users,
+        store=False,
     )
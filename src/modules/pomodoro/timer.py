@@ -13,6 +13,7 @@ from core.lion_guild import LionGuild
 from core.data import CoreData
 from babel.translator import ctx_locale
 from gui.errors import RenderingException
+from analytics.profiler import profile_render
 
 from . import babel, logger
 from .data import TimerData
@@ -46,6 +47,7 @@ class Timer:
         '_voice_update_lock',
         '_run_task',
         '_loop_task',
+        '_last_card',
         'destroyed',
     )
 
@@ -81,6 +83,9 @@ class Timer:
         # Main loop task. Should not be cancelled.
         self._loop_task = None
 
+        # Fingerprint and image data of the last rendered status card
+        self._last_card: Optional[tuple[bytes, bytes]] = None
+
         self.destroyed = False
 
     def __repr__(self):
@@ -607,8 +612,9 @@ class Timer:
 
         if render:
             try:
-                card = await get_timer_card(self.bot, self, stage)
-                await card.render()
+                card, data = await profile_render(self._get_status_card(stage), guildid=self.data.guildid)
+                if card.key is not None:
+                    self._last_card = (card.key, data)
                 rawargs['file'] = card.as_file(f"pomodoro_{self.data.channelid}.png")
             except RenderingException:
                 pass
@@ -616,6 +622,16 @@ class Timer:
 
         return args
 
+    async def _get_status_card(self, stage: Optional[Stage]):
+        """
+        Build the status card, reusing the last render if none of the displayed fields changed.
+        """
+        card = await get_timer_card(self.bot, self, stage)
+        if self._last_card is not None and card.key == self._last_card[0]:
+            card.data = self._last_card[1]
+            card.cache_hit = True
+        return card
+
     @log_wrap(action='Send Timer Status')
     async def send_status(self, delete_last=True, **kwargs):
         """
@@ -1,6 +1,5 @@
 from typing import Optional
 import asyncio
-import datetime
 from weakref import WeakValueDictionary
 
 import discord
@@ -11,10 +10,10 @@ from cachetools import LRUCache
 
 from meta import LionBot, LionContext, LionCog
 from meta.logger import log_wrap
-from wards import high_management_ward, high_management_iward
+from wards import high_management_ward, high_management_iward, sys_admin_ward
 from core.data import RankType
 from utils.ui import ChoicedEnum, Transformed
-from utils.lib import utc_now, replace_multiple
+from utils.lib import utc_now, replace_multiple, tabulate
 from utils.ratelimits import Bucket, limit_concurrency
 from utils.data import TemporaryTable
 from modules.economy.cog import Economy
@@ -132,6 +131,9 @@ class RankCog(LionCog):
         # Weakly referenced Locks for each guild to serialise rank actions
         self._rank_locks: dict[int, asyncio.Lock] = WeakValueDictionary()
 
+        # Pending season statistic rebuilds. guildid -> Task
+        self._season_rebuilds: dict[int, asyncio.Task] = {}
+
     async def cog_load(self):
         await self.data.init()
 
@@ -142,6 +144,9 @@ class RankCog(LionCog):
         configcog = self.bot.get_cog('ConfigCog')
         self.crossload_group(self.configure_group, configcog.admin_config_group)
 
+        if (leo_setting_cog := self.bot.get_cog('LeoSettings')) is not None:
+            self.crossload_group(self.leo_group, leo_setting_cog.leo_group)
+
     def ranklock(self, guildid):
         lock = self._rank_locks.get(guildid, None)
         if lock is None:
@@ -150,15 +155,17 @@ class RankCog(LionCog):
         return lock
 
     # ---------- Event handlers ----------
-    # season_start setting event handler.. clears the guild season rank cache
+    # season_start setting event handler.. clears the guild season rank cache and rebuilds season stats
     @LionCog.listener('on_guildset_season_start')
     async def handle_season_start(self, guildid, setting):
         self._member_ranks.pop(guildid, None)
+        self.schedule_season_rebuild(guildid)
 
-    # guild_leave event handler.. removes the guild from _guild_ranks and clears the season cache
+    # rank_type setting event handler.. clears the rank caches and reconciles season stats
     @LionCog.listener('on_guildset_rank_type')
     async def handle_rank_type(self, guildid, setting):
         self.flush_guild_ranks(guildid)
+        self.schedule_season_rebuild(guildid)
 
     # rank_type setting event handler.. clears the guild season rank cache and the _guild_ranks cache
 
@@ -195,6 +202,64 @@ class RankCog(LionCog):
             RankType.XP: 'current_xp_rankid'
         }[rank_type]
 
+    # ---------- Season statistics ----------
+    def schedule_season_rebuild(self, guildid: int) -> asyncio.Task:
+        """
+        Schedule a rebuild of the stored season statistics for the given guild.
+
+        Season statistic reads for the guild wait for the rebuild to complete.
+        """
+        task = asyncio.create_task(self._rebuild_season(guildid), name=f"season-rebuild-{guildid}")
+        self._season_rebuilds[guildid] = task
+
+        def _done(task):
+            if self._season_rebuilds.get(guildid, None) is task:
+                self._season_rebuilds.pop(guildid, None)
+        task.add_done_callback(_done)
+        return task
+
+    @log_wrap(action="Season Rebuild")
+    async def _rebuild_season(self, guildid: int) -> int:
+        count = await self.data.SeasonStats.rebuild_guild(guildid)
+        self._member_ranks.pop(guildid, None)
+        if (stats_cog := self.bot.get_cog('StatsCog')) is not None:
+            stats_cog.leaderboards.invalidate(guildid)
+        logger.info(
+            f"Rebuilt season statistics for <gid: {guildid}>. {count} members have season statistics."
+        )
+        return count
+
+    async def _season_ready(self, guildid: int):
+        """
+        Wait for any pending season statistic rebuild in the given guild.
+        """
+        if (task := self._season_rebuilds.get(guildid, None)) is not None:
+            await asyncio.shield(task)
+
+    async def ensure_season(self, guildid: int):
+        """
+        Ensure the stored season statistics for the given guild are computed against the current season,
+        rebuilding them if required.
+        """
+        await self._season_ready(guildid)
+        if await self.data.SeasonStats.stale_guilds(guildid):
+            await self.schedule_season_rebuild(guildid)
+
+    async def season_stat(self, guildid: int, userid: int, rank_type: RankType) -> int:
+        """
+        Retrieve the current season statistic of the given type for the given member.
+        """
+        lguild = await self.bot.core.lions.fetch_guild(guildid)
+        season_start = lguild.config.get('season_start').value
+
+        await self._season_ready(guildid)
+        stat = await self.data.SeasonStats.member_stat(guildid, userid, rank_type, season_start)
+        if stat is None:
+            # Stored statistics were computed for a previous season
+            await self.schedule_season_rebuild(guildid)
+            stat = await self.data.SeasonStats.member_stat(guildid, userid, rank_type, season_start)
+        return stat or 0
+
     async def get_member_rank(self, guildid: int, userid: int) -> SeasonRank:
         """
         Fetch the SeasonRank info for the given member.
@@ -206,29 +271,19 @@ class RankCog(LionCog):
             # Fetch season rank anew
             lguild = await self.bot.core.lions.fetch_guild(guildid)
             rank_type = lguild.config.get('rank_type').value
-            # TODO: Benchmark alltime efficiency
-            season_start = lguild.config.get('season_start').value or datetime.datetime(1970, 1, 1)
-            stat_data = self.bot.get_cog('StatsCog').data
-            text_data = self.bot.get_cog('TextTrackerCog').data
             member_row = await self.data.MemberRank.fetch_or_create(guildid, userid)
+            stat = await self.season_stat(guildid, userid, rank_type)
             if rank_type is RankType.VOICE:
-                model = stat_data.VoiceSessionStats
-                # TODO: Should probably only used saved sessions here...
-                stat = (await model.study_times_since(guildid, userid, season_start))[0]
                 if rankid := member_row.current_voice_rankid:
                     current_rank = await self.data.VoiceRank.fetch(rankid)
                 else:
                     current_rank = None
             elif rank_type is RankType.XP:
-                model = stat_data.MemberExp
-                stat = (await model.xp_since(guildid, userid, season_start))[0]
                 if rankid := member_row.current_xp_rankid:
                     current_rank = await self.data.XPRank.fetch(rankid)
                 else:
                     current_rank = None
             elif rank_type is RankType.MESSAGE:
-                model = text_data.TextSessions
-                stat = (await model.member_messages_since(guildid, userid, season_start))[0]
                 if rankid := member_row.current_msg_rankid:
                     current_rank = await self.data.MsgRank.fetch(rankid)
                 else:
@@ -650,13 +705,8 @@ class RankCog(LionCog):
                 async with self.ranklock(guildid):
                     if (_members := self._member_ranks.get(guildid, None)) is not None and userid in _members:
                         session_rank = _members[userid]
-                        # TODO: Temporary measure
-                        season_start = lguild.config.get('season_start').value or datetime.datetime(1970, 1, 1)
-                        stat_data = self.bot.get_cog('StatsCog').data
-                        session_rank.stat = (await stat_data.VoiceSessionStats.study_times_since(
-                            guildid, userid, season_start)
-                        )[0]
-                        # session_rank.stat += duration if (rank_type is RankType.VOICE) else guild_xp
+                        # The completed session has already been applied to the stored season statistics
+                        session_rank.stat = await self.season_stat(guildid, userid, rank_type)
                     else:
                         session_rank = await self.get_member_rank(guildid, userid)
 
@@ -730,26 +780,17 @@ class RankCog(LionCog):
         lguild = await self.bot.core.lions.fetch_guild(guild.id)
         season_start = lguild.config.get('season_start').value
         rank_type = lguild.config.get('rank_type').value
-        stats_model = self._get_stats_model(rank_type)
-        if season_start:
-            leaderboard = await stats_model.leaderboard_since(guild.id, season_start)
-        else:
-            leaderboard = await stats_model.leaderboard_all(guild.id)
+        leaderboards = self.bot.get_cog('StatsCog').leaderboards
+        leaderboard = await leaderboards.get(guild.id, rank_type, season_start)
 
         # Compile map of correct ranks
-        # Filtering out members who are untracked or not in server
-        unranked_role_setting = await self.bot.get_cog('StatsCog').settings.UnrankedRoles.get(guild.id)
-        unranked_roleids = set(unranked_role_setting.data)
+        # The shared leaderboard only contains ranked members currently in the server
         true_member_ranks: dict[int, RankData.VoiceRank | RankData.XPRank | RankData.MsgRank] = {}
-        for userid, stat_total in leaderboard:
-            # Check member exists
-            if member := guild.get_member(userid):
-                # Check member does not have unranked roles
-                if not (member.bot or any(role.id in unranked_roleids for role in member.roles)):
-                    # Compute member rank
-                    rank = next((rank for rank in reversed(ranks) if rank.required <= stat_total), None)
-                    if rank is not None:
-                        true_member_ranks[userid] = rank
+        for userid, stat_total in leaderboard[:]:
+            # Compute member rank
+            rank = next((rank for rank in reversed(ranks) if rank.required <= stat_total), None)
+            if rank is not None:
+                true_member_ranks[userid] = rank
 
         # Compile maps of member roles that need removal and member roles that need adding
         to_remove: list[tuple[discord.Member, list[discord.Role]]] = []
@@ -911,6 +952,92 @@ class RankCog(LionCog):
                 ephemeral=True
             )
 
+    # ----- Owner commands -----
+    @LionCog.placeholder_group
+    @cmds.hybrid_group("leo", with_app_command=False)
+    async def leo_group(self, ctx: LionContext):
+        ...
+
+    @leo_group.command(
+        name=_p('cmd:leo_season_rebuild', "season_rebuild"),
+        description=_p(
+            'cmd:leo_season_rebuild|desc',
+            "Rebuild the stored season statistics for a guild."
+        )
+    )
+    @appcmds.describe(
+        guildid=_p(
+            'cmd:leo_season_rebuild|param:guildid|desc',
+            "Guild to rebuild, defaults to the current guild."
+        )
+    )
+    @sys_admin_ward
+    async def cmd_leo_season_rebuild(self, ctx: LionContext, guildid: Optional[str] = None):
+        if not ctx.interaction:
+            return
+        target = int(guildid) if guildid else ctx.guild.id
+        await ctx.interaction.response.defer(thinking=True)
+
+        start = utc_now()
+        count = await self.schedule_season_rebuild(target)
+        duration = (utc_now() - start).total_seconds()
+        self.flush_guild_ranks(target)
+
+        await ctx.reply(
+            embed=discord.Embed(
+                colour=discord.Colour.brand_green(),
+                description=(
+                    f"Rebuilt season statistics for `{target}` in `{duration:.2f}` seconds.\n"
+                    f"`{count}` members have season statistics."
+                )
+            )
+        )
+
+    @leo_group.command(
+        name=_p('cmd:leo_season_check', "season_check"),
+        description=_p(
+            'cmd:leo_season_check|desc',
+            "Check the stored season statistics for a guild against the raw session data."
+        )
+    )
+    @appcmds.describe(
+        guildid=_p(
+            'cmd:leo_season_check|param:guildid|desc',
+            "Guild to check, defaults to the current guild."
+        )
+    )
+    @sys_admin_ward
+    async def cmd_leo_season_check(self, ctx: LionContext, guildid: Optional[str] = None):
+        if not ctx.interaction:
+            return
+        target = int(guildid) if guildid else ctx.guild.id
+        await ctx.interaction.response.defer(thinking=True)
+
+        await self._season_ready(target)
+        mismatches = await self.data.SeasonStats.check_guild(target)
+        if not mismatches:
+            embed = discord.Embed(
+                colour=discord.Colour.brand_green(),
+                description=f"Season statistics for `{target}` are consistent with the session data."
+            )
+        else:
+            lines = []
+            for row in mismatches[:10]:
+                fields = []
+                for stat in ('voice_stats', 'xp_stats', 'message_stats'):
+                    if row[stat] != row[f"expected_{stat}"]:
+                        fields.append(f"{stat} `{row[stat]}` (expected `{row[f'expected_{stat}']}`)")
+                if row['season_start'] != row['expected_season_start']:
+                    fields.append("stale season")
+                lines.append((str(row['userid']), ', '.join(fields)))
+            embed = discord.Embed(
+                colour=discord.Colour.orange(),
+                title=f"{len(mismatches)} inconsistent members in `{target}`",
+                description='\n'.join(tabulate(*lines))
+            )
+            embed.set_footer(text="Sessions saved during the check may appear as inconsistencies.")
+        await ctx.reply(embed=embed)
+
     # ----- Guild Configuration -----
     @LionCog.placeholder_group
     @cmds.hybrid_group('configure', with_app_command=False)
@@ -1,5 +1,9 @@
-from typing import TypeAlias, Union
+from typing import TypeAlias, Union, Optional
+import datetime as dt
 
+from psycopg import sql
+
+from meta.logger import log_wrap
 from core.data import RankType
 
 from data import RowModel, Registry, Table, RegisterEnum
@@ -105,5 +109,196 @@ class RankData(Registry):
         current_msg_rankid = Integer()
         last_roleid = Integer()
 
+    class SeasonStats(RowModel):
+        """
+        Per-member statistics for the current guild season.
+
+        Maintained by database triggers as voice sessions, text sessions and experience are saved.
+        Voice statistics only include completed sessions, ongoing sessions are added when read.
+        Rows are computed against the recorded `season_start`,
+        and the guild must be rebuilt when the guild season start changes.
+
+        Schema
+        ------
+        CREATE TABLE season_stats(
+          guildid BIGINT NOT NULL,
+          userid BIGINT NOT NULL,
+          voice_stats INTEGER NOT NULL DEFAULT 0,
+          xp_stats INTEGER NOT NULL DEFAULT 0,
+          message_stats INTEGER NOT NULL DEFAULT 0,
+          season_start TIMESTAMPTZ,
+          updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+          PRIMARY KEY (guildid, userid),
+          FOREIGN KEY (guildid, userid) REFERENCES members (guildid, userid) ON DELETE CASCADE
+        );
+        """
+        _tablename_ = 'season_stats'
+
+        guildid = Integer(primary=True)
+        userid = Integer(primary=True)
+        voice_stats = Integer()
+        xp_stats = Integer()
+        message_stats = Integer()
+        season_start = Timestamp()
+        updated_at = Timestamp()
+
+        _stat_columns = {
+            RankType.VOICE: 'voice_stats',
+            RankType.XP: 'xp_stats',
+            RankType.MESSAGE: 'message_stats',
+        }
+
+        @classmethod
+        @log_wrap(action='season_stats_rebuild')
+        async def rebuild_guild(cls, guildid: int) -> int:
+            """
+            Recompute the season statistics for every member of the given guild from the raw data.
+
+            Returns the number of members with season statistics.
+            """
+            query = sql.SQL("SELECT season_stats_rebuild(%s) AS members")
+            async with cls._connector.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(query, (guildid,))
+                    row = await cursor.fetchone()
+            return row['members'] or 0
+
+        @classmethod
+        @log_wrap(action='season_stats_check')
+        async def check_guild(cls, guildid: int) -> list[dict]:
+            """
+            Compare the stored season statistics for the given guild against the raw data.
+
+            Returns a row for each member whose stored statistics differ,
+            with the stored values and the `expected_` values.
+            Sessions saved while the check runs may show up as spurious differences.
+            """
+            query = sql.SQL(
+                """
+                SELECT
+                    userid,
+                    stored.voice_stats, expected.voice_stats AS expected_voice_stats,
+                    stored.xp_stats, expected.xp_stats AS expected_xp_stats,
+                    stored.message_stats, expected.message_stats AS expected_message_stats,
+                    stored.season_start, expected.season_start AS expected_season_start
+                FROM season_stats_compute(%s) AS expected
+                FULL OUTER JOIN (
+                    SELECT * FROM season_stats WHERE guildid = %s
+                ) AS stored USING (userid)
+                WHERE
+                    (stored.voice_stats, stored.xp_stats, stored.message_stats, stored.season_start)
+                    IS DISTINCT FROM
+                    (expected.voice_stats, expected.xp_stats, expected.message_stats, expected.season_start)
+                ORDER BY userid
+                """
+            )
+            async with cls._connector.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(query, (guildid, guildid))
+                    return await cursor.fetchall()
+
+        @classmethod
+        @log_wrap(action='season_stats_stale')
+        async def stale_guilds(cls, *guildids: int) -> list[int]:
+            """
+            Return the guilds (amongst those given) with statistics computed against an old season start.
+            """
+            query = sql.SQL(
+                """
+                SELECT DISTINCT guild_config.guildid
+                FROM season_stats
+                JOIN guild_config USING (guildid)
+                WHERE
+                    guild_config.guildid = ANY(%s)
+                    AND season_stats.season_start IS DISTINCT FROM guild_config.season_start
+                """
+            )
+            async with cls._connector.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(query, (list(guildids),))
+                    return [row['guildid'] for row in await cursor.fetchall()]
+
+        @classmethod
+        @log_wrap(action='season_stats_member')
+        async def member_stat(cls, guildid: int, userid: int, rank_type: RankType,
+                              season_start: Optional[dt.datetime]) -> Optional[int]:
+            """
+            Retrieve the current season statistic of the given type for the given member.
+
+            Voice statistics include the part of any ongoing session lying in the season.
+            Returns `None` if the stored statistics were computed for a different season.
+            """
+            query = sql.SQL(
+                """
+                SELECT
+                    stored.{column} AS stat,
+                    stored.season_start,
+                    (
+                        SELECT EXTRACT(EPOCH FROM (NOW() - GREATEST(start_time, %s)))
+                        FROM voice_sessions_ongoing
+                        WHERE guildid = %s AND userid = %s
+                    ) AS ongoing
+                FROM (VALUES (%s::BIGINT, %s::BIGINT)) AS member (guildid, userid)
+                LEFT JOIN season_stats stored USING (guildid, userid)
+                """
+            ).format(column=sql.Identifier(cls._stat_columns[rank_type]))
+            async with cls._connector.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(query, (season_start, guildid, userid, guildid, userid))
+                    row = await cursor.fetchone()
+
+            if row['stat'] is not None and row['season_start'] != season_start:
+                return None
+            stat = row['stat'] or 0
+            if rank_type is RankType.VOICE and row['ongoing']:
+                stat += max(int(row['ongoing']), 0)
+            return stat
+
+        @classmethod
+        @log_wrap(action='season_leaderboard')
+        async def leaderboard(cls, guildid: int, rank_type: RankType,
+                              season_start: Optional[dt.datetime]) -> list[tuple[int, int]]:
+            """
+            Return the current season totals of the given type for each member in the guild,
+            ordered from highest to lowest.
+
+            Voice totals include the part of any ongoing session lying in the season.
+            """
+            if rank_type is RankType.VOICE:
+                query = sql.SQL(
+                    """
+                    SELECT
+                        userid,
+                        COALESCE(stored.voice_stats, 0) + COALESCE(ongoing.duration, 0) AS total
+                    FROM (
+                        SELECT userid, voice_stats FROM season_stats WHERE guildid = %s
+                    ) AS stored
+                    FULL OUTER JOIN (
+                        SELECT
+                            userid,
+                            GREATEST(EXTRACT(EPOCH FROM (NOW() - GREATEST(start_time, %s))), 0)::INTEGER AS duration
+                        FROM voice_sessions_ongoing
+                        WHERE guildid = %s
+                    ) AS ongoing USING (userid)
+                    ORDER BY total DESC, userid ASC
+                    """
+                )
+                args = (guildid, season_start, guildid)
+            else:
+                query = sql.SQL(
+                    """
+                    SELECT userid, {column} AS total
+                    FROM season_stats
+                    WHERE guildid = %s
+                    ORDER BY total DESC, userid ASC
+                    """
+                ).format(column=sql.Identifier(cls._stat_columns[rank_type]))
+                args = (guildid,)
+
+            async with cls._connector.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(query, args)
+                    return [(row['userid'], int(row['total'])) for row in await cursor.fetchall()]
+
 
 AnyRankData: TypeAlias = Union[RankData.XPRank, RankData.VoiceRank, RankData.MsgRank]
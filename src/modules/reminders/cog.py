@@ -217,15 +217,17 @@ class Reminders(LionCog):
         """
         if not self.executor:
             raise ValueError("Only the executor shard can reload reminders!")
-        # Load all reminder tasks
-        reminders = await self.data.Reminder.fetch_where(
+        # Load all reminder tasks, scheduling each batch as it arrives
+        self.monitor.set_tasks()
+        count = 0
+        async for reminders in self.data.Reminder.stream_where(
             self.data.Reminder.remind_at > utc_now(),
             failed=None
-        )
-        tasks = [(r.reminderid, r.timestamp) for r in reminders]
-        self.monitor.set_tasks(*tasks)
+        ):
+            self.monitor.schedule_tasks(*((r.reminderid, r.timestamp) for r in reminders))
+            count += len(reminders)
         logger.info(
-            f"Reloaded ReminderMonitor with {len(tasks)} active reminders."
+            f"Reloaded ReminderMonitor with {count} active reminders."
         )
 
     async def cancel_reminders(self, *reminderids):
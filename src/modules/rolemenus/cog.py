@@ -255,8 +255,7 @@ class RoleMenuCog(LionCog):
             await menu.attach()
 
         # Fetch all unexpired expiring menu roles from these menus
-        expiring = await self.data.RoleMenuHistory.fetch_expiring_where(menuid=menuids)
-        if expiring:
+        async for expiring in self.data.RoleMenuHistory.stream_expiring_where(menuid=menuids):
             await self.schedule_expiring(*expiring)
 
     # ----- Cog API -----
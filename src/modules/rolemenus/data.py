@@ -83,3 +83,16 @@ class RoleMenuData(Registry):
                 (cls.removed_at == NULL),
                 *args, **kwargs
             )
+
+        @classmethod
+        def stream_expiring_where(cls, *args, **kwargs):
+            """
+            Stream expiring equip rows in batches.
+
+            This returns an async iterator over lists of rows, see `RowModel.stream_where`.
+            """
+            return cls.stream_where(
+                (cls.expires_at != NULL),
+                (cls.removed_at == NULL),
+                *args, **kwargs
+            )
@@ -13,6 +13,8 @@ from meta.errors import ResponseTimedOut
 from meta.sharding import THIS_SHARD
 from utils.lib import utc_now, error_embed
 from utils.ui import Confirm
+from utils.monitor import TaskMonitor
+from utils.ratelimits import Bucket
 from constants import MAX_COINS
 from core.data import CoreData
 
@@ -29,7 +31,49 @@ from .lib import parse_members, owner_overwrite, member_overwrite, bot_overwrite
 _p, _np = babel._p, babel._np
 
 
+class RentMonitor(TaskMonitor[int]):
+    """
+    Task monitor for private room rent, keyed by channelid and scheduled at the next rent tick.
+
+    Unlike the base monitor, every room which is due when the monitor wakes up
+    is passed to the executor together as a list of channelids,
+    so rent is charged with one query per batch instead of one per room.
+    """
+    async def monitor(self):
+        try:
+            while True:
+                self._wakeup.clear()
+                if (nextentry := self._peek()) is None:
+                    await self._wakeup.wait()
+                    continue
+                sleep_for = nextentry[0] - utc_now().timestamp()
+                if sleep_for > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=sleep_for)
+                    except asyncio.TimeoutError:
+                        pass
+                    else:
+                        continue
+                due = self.pop_due(utc_now().timestamp())
+                if due:
+                    try:
+                        await asyncio.shield(self.executor(due))
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception:
+                        logger.exception(
+                            f"Unhandled exception while charging rent for {len(due)} private rooms."
+                        )
+        except asyncio.CancelledError:
+            logger.debug(
+                f"Rent monitor cancelled with {len(self._taskmap)} rooms remaining."
+            )
+
+
 class RoomCog(LionCog):
+    # Maximum number of rooms to charge in a single query
+    rent_batch_size = 1000
+
     def __init__(self, bot: LionBot):
         self.bot = bot
         self.data = bot.db.load_registry(RoomData())
@@ -38,7 +82,13 @@ class RoomCog(LionCog):
         self.ready = False
         self.event_lock = asyncio.Lock()
         self._room_cache = defaultdict(dict)  # Map guildid -> channelid -> Room
-        self._ticker_tasks = {}  # Map channelid -> room run task
+        self._rooms: dict[int, Room] = {}  # Map channelid -> running Room
+
+        # Single scheduler charging rent for every running room
+        self.rent_monitor = RentMonitor(executor=self._charge_rent)
+        # Ratelimit for the notifications and deletions following each rent charge
+        self._tick_bucket = Bucket(5, 1)
+        self._tick_tasks: set[asyncio.Task] = set()
 
     async def cog_load(self):
         await self.data.init()
@@ -53,8 +103,10 @@ class RoomCog(LionCog):
             await self.initialise()
 
     async def cog_unload(self):
-        # Cancel room tick loops
-        for task in self._ticker_tasks.values():
+        # Stop charging rent
+        if self.rent_monitor._monitor_task:
+            self.rent_monitor._monitor_task.cancel()
+        for task in self._tick_tasks:
             task.cancel()
 
     def get_rooms(self, guildid: int, userid: Optional[int] = None):
@@ -109,28 +161,80 @@ class RoomCog(LionCog):
                 self._start(room)
 
         logger.info(
-            f"Launched ticker tasks for {len(to_launch)} private rooms."
+            f"Scheduled rent for {len(to_launch)} private rooms."
         )
 
     def _start(self, room: Room):
-        task = asyncio.create_task(self._ticker(room))
+        """
+        Add the given room to the running rooms, and schedule its next rent charge.
+        """
         key = room.data.channelid
-        self._ticker_tasks[key] = task
-        task.add_done_callback(lambda fut: self._ticker_tasks.pop(key, None))
+        self._room_cache[room.data.guildid][key] = room
+        self._rooms[key] = room
+        self.rent_monitor.schedule_task(key, room.next_tick.timestamp())
 
-    async def _ticker(self, room: Room):
-        cache = self._room_cache
-        cache[room.data.guildid][room.data.channelid] = room
-        try:
-            await room.run()
-        except asyncio.CancelledError:
-            pass
-        except Exception:
-            logger.exception(
-                f"Unhandled exception during room run task. This should not happen! {room.data!r}"
+    def _stop(self, room: Room):
+        """
+        Remove the given room from the running rooms, cancelling its rent charge.
+        """
+        key = room.data.channelid
+        self._room_cache[room.data.guildid].pop(key, None)
+        self._rooms.pop(key, None)
+        self.rent_monitor.cancel_tasks(key)
+
+    @log_wrap(action="Charge Rent")
+    async def _charge_rent(self, channelids: list[int]):
+        """
+        Deduct the daily rent from the given rooms in bulk, and reschedule the rooms which are still running.
+
+        The resulting notifications and expiries are processed in the background under the tick ratelimit.
+        """
+        rooms = [room for cid in channelids if (room := self._rooms.get(cid, None)) is not None]
+        if not rooms:
+            return
+        logger.debug(f"Charging rent for {len(rooms)} private rooms.")
+
+        now = utc_now()
+        charged = []
+        for i in range(0, len(rooms), self.rent_batch_size):
+            batch = rooms[i:i+self.rent_batch_size]
+            # Room data is cached, so the returned rows update the running rooms
+            rows = await self.data.Room.deduct_rent(
+                *((room.data.channelid, room.rent) for room in batch),
+                at=now
             )
-        finally:
-            cache[room.data.guildid].pop(room.data.channelid)
+            charged_ids = {row.channelid for row in rows}
+            for room in batch:
+                if room.data.channelid in charged_ids:
+                    charged.append(room)
+                else:
+                    # Room was deleted from data under us
+                    logger.info(
+                        f"Stopping private room <cid: {room.data.channelid}> with no live data row."
+                    )
+                    self._stop(room)
+
+        # Expiring rooms are unscheduled again when they are destroyed
+        self.rent_monitor.schedule_tasks(*(
+            (room.data.channelid, room.next_tick.timestamp()) for room in charged
+        ))
+        task = asyncio.create_task(self._process_ticks(charged))
+        self._tick_tasks.add(task)
+        task.add_done_callback(self._tick_tasks.discard)
+
+    @log_wrap(action="Process Room Ticks")
+    async def _process_ticks(self, rooms: list[Room]):
+        for room in rooms:
+            try:
+                await self._tick_bucket.wait()
+                self._tick_bucket.request()
+                await room.process_tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(
+                    f"Unhandled exception while processing tick for room: {room.data!r}"
+                )
 
     # ----- Event Handlers -----
     @LionCog.listener('on_ready')
@@ -140,15 +244,18 @@ class RoomCog(LionCog):
         Restore rented channels.
         """
         async with self.event_lock:
-            # Cancel any running tickers, we will recreate them
-            for task in self._ticker_tasks.values():
-                task.cancel()
+            # Forget any running rooms, we will recreate them
+            self._room_cache.clear()
+            self._rooms.clear()
+            self.rent_monitor.set_tasks()
+            if not self.rent_monitor._monitor_task or self.rent_monitor._monitor_task.done():
+                self.rent_monitor.start()
 
             room_data = await self.data.Room.fetch_where(THIS_SHARD, deleted_at=None)
             await self._prepare_rooms(room_data)
 
             logger.info(
-                f"Private Room system initialised with {len(self._ticker_tasks)} running rooms."
+                f"Private Room system initialised with {len(self._rooms)} running rooms."
             )
 
     @LionCog.listener('on_guild_remove')
@@ -1,5 +1,6 @@
 from data import Registry, RowModel
 from data.columns import Integer, Timestamp, String
+from utils.data import TemporaryTable
 
 
 class RoomData(Registry):
@@ -29,6 +30,24 @@ class RoomData(Registry):
         last_tick = Timestamp()
         deleted_at = Timestamp()
 
+        @classmethod
+        async def deduct_rent(cls, *rents: tuple[int, int], at) -> list['RoomData.Room']:
+            """
+            Deduct rent from each given room balance, and set the last tick to `at`.
+
+            Takes `(channelid, rent)` pairs, skipping rooms which have been deleted.
+            Returns the updated rooms, some of which may now have a negative balance.
+            """
+            tmptable = TemporaryTable('_channelid', '_rent', types=('BIGINT', 'INTEGER'))
+            tmptable.values = list(rents)
+            return await cls.table.update_where(
+                channelid=tmptable['_channelid'],
+                deleted_at=None
+            ).set(
+                coin_balance=cls.coin_balance - tmptable['_rent'],
+                last_tick=at
+            ).from_expr(tmptable).with_adapter(cls._make_rows)
+
     class RoomMember(RowModel):
         """
         Schema
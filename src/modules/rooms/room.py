@@ -1,5 +1,4 @@
 from typing import Optional
-import asyncio
 from datetime import timedelta, datetime
 
 import discord
@@ -22,7 +21,7 @@ _p = babel._p
 
 
 class Room:
-    __slots__ = ('bot', 'data', 'lguild', 'members', '_tick_wait')
+    __slots__ = ('bot', 'data', 'lguild', 'members')
 
     tick_length = timedelta(days=1)
     # tick_length = timedelta(hours=1)
@@ -35,9 +34,6 @@ class Room:
 
         log_context.set(f"cid: {self.data.channelid}")
 
-        # State
-        self._tick_wait: Optional[asyncio.Task] = None
-
     @property
     def channel(self) -> Optional[discord.VoiceChannel]:
         """
@@ -259,39 +255,14 @@ class Room:
             except discord.HTTPException:
                 pass
 
-    @log_wrap(action="Room Runloop")
-    async def run(self):
-        """
-        Tick loop.
-
-        Keeps scheduling ticks until expired or cancelled.
-        May be safely cancelled.
-        """
-        if self._tick_wait and not self._tick_wait.done():
-            self._tick_wait.cancel()
-
-        while not self.deleted:
-            now = utc_now()
-            diff = (self.next_tick - now).total_seconds()
-            self._tick_wait = asyncio.create_task(asyncio.sleep(diff))
-            try:
-                await self._tick_wait
-                await asyncio.shield(self._tick())
-            except asyncio.CancelledError:
-                break
-            except Exception:
-                logger.exception(
-                    f"Unhandled exception while ticking for room: {self.data!r}"
-                )
-
     @log_wrap(action="Room Tick")
-    async def _tick(self):
+    async def process_tick(self):
         """
-        Execute the once-per day room tick.
+        Handle the once-per day room tick, after the rent has been deducted from the room balance.
 
-        This deducts the rent amount from the room balance,
-        if the balance is insufficient, expires the room.
-        Posts a status message in the room channel when it does so.
+        If the balance is now negative, expires the room.
+        Otherwise posts a status message in the room channel.
+        Rent deduction is done in bulk by the `RoomCog` rent monitor.
         """
         t = self.bot.translator.t
         ctx_locale.set(self.lguild.config.get('guild_locale').value)
@@ -299,15 +270,8 @@ class Room:
             # Already deleted, nothing to do
             pass
         else:
-            # Run tick
             logger.debug(f"Tick running for room: {self.data!r}")
 
-            # Deduct balance
-            await self.data.update(
-                coin_balance=RoomData.Room.coin_balance - self.rent,
-                last_tick=utc_now()
-            )
-
             # If balance is negative, expire room, otherwise notify channel
             if self.data.coin_balance < 0:
                 if owner := self.bot.get_user(self.data.ownerid):
@@ -381,8 +345,8 @@ class Room:
         Attempts to delete the voice channel and log destruction.
         This is idempotent, so multiple events may trigger destroy.
         """
-        if self._tick_wait:
-            self._tick_wait.cancel()
+        if (cog := self.bot.get_cog('RoomCog')) is not None:
+            cog._stop(self)
 
         if self.channel:
             try:
@@ -177,60 +177,58 @@ class TimeSlot:
         """
         now = utc_now()
         tracker = self.bot.get_cog('VoiceTrackerCog')
-        tracking_lock = tracker.tracking_lock
         sessions.sort(key=lambda s: s.guildid)
         session_locks = [session.lock for session in sessions]
 
-        # Take the tracking lock so that sessions are not started/finished while we reset the clock
-        try:
-            await tracking_lock.acquire()
-            [await lock.acquire() for lock in session_locks]
-            if now > self.start_at + dt.timedelta(minutes=5):
-                # Set initial clocks based on session data
-                # First request sessions intersection with the timeslot
-                memberids = [
-                    (sm.data.guildid, sm.data.userid)
-                    for sg in sessions for sm in sg.members.values()
-                ]
-                session_map = {session.guildid: session for session in sessions}
-                model = tracker.data.VoiceSessions
-                if memberids:
-                    voice_sessions = await model.table.select_where(
-                        MEMBERS(*memberids),
-                        model.start_time < self.end_at,
-                        model.start_time + as_duration(model.duration) > self.start_at
-                    ).select(
-                        'guildid', 'userid', 'start_time', 'channelid',
-                        end_time=model.start_time + as_duration(model.duration)
-                    ).with_no_adapter()
-                else:
-                    voice_sessions = []
-
-                # Intersect and aggregate sessions, accounting for session channels
-                clocks = defaultdict(int)
-                for vsession in voice_sessions:
-                    if session_map[vsession['guildid']].validate_channel(vsession['channelid']):
-                        start = max(vsession['start_time'], self.start_at)
-                        end = min(vsession['end_time'], self.end_at)
-                        clocks[(vsession['guildid'], vsession['userid'])] += (end - start).total_seconds()
-
-                # Now write clocks
-                for sg in sessions:
-                    for sm in sg.members.values():
-                        sm.clock = clocks[(sm.guildid, sm.userid)]
-
-            # Mark current attendance using current voice session
-            for session in sessions:
-                for smember in session.members.values():
-                    voice_session = tracker.get_session(smember.data.guildid, smember.data.userid)
-                    smember.clock_start = None
-                    if voice_session is not None and voice_session.activity is SessionState.ONGOING:
-                        if session.validate_channel(voice_session.data.channelid):
-                            smember.clock_start = max(voice_session.data.start_time, self.start_at)
-                session.listening = True
-        finally:
-            tracking_lock.release()
-            [lock.release() for lock in session_locks]
+        # Take the tracking barrier for these guilds so that sessions are not started/finished while we reset the clock
+        async with tracker.tracking_locks.guild(*(session.guildid for session in sessions)):
+            try:
+                [await lock.acquire() for lock in session_locks]
+                if now > self.start_at + dt.timedelta(minutes=5):
+                    # Set initial clocks based on session data
+                    # First request sessions intersection with the timeslot
+                    memberids = [
+                        (sm.data.guildid, sm.data.userid)
+                        for sg in sessions for sm in sg.members.values()
+                    ]
+                    session_map = {session.guildid: session for session in sessions}
+                    model = tracker.data.VoiceSessions
+                    if memberids:
+                        voice_sessions = await model.table.select_where(
+                            MEMBERS(*memberids),
+                            model.start_time < self.end_at,
+                            model.start_time + as_duration(model.duration) > self.start_at
+                        ).select(
+                            'guildid', 'userid', 'start_time', 'channelid',
+                            end_time=model.start_time + as_duration(model.duration)
+                        ).with_no_adapter()
+                    else:
+                        voice_sessions = []
+
+                    # Intersect and aggregate sessions, accounting for session channels
+                    clocks = defaultdict(int)
+                    for vsession in voice_sessions:
+                        if session_map[vsession['guildid']].validate_channel(vsession['channelid']):
+                            start = max(vsession['start_time'], self.start_at)
+                            end = min(vsession['end_time'], self.end_at)
+                            clocks[(vsession['guildid'], vsession['userid'])] += (end - start).total_seconds()
+
+                    # Now write clocks
+                    for sg in sessions:
+                        for sm in sg.members.values():
+                            sm.clock = clocks[(sm.guildid, sm.userid)]
+
+                # Mark current attendance using current voice session
+                for session in sessions:
+                    for smember in session.members.values():
+                        voice_session = tracker.get_session(smember.data.guildid, smember.data.userid)
+                        smember.clock_start = None
+                        if voice_session is not None and voice_session.activity is SessionState.ONGOING:
+                            if session.validate_channel(voice_session.data.channelid):
+                                smember.clock_start = max(voice_session.data.start_time, self.start_at)
+                    session.listening = True
+            finally:
+                [lock.release() for lock in session_locks]
 
     @log_wrap(action="Prepare Sessions")
     async def prepare(self, sessions: list[ScheduledSession]):
@@ -419,6 +417,11 @@ class TimeSlot:
                     clock=att_table['_clock'],
                     reward_transactionid=att_table['_reward']
                 ).from_expr(att_table)
+                self.bot.dispatch(
+                    'schedule_sessions_attended',
+                    self.slotid,
+                    *((gid, uid) for _, gid, uid, att, _ in attendance if att)
+                )
 
             # Mark guild sessions as closed
             if sessions:
@@ -12,7 +12,10 @@ from frozendict import frozendict
 from meta import LionCog, LionBot, LionContext
 from meta.errors import UserInputError
 from meta.logger import log_wrap
+from meta.context import ctx_skin
+from meta.monitor import ComponentMonitor, ComponentStatus, StatusLevel
 from utils.lib import MISSING, utc_now
+from utils.cardcache import card_cache
 from wards import sys_admin_ward, low_management_ward
 from gui.base import AppSkin
 from babel.translator import ctx_locale
@@ -50,6 +53,8 @@ class CustomSkinCog(LionCog):
 
         self.current_default: Optional[str] = None
 
+        self.monitor = ComponentMonitor('CardCache', self._monitor)
+
     async def cog_load(self):
         await self.data.init()
 
@@ -67,6 +72,9 @@ class CustomSkinCog(LionCog):
         await self._reload_property_map()
         await self.get_default_skin()
 
+        card_cache.budget = self.bot.config.gui.getint('card_cache_budget', 64) * 2**20
+        self.bot.system_monitor.add_component(self.monitor)
+
     async def _reload_property_map(self):
         """
         Reload the skin property id to (card_id, property_name) bijection.
@@ -105,6 +113,33 @@ class CustomSkinCog(LionCog):
             f"Loaded '{len(cache)}' global base skins."
         )
 
+    async def _monitor(self):
+        state = (
+            "<"
+                "CardCache"
+                " entries={entries}"
+                " size={size}"
+                " budget={budget}"
+                " hit_rate={hit_rate}"
+                " hits={hits}"
+                " misses={misses}"
+                " evictions={evictions}"
+                " invalidations={invalidations}"
+                ">"
+        )
+        data = dict(
+            entries=len(card_cache),
+            size=f"'{card_cache.size / 2**20:.1f}MiB'",
+            budget=f"'{card_cache.budget / 2**20:.0f}MiB'",
+            hit_rate=f"'{card_cache.hit_rate:.1%}'",
+            hits=card_cache.hits,
+            misses=card_cache.misses,
+            evictions=card_cache.evictions,
+            invalidations=card_cache.invalidations,
+        )
+        info = f"(OK) Rendered card cache operational. {state}"
+        return ComponentStatus(StatusLevel.OKAY, info, info, data)
+
     # ----- Internal API -----
     def get_base(self, base_skin_id: int) -> AppSkin:
         """
@@ -201,18 +236,25 @@ class CustomSkinCog(LionCog):
         Takes into account the global defaults, guild custom skin, and user active skin.
         """
         args = {}
+        custom = False
 
         if userid and (skinid := await self.get_user_skinid(userid)):
             skin_args = await self.args_for_skin(skinid, card_id)
             args.update(skin_args)
+            custom = True
         elif guildid and (skinid := await self.get_guild_skinid(guildid)):
             skin_args = await self.args_for_skin(skinid, card_id)
             args.update(skin_args)
+            custom = True
 
         default = self.current_default
         if default:
             args.setdefault("base_skin_id", default)
 
+        # Label the skin for render profiling
+        label = args.get("base_skin_id", None) or 'default'
+        ctx_skin.set(f"{label}/custom" if custom else label)
+
         return args
 
     # ----- Event Handlers -----
@@ -222,6 +264,7 @@ class CustomSkinCog(LionCog):
         Update cached user active skinid.
         """
         self.active_user_skinids.pop(userid, None)
+        card_cache.invalidate(('user', userid))
         await self.get_user_skinid(userid)
 
     @LionCog.listener('on_skin_updated')
@@ -230,6 +273,8 @@ class CustomSkinCog(LionCog):
         Update cached args for given custom skin id.
         """
         self.custom_skins.pop(skinid, None)
+        # Cards are not tagged by custom skin, and skin edits are rare
+        card_cache.clear()
         custom_skin = await CustomSkin.fetch(self.bot, skinid)
         if custom_skin is not None:
             skin = custom_skin.freeze()
@@ -243,6 +288,7 @@ class CustomSkinCog(LionCog):
     async def refresh_default_skin(self, appname):
         await self.bot.core.data.BotConfig.fetch(appname, cached=False)
         await self.get_default_skin()
+        card_cache.clear()
 
     # ----- Userspace commands -----
     @LionCog.placeholder_group
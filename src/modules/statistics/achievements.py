@@ -1,11 +1,8 @@
 from typing import Optional, TYPE_CHECKING
-import asyncio
 import datetime as dt
 
-import pytz
 import discord
 
-from data import ORDER, NULL
 from meta import conf, LionBot
 from meta.logger import log_wrap
 from babel.translator import LazyStr
@@ -61,6 +58,16 @@ def progress_bar(value, minimum, maximum, width=10) -> str:
     return ''.join(bar)
 
 
+async def fetch_progress(bot: LionBot, guildid: int, userid: int) -> tuple[dict, dt.date]:
+    """
+    Fetch the stored achievement progress of the given member, along with the current day in their timezone.
+    """
+    stats: 'StatsCog' = bot.get_cog('StatsCog')
+    lion = await bot.core.lions.fetch_member(guildid, userid)
+    progress = await stats.data.AchievementProgress.fetch_progress(guildid, userid, str(lion.timezone))
+    return progress, lion.today.date()
+
+
 class Achievement:
     """
     ABC for a member achievement.
@@ -134,9 +141,13 @@ class Achievement:
         return (name, value)
 
     async def update(self):
-        self.value = await self._calculate()
+        progress, today = await fetch_progress(self.bot, self.guildid, self.userid)
+        self.value = self._calculate(progress, today)
 
-    async def _calculate(self) -> int:
+    def _calculate(self, progress: dict, today: dt.date) -> int:
+        """
+        Compute the achievement value from the stored progress of the member.
+        """
         raise NotImplementedError
 
 
@@ -153,15 +164,11 @@ class Workout(Achievement):
     threshold = 50
     emoji_index = 3
 
-    @log_wrap(action='Calc Workout')
-    async def _calculate(self):
+    def _calculate(self, progress, today):
         """
-        Count the number of completed workout sessions this user has.
+        The number of completed workout sessions this member has.
         """
-        record = await self.bot.core.data.workouts.select_one_where(
-            guildid=self.guildid, userid=self.userid
-        ).select(total='COUNT(*)')
-        return int(record['total'] or 0)
+        return progress['workouts']
 
 
 class VoiceHours(Achievement):
@@ -177,17 +184,11 @@ class VoiceHours(Achievement):
     threshold = 1000
     emoji_index = 0
 
-    @log_wrap(action='Calc VoiceHours')
-    async def _calculate(self):
+    def _calculate(self, progress, today):
         """
-        Returns the total number of hours this member has spent in voice.
+        The total number of hours this member has spent in voice.
         """
-        stats: 'StatsCog' = self.bot.get_cog('StatsCog')
-        records = await stats.data.VoiceSessionStats.table.select_where(
-            guildid=self.guildid, userid=self.userid
-        ).select(total='SUM(duration) / 3600').with_no_adapter()
-        hours = records[0]['total'] if records else 0
-        return int(hours or 0)
+        return progress['voice_seconds'] // 3600
 
 
 class VoiceStreak(Achievement):
@@ -203,79 +204,18 @@ class VoiceStreak(Achievement):
     threshold = 100
     emoji_index = 1
 
-    @log_wrap(action='Calc VoiceStreak')
-    async def _calculate(self):
-        stats: 'StatsCog' = self.bot.get_cog('StatsCog')
-
-        # TODO: make this more efficient by calc in database..
-        history = await stats.data.VoiceSessionStats.table.select_where(
-            guildid=self.guildid, userid=self.userid
-        ).select(
-            'start_time', 'end_time'
-        ).order_by('start_time', ORDER.DESC).with_no_adapter()
-
-        lion = await self.bot.core.lions.fetch_member(self.guildid, self.userid)
-
-        # Streak statistics
-        streak = 0
-        max_streak = 0
-        current_streak = None
-
-        day_attended = None
-        date = lion.today
-        daydiff = dt.timedelta(days=1)
-
-        periods = [(row['start_time'], row['end_time']) for row in history]
-
-        i = 0
-        while i < len(periods):
-            row = periods[i]
-            i += 1
-            if row[1] > date:
-                # They attended this day
-                day_attended = True
-                continue
-            elif day_attended is None:
-                # Didn't attend today, but don't break streak
-                day_attended = False
-                date -= daydiff
-                i -= 1
-                continue
-            elif not day_attended:
-                # Didn't attend the day, streak broken
-                date -= daydiff
-                i -= 1
-                pass
-            else:
-                # Attended the day
-                streak += 1
-
-                # Move window to the previous day and try the row again
-                day_attended = False
-                prev_date = date
-                date -= daydiff
-                i -= 1
-
-                # Special case, when the last session started in the previous day
-                # Then the day is already attended
-                if i > 1 and date < periods[i-2][0] <= prev_date:
-                    day_attended = True
-
-                continue
-
-            if current_streak is None:
-                current_streak = streak
-            max_streak = max(max_streak, streak)
-            streak = 0
-
-        # Handle loop exit state, i.e. the last streak
-        if day_attended:
-            streak += 1
-        max_streak = max(max_streak, streak)
-        if current_streak is None:
-            current_streak = streak
-
-        return max_streak if max_streak >= self.threshold else current_streak
+    def _calculate(self, progress, today):
+        """
+        The longest voice streak once achieved, and otherwise the current voice streak.
+        """
+        if progress['longest_streak'] >= self.threshold:
+            return progress['longest_streak']
+        # Not attending today does not break the current streak
+        last_day = progress['last_voice_day']
+        if last_day is not None and last_day >= today - dt.timedelta(days=1):
+            return progress['current_streak']
+        return 0
+
 
 class Voting(Achievement):
     _name = _p(
@@ -290,12 +230,8 @@ class Voting(Achievement):
     threshold = 100
     emoji_index = 6
 
-    @log_wrap(action='Calc Voting')
-    async def _calculate(self):
-        record = await self.bot.core.data.topgg.select_one_where(
-            userid=self.userid
-        ).select(total='COUNT(*)')
-        return int(record['total'] or 0)
+    def _calculate(self, progress, today):
+        return progress['votes']
 
 
 class VoiceDays(Achievement):
@@ -311,20 +247,8 @@ class VoiceDays(Achievement):
     threshold = 90
     emoji_index = 2
 
-    @log_wrap(action='Calc VoiceDays')
-    async def _calculate(self):
-        stats: 'StatsCog' = self.bot.get_cog('StatsCog')
-
-        lion = await self.bot.core.lions.fetch_member(self.guildid, self.userid)
-        offset = int(lion.today.utcoffset().total_seconds())
-
-        records = await stats.data.VoiceSessionStats.table.select_where(
-            guildid=self.guildid, userid=self.userid
-        ).select(
-            total="COUNT(DISTINCT(date_trunc('day', (start_time AT TIME ZONE 'utc') + interval '{} seconds')))".format(offset)
-        ).with_no_adapter()
-        days = records[0]['total'] if records else 0
-        return int(days or 0)
+    def _calculate(self, progress, today):
+        return progress['voice_days']
 
 
 class TasksComplete(Achievement):
@@ -340,21 +264,8 @@ class TasksComplete(Achievement):
     threshold = 1000
     emoji_index = 7
 
-    @log_wrap(action='Calc TasksComplete')
-    async def _calculate(self):
-        cog = self.bot.get_cog('TasklistCog')
-        if cog is None:
-            raise ValueError("Cannot calc TasksComplete without Tasklist Cog")
-
-        records = await cog.data.Task.table.select_where(
-            cog.data.Task.completed_at != NULL,
-            userid=self.userid,
-        ).select(
-            total="COUNT(*)"
-        ).with_no_adapter()
-
-        completed = records[0]['total'] if records else 0
-        return int(completed or 0)
+    def _calculate(self, progress, today):
+        return progress['tasks_complete']
 
 
 class ScheduledSessions(Achievement):
@@ -370,20 +281,8 @@ class ScheduledSessions(Achievement):
     threshold = 500
     emoji_index = 4
 
-    @log_wrap(action='Calc ScheduledSessions')
-    async def _calculate(self):
-        cog = self.bot.get_cog('ScheduleCog')
-        if not cog:
-            raise ValueError("Cannot calc scheduled sessions without ScheduleCog.")
-
-        model = cog.data.ScheduleSessionMember
-        records = await model.table.select_where(
-            userid=self.userid, guildid=self.guildid, attended=True
-        ).select(
-            total='COUNT(*)'
-        ).with_no_adapter()
-
-        return int((records[0]['total'] or 0) if records else 0)
+    def _calculate(self, progress, today):
+        return progress['scheduled_sessions']
 
 
 class MonthlyHours(Achievement):
@@ -399,37 +298,16 @@ class MonthlyHours(Achievement):
     threshold = 100
     emoji_index = 5
 
-    @log_wrap(action='Calc MonthlyHours')
-    async def _calculate(self):
-        stats: 'StatsCog' = self.bot.get_cog('StatsCog')
-
-        lion = await self.bot.core.lions.fetch_member(self.guildid, self.userid)
-
-        records = await stats.data.VoiceSessionStats.table.select_where(
-            userid=self.userid,
-            guildid=self.guildid,
-        ).select(
-            _first='MIN(start_time)'
-        ).with_no_adapter()
-        first_session = records[0]['_first'] if records else None
-        if not first_session:
-            return 0
-
-        # Build the list of month start timestamps
-        month_start = lion.month_start
-        months = [month_start.astimezone(pytz.utc)]
-
-        while month_start >= first_session:
-            month_start -= dt.timedelta(days=1)
-            month_start = month_start.replace(day=1)
-            months.append(month_start.astimezone(pytz.utc))
-
-        # Query the study times
-        times = await stats.data.VoiceSessionStats.study_times_between(
-            self.guildid, self.userid, *reversed(months), lion.now
-        )
-        max_time = max(times) // 3600
-        return max_time if max_time >= self.threshold else times[-1] // 3600
+    def _calculate(self, progress, today):
+        """
+        The most hours in a single month once achieved, and otherwise the hours this month.
+        """
+        best = progress['best_month_seconds'] // 3600
+        if best >= self.threshold:
+            return best
+        if progress['voice_month'] == today.replace(day=1):
+            return progress['month_seconds'] // 3600
+        return 0
 
 
 achievements = [
@@ -448,13 +326,19 @@ achievements.sort(key=lambda cls: cls.emoji_index)
 @log_wrap(action='Get Achievements')
 async def get_achievements_for(bot: LionBot, guildid: int, userid: int):
     """
-    Asynchronously fetch achievements for the given member.
+    Fetch achievements for the given member, from a single read of their stored progress.
+    """
+    progress, today = await fetch_progress(bot, guildid, userid)
+    return achievements_from(bot, guildid, userid, progress, today)
+
+
+def achievements_from(bot: LionBot, guildid: int, userid: int, progress: dict, today: dt.date):
+    """
+    Construct the achievements for the given member from their fetched progress.
     """
     member_achieved = [
         ach(bot, guildid, userid) for ach in achievements
     ]
-    update_tasks = [
-        asyncio.create_task(ach.update()) for ach in member_achieved
-    ]
-    await asyncio.gather(*update_tasks)
+    for ach in member_achieved:
+        ach.value = ach._calculate(progress, today)
     return member_achieved
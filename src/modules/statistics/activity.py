@@ -0,0 +1,149 @@
+"""
+Vectorised calculations over the daily activity of a member.
+
+`DailyActivity` holds dense per-day arrays of voice time, messages, and experience,
+built from a single read of the `member_daily_activity` rollup,
+with an entry for every day from the first active day up to today.
+Streaks, calendar heatmaps, and period totals are then computed with NumPy over these arrays,
+instead of querying the activity of each day separately.
+"""
+from typing import Optional
+import calendar
+import datetime as dt
+
+import numpy as np
+
+
+def streak_runs(series: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Locate the runs of consecutive active (non-zero) days in the given series.
+
+    Returns the indices of the first day of each run, and of the day after each run.
+    """
+    active = np.concatenate(([0], series != 0, [0])).astype(np.int8)
+    edges = np.diff(active)
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+class DailyActivity:
+    """
+    Per-day activity of a member, or of a user across every guild.
+
+    Each column is a dense array of daily totals, with index 0 corresponding to `start`,
+    and voice activity given in seconds.
+    Days outside the stored range have no activity.
+    """
+    columns = ('voice', 'messages', 'xp')
+
+    def __init__(self, start: dt.date, values: np.ndarray):
+        self.start = start
+        # Array of shape (len(columns), days)
+        self.values = values
+
+    def __repr__(self):
+        return (
+            "<"
+                f"{self.__class__.__name__}"
+                f" start={self.start}"
+                f" days={len(self)}"
+                f" totals={dict(zip(self.columns, self.values.sum(axis=1).tolist()))}"
+                ">"
+        )
+
+    def __len__(self):
+        return self.values.shape[1]
+
+    @property
+    def end(self) -> dt.date:
+        """
+        The day after the last stored day.
+        """
+        return self.start + dt.timedelta(days=len(self))
+
+    @classmethod
+    def from_rows(cls, rows, today: dt.date) -> 'DailyActivity':
+        """
+        Build the activity arrays from ordered `member_daily_activity` rows,
+        with an entry for every day from the first row up to and including `today`.
+        """
+        start = min(rows[0]['day'], today) if rows else today
+        length = (today - start).days + 1
+        values = np.zeros((len(cls.columns), length), dtype=np.int64)
+        if rows:
+            offsets = np.fromiter(((row['day'] - start).days for row in rows), dtype=np.int64, count=len(rows))
+            data = np.array(
+                [(row['voice_seconds'], row['messages'], row['xp']) for row in rows],
+                dtype=np.int64
+            ).T
+            # Ignore any days after today, e.g. from sessions timestamped by a clock ahead of ours
+            keep = offsets < length
+            values[:, offsets[keep]] = data[:, keep]
+        return cls(start, values)
+
+    def _column(self, column: str) -> np.ndarray:
+        return self.values[self.columns.index(column)]
+
+    def _index(self, day: Optional[dt.date], default: int) -> int:
+        if day is None:
+            return default
+        return min(max((day - self.start).days, 0), len(self))
+
+    def series(self, column: str, start: dt.date, end: dt.date) -> np.ndarray:
+        """
+        Daily activity in the given column, from `start` up to but not including `end`.
+        """
+        length = max((end - start).days, 0)
+        result = np.zeros(length, dtype=np.int64)
+        offset = (start - self.start).days
+        lower = max(offset, 0)
+        upper = min(offset + length, len(self))
+        if lower < upper:
+            result[lower - offset:upper - offset] = self._column(column)[lower:upper]
+        return result
+
+    def month(self, column: str, month_start: dt.date) -> np.ndarray:
+        """
+        Daily activity in the given column, for each day of the month starting on `month_start`.
+        """
+        days = calendar.monthrange(month_start.year, month_start.month)[1]
+        return self.series(column, month_start, month_start + dt.timedelta(days=days))
+
+    def total(self, column: str, since: Optional[dt.date] = None) -> int:
+        """
+        Total activity in the given column since the start of the given day, or all time.
+        """
+        return int(self._column(column)[self._index(since, 0):].sum())
+
+    def active_days(self, column: str) -> int:
+        """
+        Number of days with activity in the given column.
+        """
+        return int(np.count_nonzero(self._column(column)))
+
+    def longest_streak(self, column: str, end: Optional[dt.date] = None) -> int:
+        """
+        Length of the longest run of consecutive active days before `end`.
+        """
+        starts, ends = streak_runs(self._column(column)[:self._index(end, len(self))])
+        return int((ends - starts).max()) if len(starts) else 0
+
+    def current_streak(self, column: str, end: Optional[dt.date] = None, grace: bool = False) -> int:
+        """
+        Length of the run of consecutive active days ending on the day before `end`, by default today.
+
+        If `grace` is set, a run ending on the previous day also counts,
+        so that a streak is not broken before the last day is over.
+        """
+        cutoff = self._index(end, len(self))
+        starts, ends = streak_runs(self._column(column)[:cutoff])
+        if not len(starts) or ends[-1] < cutoff - int(grace):
+            return 0
+        return int(ends[-1] - starts[-1])
+
+    def streak_ranges(self, column: str, start: dt.date, end: dt.date) -> list[tuple[int, int]]:
+        """
+        The runs of active days between `start` and `end`,
+        as inclusive pairs of day offsets from `start`.
+        """
+        starts, ends = streak_runs(self.series(column, start, end))
+        return list(zip(starts.tolist(), (ends - 1).tolist()))
@@ -8,11 +8,13 @@ from discord import app_commands as appcmds
 from discord.ui.button import ButtonStyle
 
 from meta import LionBot, LionCog, LionContext
+from meta.logger import log_wrap
 from core.lion_guild import VoiceMode
 from utils.lib import error_embed
 from utils.ui import LeoUI, AButton, utc_now
+from utils.cardcache import card_cache
 from gui.base import CardMode
-from wards import high_management_ward
+from wards import high_management_ward, sys_admin_ward
 
 from . import babel
 from .data import StatsData
@@ -20,6 +22,7 @@ from .ui import ProfileUI, WeeklyMonthlyUI, LeaderboardUI
 from .settings import StatisticsSettings, StatisticsConfigUI
 from .graphics.profilestats import get_full_profile
 from .achievements import get_achievements_for
+from .leaderboards import LeaderboardCache
 
 _p = babel._p
 
@@ -32,6 +35,7 @@ class StatsCog(LionCog):
         self.bot = bot
         self.data = bot.db.load_registry(StatsData())
         self.settings = StatisticsSettings()
+        self.leaderboards = LeaderboardCache(bot)
 
     async def cog_load(self):
         await self.data.init()
@@ -43,6 +47,52 @@ class StatsCog(LionCog):
         configcog = self.bot.get_cog('ConfigCog')
         self.crossload_group(self.configure_group, configcog.admin_config_group)
 
+        if (leo_setting_cog := self.bot.get_cog('LeoSettings')) is not None:
+            self.crossload_group(self.leo_group, leo_setting_cog.leo_group)
+
+    @LionCog.listener('on_voice_session_end')
+    async def update_voice_leaderboards(self, session_data, ended_at):
+        self.leaderboards.on_voice_session_end(
+            session_data.guildid, session_data.userid, session_data.start_time, ended_at
+        )
+
+    # ----- Rendered card invalidation -----
+    # Cached cards are addressed by their data, so this only releases cards which can no longer be requested
+    @LionCog.listener('on_voice_session_end')
+    async def release_voice_cards(self, session_data, ended_at):
+        card_cache.invalidate(('user', session_data.userid))
+
+    @LionCog.listener('on_tasks_completed')
+    async def release_task_cards(self, member, *taskids):
+        card_cache.invalidate(('user', member.id))
+
+    @LionCog.listener('on_tasklist_update')
+    async def release_goal_cards(self, userid, channel=None, summon=True):
+        card_cache.invalidate(('user', userid))
+
+    # ----- Achievement progress hooks -----
+    @LionCog.listener('on_voice_session_end')
+    @log_wrap(action='Voice Achievement Progress')
+    async def update_voice_progress(self, session_data, ended_at):
+        await self.data.AchievementProgress.add_voice(
+            session_data.guildid, session_data.userid, session_data.start_time, ended_at
+        )
+
+    @LionCog.listener('on_tasks_completed')
+    @log_wrap(action='Task Achievement Progress')
+    async def update_task_progress(self, member, *taskids):
+        await self.data.AchievementProgress.recount_tasks(member.id)
+
+    @LionCog.listener('on_schedule_sessions_attended')
+    @log_wrap(action='Schedule Achievement Progress')
+    async def update_schedule_progress(self, slotid, *members):
+        await self.data.AchievementProgress.add_attendance(*members)
+
+    @LionCog.listener('on_dbl_vote')
+    @log_wrap(action='Vote Achievement Progress')
+    async def update_vote_progress(self, data):
+        await self.data.AchievementProgress.add_vote(int(data['user']))
+
     @cmds.hybrid_command(
         name=_p('cmd:me', "me"),
         description=_p(
@@ -198,6 +248,49 @@ class StatsCog(LionCog):
             )
         await ctx.reply(embed=embed)
 
+    # ----- Owner commands -----
+    @LionCog.placeholder_group
+    @cmds.hybrid_group("leo", with_app_command=False)
+    async def leo_group(self, ctx: LionContext):
+        ...
+
+    @leo_group.command(
+        name=_p('cmd:leo_achievements_rebuild', "achievements_rebuild"),
+        description=_p(
+            'cmd:leo_achievements_rebuild|desc',
+            "Rebuild the stored achievement progress for a guild from history."
+        )
+    )
+    @appcmds.describe(
+        guildid=_p(
+            'cmd:leo_achievements_rebuild|param:guildid|desc',
+            "Guild to rebuild, defaults to the current guild."
+        )
+    )
+    @sys_admin_ward
+    async def cmd_leo_achievements_rebuild(self, ctx: LionContext, guildid: Optional[str] = None):
+        if not ctx.interaction:
+            return
+        target = int(guildid) if guildid else ctx.guild.id
+        await ctx.interaction.response.defer(thinking=True)
+
+        start = utc_now()
+        count = await self.data.AchievementProgress.rebuild_guild(target)
+        duration = (utc_now() - start).total_seconds()
+        logger.info(
+            f"Rebuilt achievement progress for <gid: {target}>. {count} members rebuilt in {duration:.2f} seconds."
+        )
+
+        await ctx.reply(
+            embed=discord.Embed(
+                colour=discord.Colour.brand_green(),
+                description=(
+                    f"Rebuilt achievement progress for `{count}` members of `{target}` "
+                    f"in `{duration:.2f}` seconds."
+                )
+            )
+        )
+
     # Setting commands
     @LionCog.placeholder_group
     @cmds.hybrid_group('configure', with_app_command=False)
@@ -5,11 +5,14 @@ from itertools import chain
 from psycopg import sql
 
 from meta.logger import log_wrap
-from data import RowModel, Registry, Table, RegisterEnum
+from data import RowModel, Registry, Table, RegisterEnum, RawQuery
 from data.columns import Integer, String, Timestamp, Bool, Column
+from utils.data import TemporaryTable
 
 from utils.lib import utc_now
 
+from .activity import DailyActivity
+
 
 class StatisticType(Enum):
     """
@@ -83,35 +86,32 @@ class StatsData(Registry):
         @classmethod
         @log_wrap(action='tracked_time_between')
         async def tracked_time_between(cls, *points: tuple[int, int, dt.datetime, dt.datetime]):
-            query = sql.SQL(
-                """
-                SELECT
-                    t._guildid AS guildid,
-                    t._userid AS userid,
-                    t._start AS start_time,
-                    t._end AS end_time,
-                    study_time_between(t._guildid, t._userid, t._start, t._end) AS stime
-                FROM
-                    (VALUES {})
-                AS
-                    t (_guildid, _userid, _start, _end)
-                """
-            ).format(
-                sql.SQL(', ').join(
-                    sql.SQL("({}, {}, {}, {})").format(
-                        sql.Placeholder(), sql.Placeholder(),
-                        sql.Placeholder(), sql.Placeholder()
-                    )
-                    for _ in points
-                )
+            points_table = TemporaryTable(
+                '_guildid', '_userid', '_start', '_end',
+                name='t',
+                types=('BIGINT', 'BIGINT', 'TIMESTAMPTZ', 'TIMESTAMPTZ'),
+                copy=True
             )
+            points_table.set_values(*points)
             async with cls._connector.connection() as conn:
-                async with conn.cursor() as cursor:
-                    await cursor.execute(
-                        query,
-                        chain(*points)
-                    )
-                    return cursor.fetchall()
+                async with conn.transaction():
+                    async with conn.cursor() as cursor:
+                        await points_table.stage(cursor)
+                        points_expr, points_values = points_table.as_tuple()
+                        query = sql.SQL(
+                            """
+                            SELECT
+                                t._guildid AS guildid,
+                                t._userid AS userid,
+                                t._start AS start_time,
+                                t._end AS end_time,
+                                study_time_between(t._guildid, t._userid, t._start, t._end) AS stime
+                            FROM
+                                {}
+                            """
+                        ).format(points_expr)
+                        await cursor.execute(query, tuple(points_values))
+                        return await cursor.fetchall()
 
         @classmethod
         @log_wrap(action='study_time_between')
@@ -275,6 +275,220 @@ class StatsData(Registry):
                     ]
             return leaderboard
 
+    class MemberDailyActivity(RowModel):
+        """
+        Daily voice time, messages, and experience of each member.
+
+        Days are taken in the timezone the member was last rolled up in, recorded in `member_activity_rollups`.
+        Completed sessions are added by triggers, and members are (re)built on read when their timezone changes.
+
+        Schema
+        ------
+        CREATE TABLE member_daily_activity(
+          guildid BIGINT NOT NULL,
+          userid BIGINT NOT NULL,
+          day DATE NOT NULL,
+          voice_seconds INTEGER NOT NULL DEFAULT 0,
+          messages INTEGER NOT NULL DEFAULT 0,
+          xp INTEGER NOT NULL DEFAULT 0,
+          PRIMARY KEY (guildid, userid, day),
+          FOREIGN KEY (guildid, userid) REFERENCES members (guildid, userid) ON DELETE CASCADE
+        );
+        """
+        _tablename_ = 'member_daily_activity'
+
+        guildid = Integer(primary=True)
+        userid = Integer(primary=True)
+        day: Column[dt.date] = Column(primary=True)
+        voice_seconds = Integer()
+        messages = Integer()
+        xp = Integer()
+
+        @classmethod
+        def activity_query(cls, guildid: Optional[int], userid: int, timezone: str, today: dt.date,
+                           since: Optional[dt.date] = None) -> RawQuery[DailyActivity]:
+            """
+            Query for the daily activity of the given member, or of the user in every guild if `guildid` is None,
+            in the given timezone, since the given day or all time.
+
+            Includes ongoing voice sessions.
+            """
+            return RawQuery(
+                sql.SQL("SELECT * FROM member_daily_activity_fetch(%s, %s, %s, %s)"),
+                (guildid, userid, timezone, since),
+                row_adapter=lambda *rows: DailyActivity.from_rows(rows, today),
+                connector=cls._connector
+            )
+
+        @classmethod
+        @log_wrap(action='fetch_daily_activity')
+        async def fetch_activity(cls, *args, **kwargs) -> DailyActivity:
+            """
+            Fetch the daily activity of the given member. See `activity_query`.
+            """
+            return await cls.activity_query(*args, **kwargs)
+
+    class AchievementProgress(RowModel):
+        """
+        Stored progress towards each member achievement.
+
+        Updated by the statistics cog as sessions close, tasks are completed,
+        scheduled sessions are attended, and votes are received.
+        Members are built from history on their first read, and rebuilt when their timezone changes.
+
+        Schema
+        ------
+        CREATE TABLE member_achievement_progress(
+          guildid BIGINT NOT NULL,
+          userid BIGINT NOT NULL,
+          timezone TEXT NOT NULL,
+          workouts INTEGER NOT NULL DEFAULT 0,
+          voice_seconds BIGINT NOT NULL DEFAULT 0,
+          voice_days INTEGER NOT NULL DEFAULT 0,
+          last_voice_day DATE,
+          last_voice_start TIMESTAMPTZ,
+          current_streak INTEGER NOT NULL DEFAULT 0,
+          longest_streak INTEGER NOT NULL DEFAULT 0,
+          voice_month DATE,
+          month_seconds INTEGER NOT NULL DEFAULT 0,
+          best_month_seconds INTEGER NOT NULL DEFAULT 0,
+          votes INTEGER NOT NULL DEFAULT 0,
+          tasks_complete INTEGER NOT NULL DEFAULT 0,
+          scheduled_sessions INTEGER NOT NULL DEFAULT 0,
+          built_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+          updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+          PRIMARY KEY (guildid, userid),
+          FOREIGN KEY (guildid, userid) REFERENCES members (guildid, userid) ON DELETE CASCADE
+        );
+        CREATE INDEX member_achievement_progress_users ON member_achievement_progress (userid);
+        """
+        _tablename_ = 'member_achievement_progress'
+
+        guildid = Integer(primary=True)
+        userid = Integer(primary=True)
+        timezone = String()
+        workouts = Integer()
+        voice_seconds = Integer()
+        voice_days = Integer()
+        last_voice_day: Column[dt.date] = Column()
+        last_voice_start = Timestamp()
+        current_streak = Integer()
+        longest_streak = Integer()
+        voice_month: Column[dt.date] = Column()
+        month_seconds = Integer()
+        best_month_seconds = Integer()
+        votes = Integer()
+        tasks_complete = Integer()
+        scheduled_sessions = Integer()
+        built_at = Timestamp()
+        updated_at = Timestamp()
+
+        @classmethod
+        def progress_query(cls, guildid: int, userid: int, timezone: str) -> RawQuery[dict]:
+            """
+            Query for the achievement progress of the given member, with voice days in the given timezone.
+            """
+            return RawQuery(
+                sql.SQL("SELECT * FROM member_achievement_progress_fetch(%s, %s, %s)"),
+                (guildid, userid, timezone),
+                row_adapter=lambda *rows: rows[0] if rows else None,
+                connector=cls._connector
+            )
+
+        @classmethod
+        @log_wrap(action='fetch_achievement_progress')
+        async def fetch_progress(cls, guildid: int, userid: int, timezone: str) -> dict:
+            """
+            Fetch the achievement progress of the given member, with voice days in the given timezone.
+            """
+            return await cls.progress_query(guildid, userid, timezone)
+
+        @classmethod
+        @log_wrap(action='rebuild_achievement_progress')
+        async def rebuild_guild(cls, guildid: int) -> int:
+            """
+            Rebuild the achievement progress of every member in the given guild from history.
+
+            Returns the number of members rebuilt.
+            """
+            async with cls._connector.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(
+                        "SELECT member_achievement_progress_rebuild(%s, NULL, NULL)",
+                        (guildid,)
+                    )
+                    return (await cursor.fetchone())[0] or 0
+
+        @classmethod
+        @log_wrap(action='achievement_progress_voice')
+        async def add_voice(cls, guildid: int, userid: int, start: dt.datetime, end: dt.datetime):
+            """
+            Add a completed voice session to the progress of the given member.
+
+            Sessions starting no later than `last_voice_start` are ignored,
+            since they were already counted when the progress was built.
+            """
+            async with cls._connector.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(
+                        "SELECT member_achievement_progress_voice(%s, %s, %s, %s)",
+                        (guildid, userid, start, end)
+                    )
+
+        @classmethod
+        @log_wrap(action='achievement_progress_tasks')
+        async def recount_tasks(cls, userid: int):
+            """
+            Recount the completed tasks of the given user, in every guild.
+
+            Recounted rather than incremented, since tasks may be completed more than once.
+            """
+            async with cls._connector.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(
+                        """
+                        UPDATE member_achievement_progress
+                        SET
+                            tasks_complete = (
+                                SELECT COUNT(*) FROM tasklist
+                                WHERE userid = %s AND completed_at IS NOT NULL
+                            ),
+                            updated_at = now()
+                        WHERE userid = %s
+                        """,
+                        (userid, userid)
+                    )
+
+        @classmethod
+        @log_wrap(action='achievement_progress_attendance')
+        async def add_attendance(cls, *members: tuple[int, int]):
+            """
+            Add one attended scheduled session for each given (guildid, userid) member.
+            """
+            if not members:
+                return
+            guildids, userids = zip(*members)
+            async with cls._connector.connection() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(
+                        """
+                        UPDATE member_achievement_progress p
+                        SET
+                            scheduled_sessions = p.scheduled_sessions + 1,
+                            updated_at = now()
+                        FROM unnest(%s::BIGINT[], %s::BIGINT[]) AS t (_guildid, _userid)
+                        WHERE p.guildid = t._guildid AND p.userid = t._userid
+                        """,
+                        (list(guildids), list(userids))
+                    )
+
+        @classmethod
+        async def add_vote(cls, userid: int):
+            """
+            Add a vote for the given user, in every guild.
+            """
+            await cls.table.update_where(userid=userid).set(votes=cls.votes + 1, updated_at=utc_now())
+
     class MemberExp(RowModel):
         """
         Model representing a member experience update.
@@ -449,8 +663,7 @@ class StatsData(Registry):
         exp_type: Column[ExpType] = Column()
 
         @classmethod
-        @log_wrap(action='user_xp_since')
-        async def xp_since(cls, userid: int, *starts):
+        def xp_since_query(cls, userid: int, *starts) -> RawQuery[list[int]]:
             query = sql.SQL(
                 """
                 SELECT
@@ -473,17 +686,20 @@ class StatsData(Registry):
                     sql.Placeholder() for _ in starts
                 )
             )
-            async with cls._connector.connection() as conn:
-                async with conn.cursor() as cursor:
-                    await cursor.execute(
-                        query,
-                        tuple(chain((userid,), starts))
-                    )
-                    return [r['exp'] or 0 for r in await cursor.fetchall()]
+            return RawQuery(
+                query,
+                tuple(chain((userid,), starts)),
+                row_adapter=lambda *rows: [r['exp'] or 0 for r in rows],
+                connector=cls._connector
+            )
 
         @classmethod
         @log_wrap(action='user_xp_since')
-        async def xp_between(cls, userid: int, *points):
+        async def xp_since(cls, userid: int, *starts):
+            return await cls.xp_since_query(userid, *starts)
+
+        @classmethod
+        def xp_between_query(cls, userid: int, *points) -> RawQuery[list[int]]:
             blocks = zip(points, points[1:])
             query = sql.SQL(
                 """
@@ -508,13 +724,17 @@ class StatsData(Registry):
                     sql.SQL("({}, {})").format(sql.Placeholder(), sql.Placeholder()) for _ in points[1:]
                 )
             )
-            async with cls._connector.connection() as conn:
-                async with conn.cursor() as cursor:
-                    await cursor.execute(
-                        query,
-                        tuple(chain((userid,), *blocks))
-                    )
-                    return [r['period_xp'] or 0 for r in await cursor.fetchall()]
+            return RawQuery(
+                query,
+                tuple(chain((userid,), *blocks)),
+                row_adapter=lambda *rows: [r['period_xp'] or 0 for r in rows],
+                connector=cls._connector
+            )
+
+        @classmethod
+        @log_wrap(action='user_xp_since')
+        async def xp_between(cls, userid: int, *points):
+            return await cls.xp_between_query(userid, *points)
 
     class ProfileTag(RowModel):
         """
@@ -538,12 +758,33 @@ class StatsData(Registry):
         tag = String()
         _timestamp = Timestamp()
 
+        @classmethod
+        def tags_query(cls, guildid: Optional[int], userid: int) -> RawQuery[list[str]]:
+            """
+            Query for the profile tags of the given member, falling back to the user's global tags.
+            """
+            def adapter(*rows):
+                tags = [row['tag'] for row in rows if row['guildid'] == guildid]
+                if not tags and guildid is not None:
+                    tags = [row['tag'] for row in rows if row['guildid'] is None]
+                return tags
+
+            return RawQuery(
+                sql.SQL(
+                    """
+                    SELECT guildid, tag FROM member_profile_tags
+                    WHERE userid = %s AND (guildid = %s OR guildid IS NULL)
+                    ORDER BY tagid
+                    """
+                ),
+                (userid, guildid),
+                row_adapter=adapter,
+                connector=cls._connector
+            )
+
         @classmethod
         async def fetch_tags(cls, guildid: Optional[int], userid: int):
-            tags = await cls.fetch_where(guildid=guildid, userid=userid).order_by(cls.tagid)
-            if not tags and guildid is not None:
-                tags = await cls.fetch_where(guildid=None, userid=userid)
-            return [tag.tag for tag in tags]
+            return await cls.tags_query(guildid, userid)
 
         @classmethod
         @log_wrap(action='set_profile_tags')
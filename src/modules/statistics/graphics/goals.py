@@ -3,6 +3,7 @@ from psycopg.sql import SQL
 
 from data import NULL
 from meta import LionBot
+from utils.cardcache import card_cache
 from gui.cards import WeeklyGoalCard, MonthlyGoalCard
 from gui.base import CardMode
 from tracking.text.data import TextTrackerData
@@ -127,7 +128,8 @@ async def get_goals_card(
         guildid, userid, card_cls.card_id
     )
 
-    card = card_cls(
+    card = card_cache.card(
+        card_cls,
         name=username[0],
         discrim=username[1],
         avatar=(userid, avatar),
@@ -139,6 +141,7 @@ async def get_goals_card(
         attendance=attendance,
         goals=tasks,
         date=today,
-        skin=skin | {'mode': mode}
+        skin=skin | {'mode': mode},
+        tags=(('user', userid), ('guild', guildid)),
     )
     return card
@@ -1,4 +1,5 @@
 from meta import LionBot
+from utils.cardcache import card_cache
 
 from gui.cards import LeaderboardCard
 from gui.base import CardMode
@@ -64,10 +65,12 @@ async def get_leaderboard_card(
     skin = await bot.get_cog('CustomSkinCog').get_skinargs_for(
         guildid, None, LeaderboardCard.card_id
     )
-    card = LeaderboardCard(
+    card = card_cache.card(
+        LeaderboardCard,
         skin=skin | {'mode': mode},
         server_name=guild.name,
         entries=entries,
-        highlight=highlight
+        highlight=highlight,
+        tags=(('guild', guildid),),
     )
     return card
@@ -4,11 +4,12 @@ from datetime import datetime, timedelta
 import discord
 
 from meta import LionBot
+from utils.cardcache import card_cache
 from gui.cards import ProfileCard
 
 from modules.ranks.cog import RankCog
 from modules.ranks.utils import format_stat_range
-from ..achievements import get_achievements_for
+from ..achievements import achievements_from
 
 if TYPE_CHECKING:
     from ..cog import StatsCog
@@ -35,7 +36,13 @@ async def get_profile_card(bot: LionBot, userid: int, guildid: int):
         username = (lion.data.display_name, "#????")
         avatar = luser.data.avatar_hash
 
-    profile_badges = await stats.data.ProfileTag.fetch_tags(guildid, userid)
+    # Queue the independent member queries to be sent together
+    async with bot.db.pipeline() as pipe:
+        badges_future = pipe.add(stats.data.ProfileTag.tags_query(guildid, userid))
+        progress_future = pipe.add(
+            stats.data.AchievementProgress.progress_query(guildid, userid, str(lion.timezone))
+        )
+    profile_badges = await badges_future
 
     # Fetch current and next guild rank
     season_rank = await ranks.get_member_rank(guildid, userid)
@@ -77,22 +84,27 @@ async def get_profile_card(bot: LionBot, userid: int, guildid: int):
     else:
         next_rank = None
 
-    achievements = await get_achievements_for(bot, guildid, userid)
+    achievements = achievements_from(bot, guildid, userid, await progress_future, lion.today.date())
     achieved = tuple(ach.emoji_index for ach in achievements if ach.achieved)
 
     skin = await bot.get_cog('CustomSkinCog').get_skinargs_for(
         guildid, userid, ProfileCard.card_id
     )
 
-    card = ProfileCard(
+    # The cached member row is not refreshed per command, so reload the balance
+    coins = await lion.refresh_coins()
+
+    card = card_cache.card(
+        ProfileCard,
         user=username,
         avatar=(userid, avatar),
-        coins=lion.data.coins, gems=luser.data.gems, gifts=0,
+        coins=coins, gems=luser.data.gems, gifts=0,
         profile_badges=profile_badges,
         achievements=achieved,
         current_rank=current_rank,
         rank_progress=rank_progress,
         next_rank=next_rank,
         skin=skin,
+        tags=(('user', userid), ('guild', guildid)),
     )
     return card
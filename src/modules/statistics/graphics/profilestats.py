@@ -5,6 +5,7 @@ from PIL import Image
 
 from meta import LionBot
 from gui.base import CardMode
+from analytics.profiler import profile_render
 
 from .stats import get_stats_card
 from .profile import get_profile_card
@@ -19,21 +20,20 @@ async def get_full_profile(bot: LionBot, userid: int, guildid: int, mode: CardMo
 
     Combines the resulting cards into a single image and returns the image data.
     """
-    # Prepare cards for rendering
-    get_tasks = (
-        asyncio.create_task(get_stats_card(bot, userid, guildid, mode), name='get-stats-for-combined'),
-        asyncio.create_task(get_profile_card(bot, userid, guildid), name='get-profile-for-combined'),
-    )
-    stats_card, profile_card = await asyncio.gather(*get_tasks)
-
-    # Render cards
+    # Prepare and render cards
     render_tasks = (
-        asyncio.create_task(stats_card.render(), name='render-stats-for-combined'),
-        asyncio.create_task(profile_card.render(), name='render=profile-for-combined'),
+        asyncio.create_task(
+            profile_render(get_stats_card(bot, userid, guildid, mode), guildid=guildid),
+            name='render-stats-for-combined'
+        ),
+        asyncio.create_task(
+            profile_render(get_profile_card(bot, userid, guildid), guildid=guildid),
+            name='render-profile-for-combined'
+        ),
     )
 
     # Load the card data into images
-    stats_data, profile_data = await asyncio.gather(*render_tasks)
+    (_, stats_data), (_, profile_data) = await asyncio.gather(*render_tasks)
     with BytesIO(stats_data) as stats_stream, BytesIO(profile_data) as profile_stream:
         with Image.open(stats_stream) as stats_image, Image.open(profile_stream) as profile_image:
             # Create a new blank image of the correct dimenstions
@@ -2,14 +2,16 @@ from typing import Optional
 from datetime import datetime, timedelta
 
 import discord
+import numpy as np
 
 from meta import LionBot
+from utils.cardcache import card_cache
 from gui.cards import StatsCard
 from gui.base import CardMode
-from tracking.text.data import TextTrackerData
 
 from .. import babel
 from ..data import StatsData
+from ..activity import streak_runs
 
 
 _p = babel._p
@@ -36,47 +38,56 @@ async def get_stats_card(bot: LionBot, userid: int, guildid: int, mode: CardMode
 
     lion = await bot.core.lions.fetch_member(guildid, userid)
 
-    # Calculate the period timestamps, i.e. start time for each summary period
-    # TODO: Don't do the alltime one like this, not efficient anymore
-    # TODO: Unless we rewrite study_time_since again?
     today = lion.today
     month_start = today.replace(day=1)
+
+    # Calculate the period timestamps, i.e. start time for each summary period
     period_timestamps = (
         datetime(1970, 1, 1),
         month_start,
         today - timedelta(days=today.weekday()),
         today
     )
-
-    # Extract the study times for each period
+    period_starts = (None, *(timestamp.date() for timestamp in period_timestamps[1:]))
+
+    # Day boundaries this month, with day 0 being the last day of the previous month
+    streak_start = month_start - timedelta(days=1)
+    day_timestamps = [streak_start + timedelta(days=day) for day in range(0, today.day + 2)]
+
+    # Queue the independent activity queries to be sent together
+    global_text = (mode is CardMode.TEXT and not guildid)
+    async with bot.db.pipeline() as pipe:
+        activity_future = pipe.add(data.MemberDailyActivity.activity_query(
+            guildid or None, userid, str(lion.timezone), today.date()
+        ))
+        if global_text:
+            # Global experience is tracked separately from the sum of member experience
+            xp_since_future = pipe.add(data.UserExp.xp_since_query(userid, *period_timestamps))
+            xp_between_future = pipe.add(data.UserExp.xp_between_query(userid, *day_timestamps))
+    activity = await activity_future
+
+    # Extract the activity for each period
     if mode in (CardMode.STUDY, CardMode.VOICE, CardMode.ANKI):
         model = data.VoiceSessionStats
-        refkey = (guildid or None, userid)
-        ref_since = model.study_times_since
-        ref_between = model.study_times_between
+        streak_column = 'voice'
 
-        period_activity = await ref_since(*refkey, *period_timestamps)
-        period_strings = [format_time(activity) for activity in reversed(period_activity)]
+        period_activity = [activity.total('voice', since) for since in period_starts]
+        period_strings = [format_time(period) for period in reversed(period_activity)]
         month_activity = period_activity[1]
         month_string = t(_p(
             'gui:stats|mode:voice|month',
             "{hours} hours"
         )).format(hours=int(month_activity // 3600))
     elif mode is CardMode.TEXT:
-        msgmodel = TextTrackerData.TextSessions
+        msg_period_activity = [activity.total('messages', since) for since in period_starts]
         if guildid:
             model = data.MemberExp
-            msg_since = msgmodel.member_messages_since
-            refkey = (guildid, userid)
+            streak_column = 'xp'
+            xp_period_activity = [activity.total('xp', since) for since in period_starts]
         else:
             model = data.UserExp
-            msg_since = msgmodel.user_messages_since
-            refkey = (userid,)
-        ref_since = model.xp_since
-        ref_between = model.xp_between
-
-        xp_period_activity = await ref_since(*refkey, *period_timestamps)
-        msg_period_activity = await msg_since(*refkey, *period_timestamps)
+            streak_column = None
+            xp_period_activity = await xp_since_future
         period_strings = [
             format_xp(msgs, xp)
             for msgs, xp in zip(reversed(msg_period_activity), reversed(xp_period_activity))
@@ -98,35 +109,25 @@ async def get_stats_card(bot: LionBot, userid: int, guildid: int, mode: CardMode
     else:
         position = None
 
-    # Calculate streak data by requesting times per day
-    # First calculate starting timestamps for each day
-    days = list(range(0, today.day + 2))
-    day_timestamps = [month_start + timedelta(days=day - 1) for day in days]
-    study_times_month = await ref_between(*refkey, *day_timestamps)
-
-    # Then extract streak tuples
-    streaks = []
-    streak_start = None
-    for day, stime in zip(days, study_times_month):
-        stime = stime or 0
-        if stime > 0 and streak_start is None:
-            streak_start = day
-        elif stime == 0 and streak_start is not None:
-            streaks.append((streak_start, day-1))
-            streak_start = None
-    if streak_start is not None:
-        streaks.append((streak_start, today.day))
+    # Calculate the streaks this month, as day numbers, with day 0 being the last day of the previous month
+    if streak_column is not None:
+        streaks = activity.streak_ranges(streak_column, streak_start.date(), (today + timedelta(days=1)).date())
+    else:
+        starts, ends = streak_runs(np.array(await xp_between_future))
+        streaks = list(zip(starts.tolist(), (ends - 1).tolist()))
 
     skin = await bot.get_cog('CustomSkinCog').get_skinargs_for(
         guildid, userid, StatsCard.card_id
     )
 
-    card = StatsCard(
+    card = card_cache.card(
+        StatsCard,
         (position, 0),
         period_strings,
         month_string,
         100,
         streaks,
-        skin=skin | {'mode': mode}
+        skin=skin | {'mode': mode},
+        tags=(('user', userid), ('guild', guildid)),
     )
     return card
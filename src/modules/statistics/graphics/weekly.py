@@ -3,6 +3,7 @@ from datetime import timedelta
 
 from data import ORDER
 from meta import LionBot
+from utils.cardcache import card_cache
 from gui.cards import WeeklyStatsCard
 from gui.base import CardMode
 from tracking.text.data import TextTrackerData
@@ -21,37 +22,32 @@ async def get_weekly_card(bot: LionBot, userid: int, guildid: int, offset: int,
         user = await bot.fetch_user(userid)
     today = lion.today
     week_start = today - timedelta(days=today.weekday()) - timedelta(weeks=offset)
-    days = [week_start + timedelta(i) for i in range(-7, 8 if offset else (today.weekday() + 2))]
+    # Statistics are shown for the requested week and the week before
+    first_day = week_start - timedelta(weeks=1)
 
-    # TODO: Select statistics model based on mode
-    if mode is CardMode.VOICE:
-        model = data.VoiceSessionStats
-        day_stats = await model.study_times_between(guildid or None, userid, *days)
-        day_stats = list(map(lambda n: n // 3600, day_stats))
-    elif mode is CardMode.TEXT:
+    if mode is CardMode.TEXT:
         model = TextTrackerData.TextSessions
-        if guildid:
-            day_stats = await model.member_messages_between(guildid, userid, *days)
-        else:
-            day_stats = await model.user_messages_between(userid, *days)
+        column = 'messages'
     else:
         # TODO: ANKI
         model = data.VoiceSessionStats
-        day_stats = await model.study_times_between(guildid or None, userid, *days)
-        day_stats = list(map(lambda n: n // 3600, day_stats))
+        column = 'voice'
+
+    activity = await data.MemberDailyActivity.fetch_activity(
+        guildid or None, userid, str(lion.timezone), today.date(), since=first_day.date()
+    )
+    day_stats = activity.series(column, first_day.date(), first_day.date() + timedelta(weeks=2))
+    if column == 'voice':
+        day_stats = day_stats // 3600
 
     # Get user session rows
-    query = model.table.select_where(model.start_time >= days[0])
+    query = model.table.select_where(model.start_time >= first_day)
     if guildid:
         query = query.where(userid=userid, guildid=guildid).order_by('start_time', ORDER.ASC)
     else:
         query = query.where(userid=userid)
     sessions = await query
 
-    # Extract quantities per-day
-    for i in range(14 - len(day_stats)):
-        day_stats.append(0)
-
     # Get member profile
     if user:
         username = (user.display_name, user.discriminator)
@@ -62,16 +58,18 @@ async def get_weekly_card(bot: LionBot, userid: int, guildid: int, offset: int,
         guildid, userid, WeeklyStatsCard.card_id
     )
 
-    card = WeeklyStatsCard(
+    card = card_cache.card(
+        WeeklyStatsCard,
         user=username,
         timezone=str(lion.timezone),
-        now=lion.now.timestamp(),
+        now=(lion.now.timestamp() // 60) * 60,
         week=week_start.timestamp(),
-        daily=tuple(map(int, day_stats)),
+        daily=tuple(day_stats.tolist()),
         sessions=[
             (int(session['start_time'].timestamp()), int(session['start_time'].timestamp() + int(session['duration'])))
             for session in sessions
         ],
-        skin=skin | {'mode': mode}
+        skin=skin | {'mode': mode},
+        tags=(('user', userid), ('guild', guildid)),
     )
     return card
@@ -0,0 +1,318 @@
+from typing import Optional
+from bisect import bisect_left, insort
+import asyncio
+import datetime as dt
+
+from meta import LionBot
+from meta.logger import log_wrap
+from core.data import RankType
+from utils.lib import utc_now
+
+from . import logger
+
+
+LBKey = tuple[int, RankType, Optional[dt.datetime]]
+
+
+class Leaderboard:
+    """
+    Filtered leaderboard for a single guild, statistic type, and period.
+
+    Members are kept in descending order of their total, ties broken by userid,
+    with an index supporting logarithmic position lookups.
+    Supports `len()` and indexing or slicing to `(userid, total)` pairs.
+    """
+    __slots__ = (
+        'guildid', 'stat_type', 'period_start',
+        'built_at', 'fetched_at', 'chunked', 'unranked',
+        '_totals', '_order'
+    )
+
+    def __init__(self, guildid: int, stat_type: RankType, period_start: Optional[dt.datetime],
+                 built_at: dt.datetime, fetched_at: dt.datetime, chunked: bool, unranked: set[int],
+                 data: list[tuple[int, int]]):
+        self.guildid = guildid
+        self.stat_type = stat_type
+        self.period_start = period_start
+
+        # Time from which the leaderboard data is missing activity, and deltas should be applied
+        self.built_at = built_at
+        # Time by which the leaderboard data was read, saved activity before this may already be counted
+        self.fetched_at = fetched_at
+        # Whether the guild member list was complete when the leaderboard was built
+        self.chunked = chunked
+        # Unranked roleids which were used to filter the leaderboard
+        self.unranked = unranked
+
+        # userid -> total
+        self._totals: dict[int, int] = dict(data)
+        # Sorted list of (-total, userid)
+        self._order: list[tuple[int, int]] = sorted((-total, userid) for userid, total in self._totals.items())
+
+    def __repr__(self):
+        return (
+            "<"
+                f"{self.__class__.__name__}"
+                f" guildid={self.guildid}"
+                f" stat_type={self.stat_type.name}"
+                f" period_start={self.period_start.isoformat() if self.period_start else None}"
+                f" members={len(self)}"
+                ">"
+        )
+
+    def __len__(self):
+        return len(self._order)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [(userid, -negtotal) for negtotal, userid in self._order[index]]
+        else:
+            negtotal, userid = self._order[index]
+            return (userid, -negtotal)
+
+    def total(self, userid: int) -> Optional[int]:
+        return self._totals.get(userid, None)
+
+    def position(self, userid: int) -> Optional[int]:
+        """
+        Zero-indexed position of the given member on the leaderboard, or `None` if they are not on it.
+        """
+        total = self._totals.get(userid, None)
+        if total is None:
+            return None
+        return bisect_left(self._order, (-total, userid))
+
+    def add(self, userid: int, amount: int):
+        """
+        Add the given amount to the given member's total, adding them to the leaderboard if required.
+        """
+        if not amount:
+            return
+        total = self._totals.get(userid, None)
+        if total is not None:
+            del self._order[bisect_left(self._order, (-total, userid))]
+        else:
+            total = 0
+        total += amount
+        self._totals[userid] = total
+        insort(self._order, (-total, userid))
+
+    def remove(self, userid: int):
+        total = self._totals.pop(userid, None)
+        if total is not None:
+            del self._order[bisect_left(self._order, (-total, userid))]
+
+
+class LBDelta:
+    """
+    Activity completed after a leaderboard was built.
+
+    If `amount` is `None`, the activity is a duration from `start` to `end`,
+    and only the part lying in the leaderboard period and after the leaderboard was built is counted.
+    Otherwise `amount` is counted when the activity started in the period,
+    and `end` is a time taken before the activity was saved.
+    Such activity is only counted when it was saved after the leaderboard data was read,
+    since activity saved while the data was being read may already be included.
+    """
+    __slots__ = ('guildid', 'userid', 'stat_type', 'start', 'end', 'amount')
+
+    def __init__(self, guildid: int, userid: int, stat_type: RankType,
+                 start: dt.datetime, end: dt.datetime, amount: Optional[int] = None):
+        self.guildid = guildid
+        self.userid = userid
+        self.stat_type = stat_type
+        self.start = start
+        self.end = end
+        self.amount = amount
+
+    def contribution(self, lb: Leaderboard) -> int:
+        if self.amount is None:
+            start = max(self.start, lb.built_at)
+            if lb.period_start is not None:
+                start = max(start, lb.period_start)
+            return max(int((self.end - start).total_seconds()), 0)
+        elif self.end > lb.fetched_at and (lb.period_start is None or self.start >= lb.period_start):
+            return self.amount
+        else:
+            return 0
+
+
+class LeaderboardCache:
+    """
+    Guild leaderboards shared between every consumer on this shard.
+
+    Leaderboards are keyed by guild, statistic type, and period start (`None` for all-time),
+    and are built at most once per key at a time, with concurrent requests waiting on the same build.
+    Completed sessions are applied as deltas to the cached leaderboards,
+    which are rebuilt from data once they are older than the TTL.
+
+    Leaderboards only contain current guild members who are not bots and do not have unranked roles.
+    """
+    ttl = 300
+
+    def __init__(self, bot: LionBot):
+        self.bot = bot
+
+        self._entries: dict[LBKey, Leaderboard] = {}
+        self._pending: dict[LBKey, asyncio.Task] = {}
+        # Deltas received while the leaderboard for each key was being built
+        self._deferred: dict[LBKey, list[LBDelta]] = {}
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.deltas = 0
+
+    def __repr__(self):
+        return (
+            "<"
+                f"{self.__class__.__name__}"
+                f" entries={len(self._entries)}"
+                f" pending={len(self._pending)}"
+                f" hits={self.hits}"
+                f" misses={self.misses}"
+                f" coalesced={self.coalesced}"
+                f" deltas={self.deltas}"
+                ">"
+        )
+
+    def _valid(self, lb: Leaderboard) -> bool:
+        if (utc_now() - lb.built_at).total_seconds() > self.ttl:
+            return False
+        if not lb.chunked and (guild := self.bot.get_guild(lb.guildid)) is not None and guild.chunked:
+            # The member list has been completed since the leaderboard was built
+            return False
+        return True
+
+    async def get(self, guildid: int, stat_type: RankType, period_start: Optional[dt.datetime],
+                  fresh=False) -> Leaderboard:
+        """
+        Retrieve the leaderboard for the given guild, statistic, and period start.
+
+        If `fresh` is set, the leaderboard is rebuilt unless a build is already in progress.
+        """
+        key = (guildid, stat_type, period_start)
+        lb = self._entries.get(key, None)
+        if lb is not None and not fresh and self._valid(lb):
+            self.hits += 1
+            return lb
+
+        task = self._pending.get(key, None)
+        if task is None:
+            self.misses += 1
+            self._prune()
+            task = self._pending[key] = asyncio.create_task(self._build(key), name='leaderboard-build')
+            self._deferred[key] = []
+
+            def _done(task):
+                self._pending.pop(key, None)
+                self._deferred.pop(key, None)
+            task.add_done_callback(_done)
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def invalidate(self, guildid: int):
+        """
+        Forget the cached leaderboards for the given guild.
+        """
+        self._entries = {key: lb for key, lb in self._entries.items() if key[0] != guildid}
+
+    def _prune(self):
+        self._entries = {key: lb for key, lb in self._entries.items() if self._valid(lb)}
+
+    @log_wrap(action='Leaderboard Build')
+    async def _build(self, key: LBKey) -> Leaderboard:
+        guildid, stat_type, period_start = key
+        guild = self.bot.get_guild(guildid)
+        # Builds run in their own task, aggregate on the background pool lane
+        self.bot.db.set_lane('background')
+
+        built_at = utc_now()
+        data = await self._fetch(guildid, stat_type, period_start)
+        fetched_at = utc_now()
+
+        # Filter out members which are not in the server and unranked roles and bots
+        # Usually hits cache
+        unranked_setting = await self.bot.get_cog('StatsCog').settings.UnrankedRoles.get(guildid)
+        unranked = set(unranked_setting.data)
+        lb = Leaderboard(
+            guildid, stat_type, period_start,
+            built_at, fetched_at,
+            guild.chunked if guild else False,
+            unranked,
+            [(userid, total) for userid, total in data if self._included(guild, unranked, userid)]
+        )
+        for delta in self._deferred.get(key, ()):
+            self._apply(lb, delta)
+        self._entries[key] = lb
+        logger.debug(f"Built leaderboard {lb!r}")
+        return lb
+
+    async def _fetch(self, guildid: int, stat_type: RankType,
+                     period_start: Optional[dt.datetime]) -> list[tuple[int, int]]:
+        lguild = await self.bot.core.lions.fetch_guild(guildid)
+        rank_cog = self.bot.get_cog('RankCog')
+        season_start = lguild.config.get('season_start').value
+        if rank_cog is not None and season_start is not None and period_start == season_start:
+            # Serve season leaderboards from the stored season statistics
+            await rank_cog.ensure_season(guildid)
+            return await rank_cog.data.SeasonStats.leaderboard(guildid, stat_type, period_start)
+
+        if stat_type is RankType.VOICE:
+            model = self.bot.get_cog('StatsCog').data.VoiceSessionStats
+        elif stat_type is RankType.XP:
+            model = self.bot.get_cog('StatsCog').data.MemberExp
+        elif stat_type is RankType.MESSAGE:
+            model = self.bot.get_cog('TextTrackerCog').data.TextSessions
+        else:
+            raise ValueError(f"Unknown leaderboard statistic {stat_type!r}")
+
+        if period_start is None:
+            return await model.leaderboard_all(guildid)
+        else:
+            return await model.leaderboard_since(guildid, period_start)
+
+    def _included(self, guild, unranked: set[int], userid: int) -> bool:
+        if guild is None or (member := guild.get_member(userid)) is None:
+            return False
+        if member.bot:
+            return False
+        return not any(role.id in unranked for role in member.roles)
+
+    def _apply(self, lb: Leaderboard, delta: LBDelta):
+        if (amount := delta.contribution(lb)):
+            userid = delta.userid
+            if lb.total(userid) is not None or self._included(self.bot.get_guild(lb.guildid), lb.unranked, userid):
+                lb.add(userid, amount)
+
+    def apply(self, *deltas: LBDelta):
+        """
+        Apply the given completed activity to the cached and pending leaderboards.
+        """
+        for delta in deltas:
+            self.deltas += 1
+            for key, lb in self._entries.items():
+                if key[0] == delta.guildid and key[1] is delta.stat_type:
+                    self._apply(lb, delta)
+            for key, deferred in self._deferred.items():
+                if key[0] == delta.guildid and key[1] is delta.stat_type:
+                    deferred.append(delta)
+
+    def on_voice_session_end(self, guildid: int, userid: int, start: dt.datetime, end: dt.datetime):
+        self.apply(LBDelta(guildid, userid, RankType.VOICE, start, end))
+
+    def on_message_session_complete(self, saved_at: dt.datetime, *session_data):
+        """
+        Apply a batch of completed message sessions,
+        given as tuples `(guildid, userid, start_time, messages, guild_xp)`.
+
+        `saved_at` must be taken before the sessions were saved.
+        """
+        deltas = []
+        for guildid, userid, start_time, messages, guild_xp in session_data:
+            deltas.append(LBDelta(guildid, userid, RankType.MESSAGE, start_time, saved_at, messages))
+            # Experience is timestamped when it is saved
+            deltas.append(LBDelta(guildid, userid, RankType.XP, saved_at, saved_at, guild_xp))
+        self.apply(*deltas)
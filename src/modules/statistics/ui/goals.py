@@ -7,6 +7,7 @@ from discord.ui.button import button, Button, ButtonStyle
 from discord.ui.select import select, Select, SelectOption
 
 from utils.lib import MessageArgs
+from analytics.profiler import sample_card
 
 from .. import babel
 from .base import StatsUI
@@ -117,16 +118,13 @@ class MonthlyUI(StatsUI):
         self._rendered = True
 
     async def _render_stats(self):
-        args = await MonthlyStatsCard.sample_args(None)
-        card = MonthlyStatsCard(**args)
-        await card.render()
+        card = await sample_card(MonthlyStatsCard)
         self._stats_card = card
         return card
 
     async def _render_goals(self):
         args = await MonthlyGoalCard.sample_args(None)
-        card = WeeklyGoalCard(**args)
-        await card.render()
+        card = await sample_card(WeeklyGoalCard, args)
         self._goals_card = card
         return card
 
@@ -162,15 +160,11 @@ class WeeklyUI(StatsUI):
         return MessageArgs(files=[goals_file, stats_file])
 
     async def _render_stats(self):
-        args = await WeeklyStatsCard.sample_args(None)
-        card = WeeklyStatsCard(**args)
-        await card.render()
+        card = await sample_card(WeeklyStatsCard)
         self._stats_card = card
         return card
 
     async def _render_goals(self):
-        args = await WeeklyGoalCard.sample_args(None)
-        card = WeeklyGoalCard(**args)
-        await card.render()
+        card = await sample_card(WeeklyGoalCard)
         self._goals_card = card
         return card
@@ -11,7 +11,9 @@ from meta import LionBot, conf
 from utils.lib import MessageArgs
 from utils.ui import input
 from core.lion_guild import VoiceMode
+from core.data import RankType
 from babel.translator import ctx_translator, LazyStr
+from analytics.profiler import profile_render
 
 from ..data import StatsData
 from ..graphics.leaderboard import get_leaderboard_card
@@ -68,10 +70,6 @@ class LeaderboardUI(StatsUI):
         self.card = None
 
         # ----- Cached and on-demand data -----
-        # Cache of the full leaderboards for each type and period, populated on demand
-        # (type, period) -> List[(userid, duration)]
-        self.lb_data = {}
-
         # Cache of the cards already displayed
         # (type, period) -> (pagen -> Optional[Future[Card]])
         self.cache = {}
@@ -107,68 +105,34 @@ class LeaderboardUI(StatsUI):
         self.focused = True
         data = await self.current_data()
         if data:
-            caller_index = next((i for i, (uid, _) in enumerate(data) if uid == self.userid), None)
+            caller_index = data.position(self.userid)
             if caller_index is not None:
                 self.pagen = caller_index // self.page_size
 
-    async def _fetch_lb_data(self, stat_type, period) -> list[tuple[int, int]]:
+    async def fetch_lb_data(self, stat_type, period):
         """
-        Worker for `fetch_lb_data`.
+        Fetch the leaderboard data for the given type and period.
+
+        Leaderboards are shared with every other leaderboard on this shard,
+        so concurrent and repeated requests are not repeated.
         """
         if stat_type is StatType.VOICE:
-            if period is LBPeriod.ALLTIME:
-                data = await self.data.VoiceSessionStats.leaderboard_all(self.guildid)
-            elif (period_start := self.period_starts.get(period, None)) is None:
-                raise ValueError("Uninitialised period requested!")
-            else:
-                data = await self.data.VoiceSessionStats.leaderboard_since(
-                    self.guildid, period_start
-                )
+            rank_type = RankType.VOICE
         elif stat_type is StatType.TEXT:
-            if period is LBPeriod.ALLTIME:
-                data = await self.data.MemberExp.leaderboard_all(self.guildid)
-            elif (period_start := self.period_starts.get(period, None)) is None:
-                raise ValueError("Uninitialised period requested!")
-            else:
-                data = await self.data.MemberExp.leaderboard_since(
-                    self.guildid, period_start
-                )
+            rank_type = RankType.XP
         else:
             # TODO: Anki data
-            data = []
-
-        # Filter out members which are not in the server and unranked roles and bots
-        # Usually hits cache
-        self.was_chunked = self.guild.chunked
-        unranked_setting = await self.bot.get_cog('StatsCog').settings.UnrankedRoles.get(self.guild.id)
-        unranked_roleids = set(unranked_setting.data)
-        true_leaderboard = []
-        guild = self.guild
-        for userid, stat_total in data:
-            if member := guild.get_member(userid):
-                if member.bot:
-                    continue
-                if any(role.id in unranked_roleids for role in member.roles):
-                    continue
-                true_leaderboard.append((userid, stat_total))
-        return true_leaderboard
+            return []
 
-    async def fetch_lb_data(self, stat_type, period):
-        """
-        Fetch the leaderboard data for the given type and period.
-
-        Uses cached futures so that requests are not repeated.
-        """
-        key = (stat_type, period)
-        future = self.lb_data.get(key, None)
-        if future is not None and not future.cancelled():
-            result = await future
-        else:
-            future = asyncio.create_task(self._fetch_lb_data(*key))
-            self.lb_data[key] = future
-            result = await future
+        if period is LBPeriod.ALLTIME:
+            period_start = None
+        elif (period_start := self.period_starts.get(period, None)) is None:
+            raise ValueError("Uninitialised period requested!")
 
-        return result
+        leaderboards = self.bot.get_cog('StatsCog').leaderboards
+        leaderboard = await leaderboards.get(self.guildid, rank_type, period_start)
+        self.was_chunked = leaderboard.chunked
+        return leaderboard
 
     async def current_data(self):
         """
@@ -203,12 +167,14 @@ class LeaderboardUI(StatsUI):
             else:
                 raise ValueError
 
-            card = await get_leaderboard_card(
-                self.bot, self.userid, self.guildid,
-                mode,
-                list(page_data)
+            card, _ = await profile_render(
+                get_leaderboard_card(
+                    self.bot, self.userid, self.guildid,
+                    mode,
+                    list(page_data)
+                ),
+                guildid=self.guildid
             )
-            await card.render()
             return card
         else:
             # Leaderboard is empty
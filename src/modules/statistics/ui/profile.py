@@ -12,6 +12,7 @@ from meta.errors import UserInputError
 from utils.lib import MessageArgs
 from utils.ui import LeoUI, ModalRetryUI, FastModal, error_handler_for
 from babel.translator import ctx_translator
+from analytics.profiler import profile_render
 from gui.cards import ProfileCard, StatsCard
 from gui.base import CardMode
 
@@ -307,8 +308,10 @@ class ProfileUI(StatsUI):
         """
         Create and render the profile card.
         """
-        card = await get_stats_card(self.bot, self.userid, self.guildid, self._stat_type.card_mode)
-        await card.render()
+        card, _ = await profile_render(
+            get_stats_card(self.bot, self.userid, self.guildid, self._stat_type.card_mode),
+            guildid=self.guildid
+        )
         self._stats_card = card
         return card
 
@@ -316,9 +319,11 @@ class ProfileUI(StatsUI):
         """
         Create and render the XP and stats cards.
         """
-        card = await get_profile_card(self.bot, self.userid, self.guild.id)
+        card, _ = await profile_render(
+            get_profile_card(self.bot, self.userid, self.guild.id),
+            guildid=self.guild.id
+        )
         if card:
-            await card.render()
             self._profile_card = card
         return card
 
@@ -4,6 +4,7 @@ import asyncio
 import discord
 
 from utils.lib import MessageArgs
+from analytics.profiler import profile_render, sample_card
 
 from .. import babel
 from .base import StatsUI
@@ -51,14 +52,14 @@ class SummaryUI(StatsUI):
         self._rendered = True
 
     async def _render_stats(self):
-        card = await get_stats_card(self.bot, self.data, self.user.id, self.guild.id if self.guild else None)
-        await card.render()
+        card, _ = await profile_render(
+            get_stats_card(self.bot, self.data, self.user.id, self.guild.id if self.guild else None),
+            guildid=self.guild.id if self.guild else None
+        )
         self._stats_card = card
         return card
 
     async def _render_profile(self):
-        args = await ProfileCard.sample_args(None)
-        card = ProfileCard(**args)
-        await card.render()
+        card = await sample_card(ProfileCard)
         self._profile_card = card
         return card
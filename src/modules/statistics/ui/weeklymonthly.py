@@ -22,6 +22,7 @@ from babel.utils import local_month
 from gui.cards import WeeklyGoalCard, WeeklyStatsCard, MonthlyGoalCard, MonthlyStatsCard
 from gui.base import CardMode
 from core.lion_member import LionMember
+from analytics.profiler import profile_render
 
 from ..graphics.weekly import get_weekly_card
 from ..graphics.monthly import get_monthly_card
@@ -802,15 +803,17 @@ class WeeklyMonthlyUI(StatsUI):
         elif stat_page.stat is StatType.ANKI:
             mode = CardMode.ANKI
 
-        card = await get_goals_card(
-            self.bot,
-            self.userid,
-            self.guildid or 0,
-            offset,
-            (self._stat_page.period is PeriodType.WEEKLY),
-            mode
+        card, _ = await profile_render(
+            get_goals_card(
+                self.bot,
+                self.userid,
+                self.guildid or 0,
+                offset,
+                (self._stat_page.period is PeriodType.WEEKLY),
+                mode
+            ),
+            guildid=self.guildid
         )
-        await card.render()
         return card
 
     async def _render_stats(self, show_global, offset, stat_page):
@@ -822,7 +825,7 @@ class WeeklyMonthlyUI(StatsUI):
             mode = CardMode.ANKI
 
         if stat_page.period == PeriodType.WEEKLY:
-            card = await get_weekly_card(
+            getter = get_weekly_card(
                 self.bot,
                 self.userid,
                 self.guildid,
@@ -830,14 +833,14 @@ class WeeklyMonthlyUI(StatsUI):
                 mode
             )
         else:
-            card = await get_monthly_card(
+            getter = get_monthly_card(
                 self.bot,
                 self.userid,
                 self.guildid,
                 offset,
                 mode
             )
-        await card.render()
+        card, _ = await profile_render(getter, guildid=self.guildid)
         return card
 
     def _prepare(self, *key):
@@ -8,6 +8,7 @@ import builtins
 import inspect
 import logging
 from io import StringIO
+from datetime import timedelta
 
 from typing import Callable, Any, Optional
 
@@ -28,7 +29,9 @@ from meta.LionContext import LionContext
 from meta.LionCog import LionCog
 from meta.LionBot import LionBot
 
+from utils.lib import utc_now
 from utils.ui import FastModal, input
+from analytics.data import AnalyticsData
 
 from babel.translator import LocalBabel
 
@@ -433,6 +436,71 @@ class Exec(LionCog):
             ]
         return results[:25]
 
+    @commands.hybrid_command(
+        name=_('querystats'),
+        description=_("Show query latency by action and query shape, and the slow query log.")
+    )
+    @appcmd.describe(
+        count=_("Number of entries to show in each section."),
+        reset=_("Whether to reset the recorded statistics after reporting them.")
+    )
+    @appcmd.guilds(*guild_ids)
+    async def querystats_cmd(self, ctx: LionContext, count: Optional[int] = 10, reset: Optional[bool] = False):
+        metrics = self.bot.db.metrics
+        if metrics is None:
+            await ctx.reply("Query metrics are not enabled.")
+            return
+
+        output = metrics.report(count)
+        if reset:
+            metrics.reset()
+        if len(output) > 1900:
+            with StringIO(output) as fp:
+                fp.seek(0)
+                file = discord.File(fp, filename="querystats.md")  # type: ignore
+                await ctx.reply(file=file)
+        else:
+            await ctx.reply(f"```md\n{output}```")
+
+    @commands.hybrid_command(
+        name=_('renderstats'),
+        description=_("Show card data gathering and render time percentiles by card and skin.")
+    )
+    @appcmd.describe(
+        days=_("Number of days of recorded renders to include."),
+        card=_("Card id to restrict the report to.")
+    )
+    @appcmd.guilds(*guild_ids)
+    async def renderstats_cmd(self, ctx: LionContext, days: Optional[int] = 7, card: Optional[str] = None):
+        since = utc_now() - timedelta(days=days)
+        rows = await AnalyticsData.GuiRender.percentiles(since, card)
+        if not rows:
+            await ctx.reply(f"No card renders recorded in the last {days} days.")
+            return
+
+        lines = [
+            f"# Card renders in the last {days} days (ms)",
+            "card / skin: renders | data p50 p90 p99 | render p50 p90 p99",
+        ]
+        for row in rows:
+            data = ' '.join(
+                f"{row[key]:.0f}" if row[key] is not None else '-'
+                for key in ('data_p50', 'data_p90', 'data_p99')
+            )
+            render = ' '.join(
+                f"{row[key]:.0f}" for key in ('render_p50', 'render_p90', 'render_p99')
+            )
+            lines.append(f"{row['cardname']} / {row['skin'] or '-'}: {row['renders']} | {data} | {render}")
+        output = '\n'.join(lines)
+
+        if len(output) > 1900:
+            with StringIO(output) as fp:
+                fp.seek(0)
+                file = discord.File(fp, filename="renderstats.md")  # type: ignore
+                await ctx.reply(file=file)
+        else:
+            await ctx.reply(f"```md\n{output}```")
+
     @commands.hybrid_command(
         name=_('shutdown'),
         description=_("Shutdown (or restart) the client.")
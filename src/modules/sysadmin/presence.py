@@ -214,9 +214,9 @@ class PresenceCtrl(LionCog):
     # Possible substitution keys, and the events that listen to them
     keys = {
         '$in_vc': {'on_voice_state_update'},
-        '$voice_channels': {'on_channel_add', 'on_channel_remove'},
-        '$shard_members': {'on_member_join', 'on_member_leave'},
-        '$shard_guilds': {'on_guild_join', 'on_guild_leave'}
+        '$voice_channels': {'on_guild_channel_create', 'on_guild_channel_delete'},
+        '$shard_members': {'on_member_join', 'on_raw_member_remove'},
+        '$shard_guilds': {'on_guild_join', 'on_guild_remove'}
     }
 
     default_format = "$in_vc students in $voice_channels study rooms!"
@@ -303,16 +303,13 @@ class PresenceCtrl(LionCog):
         """
         Format the given string.
         """
+        stats = self.bot.core.shard_stats
         subs = {
-            'shard_members': sum(1 for _ in self.bot.get_all_members()),
-            'shard_guilds': sum(1 for _ in self.bot.guilds)
+            'shard_members': stats.member_count,
+            'shard_guilds': stats.guild_count,
+            'in_vc': stats.in_voice,
+            'voice_channels': stats.voice_channels,
         }
-        if '$in_vc' in form:
-            # TODO: Waiting on study module data
-            subs['in_vc'] = sum(1 for m in self.bot.get_all_members() if m.voice and m.voice.channel)
-        if '$voice_channels' in form:
-            # TODO: Waiting on study module data
-            subs['voice_channels'] = sum(1 for c in self.bot.get_all_channels() if c.type == discord.ChannelType.voice)
 
         return Template(form).safe_substitute(subs)
 
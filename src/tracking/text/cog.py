@@ -21,6 +21,7 @@ from . import babel, logger
 from .data import TextTrackerData
 
 from .session import TextSession
+from .wheel import ExpiryWheel
 from .settings import TextTrackerSettings, TextTrackerGlobalSettings
 from .ui import TextTrackerConfigUI
 
@@ -38,6 +39,9 @@ class TextTrackerCog(LionCog):
     # Maximum time to processing for a completed session
     batchtime = conf.text_tracker.getint('batchtime')
 
+    # Granularity in seconds of session expiry
+    expiry_resolution = conf.text_tracker.getfloat('expiry_resolution', 1)
+
     def __init__(self, bot: LionBot):
         self.bot = bot
         self.data = bot.db.load_registry(TextTrackerData())
@@ -55,7 +59,12 @@ class TextTrackerCog(LionCog):
         # guildid -> (userid -> TextSession)
         self.ongoing = defaultdict(dict)
 
+        # Expiry schedule for the ongoing text sessions
+        self.wheel: ExpiryWheel[TextSession] = ExpiryWheel(self.expiry_resolution)
+        self._wheel_wakeup = asyncio.Event()
+
         self._consumer_task = None
+        self._sweeper_task = None
 
         self.untracked_channels = self.settings.UntrackedTextChannels._cache
 
@@ -68,6 +77,8 @@ class TextTrackerCog(LionCog):
                 " errors={errors}"
                 " running={running}"
                 " consumer={consumer}"
+                " sweeper={sweeper}"
+                " wheel={wheel}"
                 ">"
         )
         data = dict(
@@ -76,6 +87,8 @@ class TextTrackerCog(LionCog):
             errors=self.errors,
             running=sum(len(usessions) for usessions in self.ongoing.values()),
             consumer="'Running'" if (self._consumer_task and not self._consumer_task.done()) else "'Not Running'",
+            sweeper="'Running'" if (self._sweeper_task and not self._sweeper_task.done()) else "'Not Running'",
+            wheel=repr(self.wheel),
         )
         if not self.ready.is_set():
             level = StatusLevel.STARTING
@@ -83,6 +96,9 @@ class TextTrackerCog(LionCog):
         elif not self._consumer_task:
             level = StatusLevel.ERRORED
             info = f"(ERROR) Consumer task not running. {state}"
+        elif not self._sweeper_task or self._sweeper_task.done():
+            level = StatusLevel.ERRORED
+            info = f"(ERROR) Session expiry sweeper not running. {state}"
         elif self.errors > 1:
             level = StatusLevel.UNSURE
             info = f"(UNSURE) Errors occurred while consuming. {state}"
@@ -123,6 +139,8 @@ class TextTrackerCog(LionCog):
 
     async def cog_unload(self):
         self.ready.clear()
+        if self._sweeper_task is not None:
+            self._sweeper_task.cancel()
         if self._consumer_task is not None:
             self._consumer_task.cancel()
 
@@ -141,9 +159,48 @@ class TextTrackerCog(LionCog):
                 session=session
             )
         )
+        self.wheel.cancel(session)
         await self.bot.core.lions.fetch_member(session.guildid, session.userid)
         self.sessionq.put_nowait(session)
 
+    def _expire(self, session: TextSession):
+        """
+        Close an expired session and place it straight into the completed queue.
+
+        Unlike `session_handler`, does not wait on the member,
+        since the batch processor fetches the batch members anyway.
+        """
+        self.wheel.cancel(session)
+        if session.close():
+            guild_sessions = self.ongoing[session.guildid]
+            if guild_sessions.get(session.userid, None) is session:
+                guild_sessions.pop(session.userid)
+            self.sessionq.put_nowait(session)
+
+    @log_wrap(stack=['Text Sessions', 'Sweeper'])
+    async def _session_sweeper(self):
+        """
+        Expire idle and maximum length sessions in batches, once every expiry tick.
+        """
+        while True:
+            try:
+                if not self.wheel:
+                    self._wheel_wakeup.clear()
+                    await self._wheel_wakeup.wait()
+                await asyncio.sleep(self.wheel.resolution)
+                due = self.wheel.pop_due(utc_now().timestamp())
+                if due:
+                    logger.debug(f"Expiring {len(due)} text sessions.")
+                    for session in due:
+                        self._expire(session)
+            except asyncio.CancelledError:
+                break
+            except Exception:
+                logger.exception(
+                    "Unknown exception expiring text sessions! Continuing."
+                )
+                self.errors += 1
+
     @log_wrap(stack=['Text Sessions', 'Consumer'])
     async def _session_consumer(self):
         """
@@ -233,7 +290,14 @@ class TextTrackerCog(LionCog):
 
         # Submit to batch data handler
         # TODO: error handling
+        saved_at = utc_now()
         await self.data.TextSessions.end_sessions(self.bot.db, *rows)
+        stats_cog = self.bot.get_cog('StatsCog')
+        if stats_cog:
+            stats_cog.leaderboards.on_message_session_complete(
+                saved_at,
+                *((row[0], row[1], row[2], row[4], row[7]) for row in rows)
+            )
         rank_cog = self.bot.get_cog('RankCog')
         if rank_cog:
             await rank_cog.on_message_session_complete(
@@ -250,8 +314,11 @@ class TextTrackerCog(LionCog):
         if self._consumer_task and not self._consumer_task.cancelled():
             self._consumer_task.cancel()
         self._consumer_task = asyncio.create_task(self._session_consumer(), name='text-session-consumer')
+        if self._sweeper_task and not self._sweeper_task.cancelled():
+            self._sweeper_task.cancel()
+        self._sweeper_task = asyncio.create_task(self._session_sweeper(), name='text-session-sweeper')
         self.ready.set()
-        logger.info("Launched text session consumer.")
+        logger.info("Launched text session consumer and expiry sweeper.")
 
     @LionCog.listener('on_message')
     @log_wrap(stack=['Text Sessions', 'Message Event'])
@@ -284,7 +351,12 @@ class TextTrackerCog(LionCog):
 
         # Identify whether a session already exists for this member
         guild_sessions = self.ongoing[guildid]
-        if (session := guild_sessions.get(message.author.id, None)) is None:
+        if (session := guild_sessions.get(message.author.id, None)) is not None:
+            if session.expires_at <= message.created_at:
+                # Expired, but not yet swept
+                self._expire(session)
+                session = None
+        if session is None:
             with logging_context(context=f"mid: {message.id}"):
                 session = TextSession.from_message(message)
                 session.on_finish(self.session_handler)
@@ -295,6 +367,9 @@ class TextTrackerCog(LionCog):
                     )
                 )
         session.process(message)
+        if not self.wheel:
+            self._wheel_wakeup.set()
+        self.wheel.schedule(session, session.expires_at.timestamp())
 
     # -------- Configuration Commands --------
     @LionCog.placeholder_group
@@ -4,6 +4,7 @@ from psycopg import sql
 from meta.logger import log_wrap
 from data import RowModel, Registry, Table
 from data.columns import Integer, String, Timestamp, Bool
+from utils.data import TemporaryTable
 
 from core.data import CoreData
 
@@ -74,17 +75,26 @@ class TextTrackerData(Registry):
         @classmethod
         @log_wrap(action='end_text_sessions')
         async def end_sessions(cls, connector, *session_data):
+            data_table = TemporaryTable(
+                '_guildid', '_userid',
+                '_start_time', '_duration',
+                '_messages', '_words', '_periods',
+                '_memberxp', '_userxp',
+                '_coins',
+                name='_data',
+                types=(
+                    'BIGINT', 'BIGINT',
+                    'TIMESTAMPTZ', 'INTEGER',
+                    'INTEGER', 'INTEGER', 'INTEGER',
+                    'INTEGER', 'INTEGER',
+                    'INTEGER'
+                ),
+                copy=True
+            )
+            data_table.set_values(*session_data)
             query = sql.SQL("""
                 WITH
-                    data (
-                        _guildid, _userid,
-                        _start_time, _duration,
-                        _messages, _words, _periods,
-                        _memberxp, _userxp,
-                        _coins
-                    )
-                    AS
-                    (VALUES {})
+                    data AS (SELECT * FROM {})
                 , transactions AS (
                     INSERT INTO coin_transactions (
                         guildid, actorid,
@@ -151,28 +161,18 @@ class TextTrackerData(Registry):
                 FROM data
                 LEFT JOIN member_exp ON data._userid = member_exp.userid AND data._guildid = member_exp.guildid
                 LEFT JOIN user_exp ON data._userid = user_exp.userid
-            """).format(
-                sql.SQL(', ').join(
-                    sql.SQL("({}, {}, {}, {}, {}, {}, {}, {}, {}, {})").format(
-                        sql.Placeholder(), sql.Placeholder(),
-                        sql.Placeholder(), sql.Placeholder(),
-                        sql.Placeholder(), sql.Placeholder(), sql.Placeholder(),
-                        sql.Placeholder(), sql.Placeholder(),
-                        sql.Placeholder(),
-                    )
-                    for _ in session_data
-                )
-            )
-            # TODO: Consider asking for a *new* temporary connection here, to avoid blocking
-            # Or ask for a connection from the connection pool
+            """)
             # Transaction may take some time due to index updates
-            # Alternatively maybe use the "do not expect response mode"
-            async with connector.connection() as conn:
-                async with conn.cursor() as cursor:
-                    await cursor.execute(
-                        query,
-                        tuple(chain(*session_data))
-                    )
+            # Use the background lane so it cannot hold up interactive connections
+            async with connector.connection(lane='background') as conn:
+                async with conn.transaction():
+                    async with conn.cursor() as cursor:
+                        await data_table.stage(cursor)
+                        data_expr, data_values = data_table.as_tuple()
+                        await cursor.execute(
+                            query.format(data_expr),
+                            tuple(data_values)
+                        )
             return
 
         @classmethod
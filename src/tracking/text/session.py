@@ -22,15 +22,17 @@ class TextSession:
     this_period_start
     this_period_messages
     this_period_words
-    timeout
+    expires_at
+        Time at which the session will time out or reach the maximum session length.
+        Expiry is scheduled by the owner of the session, typically the `TextTrackerCog`.
     """
     __slots__ = (
         'userid', 'guildid',
         'start_time', 'end_time',
         'total_messages', 'total_words', 'total_periods',
         'this_period_start', 'this_period_messages', 'this_period_words',
-        'last_message_at', 'timeout_task',
-        'finish_callback', 'finish_task', 'finished', 'finished_at',
+        'last_message_at', 'expires_at',
+        'finish_callback', 'finished', 'finished_at',
     )
 
     # Length of a single period
@@ -58,10 +60,9 @@ class TextSession:
         self.this_period_words = 0
 
         self.last_message_at = None
-        self.timeout_task = None
+        self.expires_at = self.end_time
 
         self.finish_callback = None
-        self.finish_task = None
         self.finished = asyncio.Event()
         self.finished_at = None
 
@@ -124,7 +125,7 @@ class TextSession:
         self.last_message_at = message.created_at
 
         # Update the session expiry
-        self._reschedule_timeout(self.last_message_at + dt.timedelta(seconds=self.timeout_length))
+        self.expires_at = min(self.end_time, self.last_message_at + dt.timedelta(seconds=self.timeout_length))
 
     def roll_period(self):
         """
@@ -136,20 +137,28 @@ class TextSession:
             self.total_periods += 1
         self.this_period_start = None
 
-    async def finish(self):
+    def close(self) -> bool:
         """
-        Finalise the session and set the finished event. Idempotent.
+        Finalise the session and set the finished event, without calling the finish callback.
 
-        Also calls the registered finish callback, if set.
+        Returns whether the session was closed by this call.
         """
         if self.finished.is_set():
-            return
+            return False
 
         self.roll_period()
         self.finished_at = self.last_message_at or utc_now()
 
         self.finished.set()
-        if self.finish_callback:
+        return True
+
+    async def finish(self):
+        """
+        Finalise the session and set the finished event. Idempotent.
+
+        Also calls the registered finish callback, if set.
+        """
+        if self.close() and self.finish_callback:
             await self.finish_callback(self)
 
     async def cancel(self):
@@ -165,21 +174,3 @@ class TextSession:
         Register a callback coroutine to be executed when the session finishes.
         """
         self.finish_callback = callback
-
-    async def _timeout(self, diff):
-        if diff > 0:
-            await asyncio.sleep(diff)
-        await asyncio.shield(self.finish())
-
-    def _reschedule_timeout(self, target_time):
-        """
-        Schedule the finish timeout for the given target time.
-        """
-        if self.finished.is_set():
-            return
-        if self.finish_task and not self.finish_task.cancelled():
-            self.finish_task.cancel()
-
-        target_time = min(self.end_time, target_time)
-        dist = (target_time - utc_now()).total_seconds()
-        self.finish_task = asyncio.create_task(self._timeout(dist))
@@ -0,0 +1,129 @@
+from typing import Generic, TypeVar, Optional
+import math
+
+
+T = TypeVar('T')
+
+
+class ExpiryWheel(Generic[T]):
+    """
+    Bucketed expiry scheduler for large numbers of frequently rescheduled items.
+
+    Items are placed in buckets of `resolution` seconds, by the (rounded up) expiry time,
+    and due buckets are swept in order with `pop_due`.
+    Rescheduling an item within the same bucket is a dictionary write,
+    and rescheduling to a different bucket appends it to that bucket,
+    leaving a stale reference behind in the old bucket which is skipped by the sweep.
+    Hence items never expire early, and expire at most one `resolution` late.
+
+    Times are given as POSIX timestamps. Items must be hashable.
+    """
+    __slots__ = ('resolution', '_buckets', '_scheduled', '_cursor', 'expired', 'stale')
+
+    def __init__(self, resolution: float = 1.0):
+        self.resolution = resolution
+
+        # tick -> items which were scheduled in this tick
+        self._buckets: dict[int, list[T]] = {}
+        # item -> (tick, expiry)
+        self._scheduled: dict[T, tuple[int, float]] = {}
+        # First tick which has not yet been swept
+        self._cursor: Optional[int] = None
+
+        # Statistics
+        self.expired = 0
+        self.stale = 0
+
+    def __repr__(self):
+        return (
+            "<"
+                f"{self.__class__.__name__}"
+                f" resolution={self.resolution}"
+                f" scheduled={len(self._scheduled)}"
+                f" buckets={len(self._buckets)}"
+                f" expired={self.expired}"
+                f" stale={self.stale}"
+                ">"
+        )
+
+    def __len__(self):
+        return len(self._scheduled)
+
+    def __contains__(self, item):
+        return item in self._scheduled
+
+    def _tick(self, timestamp: float) -> int:
+        return math.ceil(timestamp / self.resolution)
+
+    def schedule(self, item: T, expiry: float):
+        """
+        Schedule the given item to expire at the given time, replacing any existing schedule.
+        """
+        tick = self._tick(expiry)
+        if self._cursor is not None and tick < self._cursor:
+            # Already due, place in the last swept bucket so the next sweep expires it
+            tick = self._cursor - 1
+        current = self._scheduled.get(item, None)
+        self._scheduled[item] = (tick, expiry)
+        if current is None or current[0] != tick:
+            bucket = self._buckets.get(tick, None)
+            if bucket is None:
+                self._buckets[tick] = [item]
+            else:
+                bucket.append(item)
+
+    def cancel(self, item: T) -> bool:
+        """
+        Remove the given item from the schedule.
+
+        Returns whether the item was scheduled.
+        """
+        return self._scheduled.pop(item, None) is not None
+
+    def expiry(self, item: T) -> Optional[float]:
+        current = self._scheduled.get(item, None)
+        return current[1] if current is not None else None
+
+    def next_expiry(self) -> Optional[float]:
+        """
+        The end time of the earliest non-empty bucket, if any.
+
+        The earliest bucket may only contain stale references.
+        """
+        if not self._buckets:
+            return None
+        return min(self._buckets) * self.resolution
+
+    def pop_due(self, now: float) -> list[T]:
+        """
+        Remove and return every item due to expire at the given time.
+        """
+        now_tick = math.floor(now / self.resolution)
+        if self._cursor is None:
+            cursor = min(self._buckets, default=now_tick)
+        elif (self._cursor - 1) in self._buckets:
+            # Overdue items were scheduled since the last sweep
+            cursor = self._cursor - 1
+        else:
+            cursor = self._cursor
+
+        due = []
+        buckets = self._buckets
+        scheduled = self._scheduled
+        while cursor <= now_tick and buckets:
+            bucket = buckets.pop(cursor, None)
+            if bucket is not None:
+                for item in bucket:
+                    current = scheduled.get(item, None)
+                    if current is not None and current[0] == cursor:
+                        del scheduled[item]
+                        due.append(item)
+                    else:
+                        self.stale += 1
+            cursor += 1
+            if buckets and cursor <= now_tick and cursor not in buckets:
+                # Skip directly to the next occupied bucket
+                cursor = min(min(buckets), now_tick + 1)
+        self._cursor = now_tick + 1
+        self.expired += len(due)
+        return due
@@ -1,6 +1,8 @@
 from typing import Optional
 import asyncio
 import itertools
+import random
+import time
 import datetime as dt
 
 import discord
@@ -8,11 +10,12 @@ from discord.ext import commands as cmds
 from discord import app_commands as appcmds
 
 from data import Condition
-from meta import LionBot, LionCog, LionContext
+from meta import LionBot, LionCog, LionContext, conf
 from meta.logger import log_wrap
 from meta.sharding import THIS_SHARD
 from meta.monitor import ComponentMonitor, ComponentStatus, StatusLevel
 from utils.lib import utc_now
+from utils.locks import GuildMemberLocks
 from core.lion_guild import VoiceMode
 
 from wards import low_management_ward, moderator_ctxward
@@ -22,6 +25,7 @@ from .data import VoiceTrackerData
 from .settings import VoiceTrackerSettings, VoiceTrackerConfigUI
 
 from .session import VoiceSession, TrackedVoiceState, SessionState
+from .ledger import TrackedTodayLedger
 
 _p = babel._p
 
@@ -30,6 +34,11 @@ class VoiceTrackerCog(LionCog):
     """
     LionCog module controlling and configuring the voice tracking subsystem.
     """
+    # Percentage of tracked today ledger hits to verify against data
+    ledger_verify = conf.voice_tracker.getfloat('ledger_verify', 0)
+
+    # Minimum time in seconds between prunes of stale ledger entries
+    ledger_prune_interval = 3600
 
     def __init__(self, bot: LionBot):
         self.bot = bot
@@ -42,12 +51,17 @@ class VoiceTrackerCog(LionCog):
         # Flag indicating whether local voice sessions have been initialised
         self.initialised = asyncio.Event()
         self.handle_events = False
-        self.tracking_lock = asyncio.Lock()
+        # Per-member event locks, with exclusive guild and global barriers for refreshes
+        self.tracking_locks = GuildMemberLocks()
 
         self.untracked_channels = self.settings.UntrackedChannels._cache
 
         self.active_sessions = VoiceSession._active_sessions_
 
+        # Shard ledger of member voice time tracked today
+        self.ledger = TrackedTodayLedger()
+        self._last_ledger_prune = time.monotonic()
+
     async def _monitor(self):
         state = (
             "<"
@@ -61,7 +75,12 @@ class VoiceTrackerCog(LionCog):
                 " channels={channels}"
                 " cached={cached}"
                 " initial_event={initial_event}"
-                " lock={lock}"
+                " lock_waiting={lock_waiting}"
+                " lock_held={lock_held}"
+                " lock_wait_recent={lock_wait_recent:.3f}s"
+                " lock_wait_max={lock_wait_max:.3f}s"
+                " locks={locks}"
+                " ledger={ledger}"
                 ">"
         )
         data = dict(
@@ -74,7 +93,12 @@ class VoiceTrackerCog(LionCog):
             channels=0,
             cached=sum(len(gsessions) for gsessions in VoiceSession._sessions_.values()),
             initial_event=self.initialised,
-            lock=self.tracking_lock
+            locks=self.tracking_locks,
+            ledger=self.ledger,
+            lock_waiting=self.tracking_locks.stats.waiting,
+            lock_held=self.tracking_locks.stats.held,
+            lock_wait_recent=self.tracking_locks.stats.wait_recent,
+            lock_wait_max=self.tracking_locks.stats.wait_max,
         )
         channels = set()
         for tguild in self.active_sessions.values():
@@ -102,9 +126,9 @@ class VoiceTrackerCog(LionCog):
         if not self.initialised.is_set():
             level = StatusLevel.STARTING
             info = f"(STARTING) Not initialised. {state}"
-        elif self.tracking_lock.locked():
+        elif self.tracking_locks.locked():
             level = StatusLevel.WAITING
-            info = f"(WAITING) Waiting for tracking lock. {state}"
+            info = f"(WAITING) Waiting for tracking barrier. {state}"
         elif data['actual'] != data['active']:
             level = StatusLevel.UNSURE
             info = f"(UNSURE) Actual sessions do not match active. {state}"
@@ -194,6 +218,9 @@ class VoiceTrackerCog(LionCog):
                 *((guildid, userid, lguilds[guildid].today) for guildid, userid in active_memberids)
             )
             tracked_today = {(row['guildid'], row['userid']): row['tracked'] for row in tracked_today_data}
+            seeded_at = utc_now()
+            for (gid, uid), tracked in tracked_today.items():
+                self.ledger.seed(gid, uid, lguilds[gid].today, tracked, as_of=seeded_at)
         else:
             lguilds = {}
             tracked_today = {}
@@ -318,8 +345,7 @@ class VoiceTrackerCog(LionCog):
         # If this becomes an actual problem, implement an `ignore_guilds` set flag of some form...
         logger.debug(f"Beginning voice state refresh for <gid: {guild.id}>")
 
-        async with self.tracking_lock:
-            # TODO: Add a 'lock holder' attribute which is readable by the monitor
+        async with self.tracking_locks.guild(guild.id):
             logger.debug(f"Voice state refresh for <gid: {guild.id}> is past lock")
 
             # Deactivate any ongoing session tasks in this guild
@@ -329,6 +355,9 @@ class VoiceTrackerCog(LionCog):
             # Clear registry
             VoiceSession._sessions_.pop(guild.id, None)
 
+            # Forget tracked time for this guild, since the day or sessions may have changed
+            self.ledger.reset(guild.id)
+
             # Update untracked channel information for this guild
             self.untracked_channels.pop(guild.id, None)
             await self.settings.UntrackedChannels.get(guild.id)
@@ -377,7 +406,7 @@ class VoiceTrackerCog(LionCog):
         # Wait for running events to complete
         # And make sure future events will be processed after initialisation
         # Note only events occurring after our voice state snapshot will be processed
-        async with self.tracking_lock:
+        async with self.tracking_locks.barrier(holder='initialise'):
             # Deactivate all ongoing sessions
             active = [session for gsessions in self.active_sessions.values() for session in gsessions.values()]
             for session in active:
@@ -387,6 +416,9 @@ class VoiceTrackerCog(LionCog):
             # Also clear the session registry cache
             VoiceSession._sessions_.clear()
 
+            # And the tracked today ledger, since we may have missed session events
+            self.ledger.reset()
+
             # Refresh untracked information for all guilds we are in
             await self.settings.UntrackedChannels.setup(self.bot)
 
@@ -445,8 +477,9 @@ class VoiceTrackerCog(LionCog):
         bchannel = before.channel if before else None
         achannel = after.channel if after else None
 
-        # Take tracking lock
-        async with self.tracking_lock:
+        # Take the member tracking lock
+        # Events for other members (and other guilds) may be processed concurrently
+        async with self.tracking_locks.member(member.guild.id, member.id):
             # Fetch tracked member session state
             session = self.get_session(member.guild.id, member.id)
             tstate = session.state
@@ -612,11 +645,33 @@ class VoiceTrackerCog(LionCog):
         """
         Fetch how long the given member has tracked on voice today, using the guild timezone.
 
-        Applies cache wherever possible.
+        Reads from the tracked today ledger wherever possible,
+        falling back to (and seeding the ledger from) data.
+        A `ledger_verify` percentage of ledger reads are checked against data.
+        """
+        lguild = await self.bot.core.lions.fetch_guild(guildid)
+        today = lguild.today
+
+        if time.monotonic() - self._last_ledger_prune > self.ledger_prune_interval:
+            self._last_ledger_prune = time.monotonic()
+            self.ledger.prune(utc_now() - dt.timedelta(days=2))
+
+        tracked = self.ledger.get(guildid, userid, today)
+        if tracked is None:
+            tracked = await self.data.VoiceSessions.study_time_since(guildid, userid, today)
+            self.ledger.seed(guildid, userid, today, tracked)
+        elif self.ledger_verify and random.random() * 100 < self.ledger_verify:
+            actual = await self.data.VoiceSessions.study_time_since(guildid, userid, today)
+            self.ledger.report_drift(guildid, userid, today, tracked, actual)
+            tracked = actual
+        return tracked
+
+    async def record_tracked(self, guildid: int, userid: int, start: dt.datetime, end: dt.datetime):
+        """
+        Record a completed voice session in the tracked today ledger.
         """
-        # TODO: Design caching scheme for this.
         lguild = await self.bot.core.lions.fetch_guild(guildid)
-        return await self.data.VoiceSessions.study_time_since(guildid, userid, lguild.today)
+        self.ledger.record(guildid, userid, lguild.today, start, end)
 
     @LionCog.listener("on_guild_join")
     @log_wrap(action='Join Guild Voice Sessions')
@@ -638,9 +693,10 @@ class VoiceTrackerCog(LionCog):
         if not self.handle_events:
             return
 
-        async with self.tracking_lock:
+        async with self.tracking_locks.guild(guild.id):
             sessions = VoiceSession._active_sessions_.pop(guild.id, {})
             VoiceSession._sessions_.pop(guild.id, None)
+            self.ledger.reset(guild.id)
             now = utc_now()
             to_close = []  # (guildid, userid, _at)
             for session in sessions.values():
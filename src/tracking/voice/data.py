@@ -98,6 +98,7 @@ class VoiceTrackerData(Registry):
         CREATE UNIQUE INDEX voice_sessions_ongoing_members ON voice_sessions_ongoing (guildid, userid);
         """
         _tablename_ = "voice_sessions_ongoing"
+        _compact_ = True
 
         guildid = Integer(primary=True)
         userid = Integer(primary=True)
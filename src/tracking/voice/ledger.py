@@ -0,0 +1,168 @@
+from typing import Optional
+import datetime as dt
+
+from utils.lib import utc_now
+
+from . import logger
+
+
+class LedgerEntry:
+    __slots__ = ('day', 'tracked', 'as_of')
+
+    def __init__(self, day: dt.datetime, tracked: int, as_of: dt.datetime):
+        # Start of the guild day this entry describes
+        self.day = day
+        # Tracked voice time in seconds on this day
+        self.tracked = tracked
+        # Time up to which `tracked` accounts for all (including ongoing) sessions
+        self.as_of = as_of
+
+    def __repr__(self):
+        return f"<LedgerEntry day={self.day.isoformat()} tracked={self.tracked} as_of={self.as_of.isoformat()}>"
+
+
+class TrackedTodayLedger:
+    """
+    In-memory per-shard record of how long each member has tracked in voice today,
+    using the guild timezone to determine the day.
+
+    Entries are seeded from data (typically in bulk when sessions are loaded),
+    incremented when voice sessions close, and lazily rolled over to the next day
+    whenever they are read or updated after the guild's midnight.
+
+    Once the ledger has been observing a guild since before the start of the guild day,
+    every completed session in the guild that day is known to the ledger,
+    so members without an entry are known to have tracked nothing.
+    Otherwise, lookups for unknown members miss, and should be seeded from data.
+    """
+
+    def __init__(self):
+        self.entries: dict[tuple[int, int], LedgerEntry] = {}
+
+        # Time since which every session closed in each guild has been recorded
+        self.covered_since: dict[int, dt.datetime] = {}
+        self.default_covered_since = utc_now()
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.verified = 0
+        self.drifted = 0
+
+    def __repr__(self):
+        return (
+            "<"
+                f"{self.__class__.__name__}"
+                f" entries={len(self.entries)}"
+                f" hits={self.hits}"
+                f" misses={self.misses}"
+                f" verified={self.verified}"
+                f" drifted={self.drifted}"
+                ">"
+        )
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _covers(self, guildid: int, day: dt.datetime) -> bool:
+        return self.covered_since.get(guildid, self.default_covered_since) <= day
+
+    def reset(self, guildid: Optional[int] = None):
+        """
+        Forget ledger entries for the given guild, or for every guild if no guild is given.
+
+        Coverage restarts from the current time,
+        so subsequent lookups in the affected guilds will miss until the next guild day.
+        """
+        now = utc_now()
+        if guildid is None:
+            self.entries.clear()
+            self.covered_since.clear()
+            self.default_covered_since = now
+        else:
+            self.entries = {key: entry for key, entry in self.entries.items() if key[0] != guildid}
+            self.covered_since[guildid] = now
+
+    def seed(self, guildid: int, userid: int, day: dt.datetime, tracked: int, as_of: Optional[dt.datetime] = None):
+        """
+        Set the tracked time for the given member on the given day,
+        accounting for all sessions up to `as_of` (by default, now).
+        """
+        self.entries[(guildid, userid)] = LedgerEntry(day, int(tracked), as_of or utc_now())
+
+    def get(self, guildid: int, userid: int, day: dt.datetime) -> Optional[int]:
+        """
+        Retrieve the tracked time for the given member on the given day.
+
+        Returns `None` if the ledger cannot answer authoritatively.
+        """
+        entry = self.entries.get((guildid, userid), None)
+        if entry is not None and entry.day < day:
+            # Roll the entry over to the new day
+            # Sessions closed after the new day started would have rolled the entry themselves
+            entry = self.entries[(guildid, userid)] = LedgerEntry(day, 0, day)
+
+        if entry is not None and entry.day == day:
+            result = entry.tracked
+        elif self._covers(guildid, day):
+            result = 0
+        else:
+            result = None
+
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def record(self, guildid: int, userid: int, day: dt.datetime, start: dt.datetime, end: dt.datetime):
+        """
+        Record a completed voice session for the given member.
+
+        Only the part of the session lying within the given day,
+        and not already accounted for by the ledger, is added.
+        """
+        key = (guildid, userid)
+        entry = self.entries.get(key, None)
+        if entry is None or entry.day < day:
+            if entry is None and not self._covers(guildid, day):
+                # We do not know how long this member tracked before this session
+                # Leave the member unknown so the next lookup reseeds
+                return
+            entry = self.entries[key] = LedgerEntry(day, 0, day)
+        elif entry.day > day:
+            # Closing a session from a previous day, nothing to do
+            return
+
+        start = max(start, entry.as_of)
+        if end > start:
+            entry.tracked += int((end - start).total_seconds())
+            entry.as_of = end
+
+    def prune(self, before: dt.datetime) -> int:
+        """
+        Remove entries describing days which started before the given time.
+        Returns the number of pruned entries.
+        """
+        stale = [key for key, entry in self.entries.items() if entry.day < before]
+        for key in stale:
+            self.entries.pop(key, None)
+        if stale:
+            logger.debug(f"Pruned {len(stale)} stale entries from the tracked today ledger.")
+        return len(stale)
+
+    def report_drift(self, guildid: int, userid: int, day: dt.datetime, ledger_value: int, data_value: int):
+        """
+        Record a verification of a ledger value against data,
+        logging and correcting any drift.
+        """
+        self.verified += 1
+        # Allow for a second of rounding either side
+        if abs(ledger_value - data_value) > 1:
+            self.drifted += 1
+            logger.warning(
+                f"Tracked today ledger drifted for member <uid: {userid}> in guild <gid: {guildid}>. "
+                f"Ledger has {ledger_value} seconds, but data has {data_value} seconds. "
+                f"Drift rate {self.drifted}/{self.verified}. Correcting ledger."
+            )
+            self.seed(guildid, userid, day, data_value)
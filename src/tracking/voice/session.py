@@ -383,6 +383,9 @@ class VoiceSession:
             now = utc_now()
             await self.data.close_study_session_at(self.guildid, self.userid, now)
 
+            cog = self.bot.get_cog('VoiceTrackerCog')
+            await cog.record_tracked(self.guildid, self.userid, self.data.start_time, now)
+
             # TODO: Something a bit saner/safer.. dispatch the finished session instead?
             self.bot.dispatch('voice_session_end', self.data, now)
 
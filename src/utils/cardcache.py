@@ -0,0 +1,213 @@
+"""
+Process-wide cache of rendered card images.
+
+Cards are created through `card_cache.card`, which fingerprints the card class,
+the current locale, and the card arguments (including the skin arguments).
+Rendering a `CachedCard` returns the cached image if an identical card was already rendered,
+and concurrent renders of identical cards share a single render.
+
+Since entries are addressed by their inputs, a card with changed data or skin never hits a stale entry.
+Invalidation only releases the memory held by entries which can no longer be requested,
+and entries are otherwise evicted in least recently used order to stay within the memory budget.
+"""
+from typing import Any, Hashable, Optional
+from collections import OrderedDict, defaultdict
+from functools import partial
+from io import BytesIO
+import asyncio
+import hashlib
+import logging
+import pickle
+
+import discord
+
+from babel.translator import ctx_locale
+
+logger = logging.getLogger(__name__)
+
+
+class CachedCard:
+    """
+    Wrapper around an unrendered card, rendering through the `CardCache`.
+
+    Attributes other than `render` and `as_file` are read from the wrapped card.
+    Cards created without a cache keep their fingerprint, but always render directly.
+    """
+    __slots__ = ('card', 'key', 'tags', 'cache', 'data', 'cache_hit')
+
+    def __init__(self, cache: Optional['CardCache'], card, key: Optional[bytes], tags: tuple[Hashable, ...]):
+        self.cache = cache
+        self.card = card
+        self.key = key
+        self.tags = tags
+        self.data: Optional[bytes] = None
+        self.cache_hit = False
+
+    def __getattr__(self, name):
+        return getattr(self.card, name)
+
+    def __repr__(self):
+        return f"<CachedCard card={self.card!r} key={self.key.hex() if self.key else None} hit={self.cache_hit}>"
+
+    async def render(self) -> bytes:
+        if self.data is not None:
+            # Already rendered, or given the image data of an identical earlier render
+            return self.data
+        if self.key is None or self.cache is None:
+            self.data = await self.card.render()
+        else:
+            self.data, self.cache_hit = await self.cache.render(self.key, self.card, self.tags)
+        return self.data
+
+    def as_file(self, filename: str) -> discord.File:
+        if self.data is None:
+            raise ValueError("Cannot create a file from a card which has not been rendered.")
+        return discord.File(BytesIO(self.data), filename=filename)
+
+
+class CardCache:
+    """
+    LRU cache of rendered card images, holding at most `budget` bytes of image data.
+
+    Entries may be tagged, e.g. with `('user', userid)`, and invalidated by tag.
+    """
+    def __init__(self, budget: int = 64 * 2**20):
+        self.budget = budget
+
+        # key -> image data, in least recently used order
+        self._entries: OrderedDict[bytes, bytes] = OrderedDict()
+        self._entry_tags: dict[bytes, tuple[Hashable, ...]] = {}
+        self._tagged: defaultdict[Hashable, set[bytes]] = defaultdict(set)
+        # key -> render in progress
+        self._pending: dict[bytes, asyncio.Task] = {}
+        self.size = 0
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __repr__(self):
+        return (
+            "<"
+                f"{self.__class__.__name__}"
+                f" entries={len(self._entries)}"
+                f" size={self.size}"
+                f" budget={self.budget}"
+                f" hits={self.hits}"
+                f" misses={self.misses}"
+                f" evictions={self.evictions}"
+                f" invalidations={self.invalidations}"
+                ">"
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0
+
+    def card(self, card_cls, *args, tags: tuple[Hashable, ...] = (), store: bool = True, **kwargs) -> CachedCard:
+        """
+        Create a card of the given class with the given arguments, rendering through this cache.
+
+        Cards with arguments that cannot be pickled are rendered without caching.
+        If `store` is not set, the card is fingerprinted but rendered without this cache,
+        for cards which are never requested again, and are instead compared by the caller.
+        """
+        card = card_cls(*args, **kwargs)
+        return CachedCard(self if store else None, card, self.fingerprint(card_cls, args, kwargs), tags)
+
+    @staticmethod
+    def fingerprint(card_cls, args: tuple, kwargs: dict[str, Any]) -> Optional[bytes]:
+        try:
+            payload = pickle.dumps(
+                (card_cls.__module__, card_cls.__qualname__, ctx_locale.get(), args, kwargs),
+                protocol=pickle.HIGHEST_PROTOCOL
+            )
+        except Exception:
+            logger.debug(f"Could not fingerprint arguments of card {card_cls.__name__}, not caching.")
+            return None
+        return hashlib.blake2b(payload, digest_size=16).digest()
+
+    async def render(self, key: bytes, card, tags: tuple[Hashable, ...] = ()) -> tuple[bytes, bool]:
+        """
+        Return the image data for the given card key, rendering the card if it is not cached.
+
+        Returns the image data, and whether the render was avoided.
+        """
+        if (data := self._entries.get(key, None)) is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data, True
+
+        if (task := self._pending.get(key, None)) is not None:
+            # An identical card is already being rendered
+            self.hits += 1
+            hit = True
+        else:
+            self.misses += 1
+            task = self._pending[key] = asyncio.create_task(card.render())
+            task.add_done_callback(partial(self._rendered, key, tags))
+            hit = False
+        return await asyncio.shield(task), hit
+
+    def _rendered(self, key: bytes, tags: tuple[Hashable, ...], task: asyncio.Task):
+        self._pending.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        data = task.result()
+        if len(data) > self.budget:
+            return
+        self._entries[key] = data
+        self._entry_tags[key] = tags
+        for tag in tags:
+            self._tagged[tag].add(key)
+        self.size += len(data)
+
+        while self.size > self.budget:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+            self.evictions += 1
+
+    def _discard(self, key: bytes):
+        data = self._entries.pop(key)
+        self.size -= len(data)
+        for tag in self._entry_tags.pop(key, ()):
+            if (keys := self._tagged.get(tag, None)) is not None:
+                keys.discard(key)
+                if not keys:
+                    self._tagged.pop(tag)
+
+    def invalidate(self, *tags: Hashable) -> int:
+        """
+        Discard every entry with any of the given tags.
+
+        Returns the number of entries discarded.
+        """
+        count = 0
+        for tag in tags:
+            for key in self._tagged.pop(tag, ()):
+                if key in self._entries:
+                    self._discard(key)
+                    count += 1
+        self.invalidations += count
+        return count
+
+    def clear(self) -> int:
+        """
+        Discard every entry.
+        """
+        count = len(self._entries)
+        self._entries.clear()
+        self._entry_tags.clear()
+        self._tagged.clear()
+        self.size = 0
+        self.invalidations += count
+        return count
+
+
+card_cache = CardCache()
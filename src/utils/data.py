@@ -2,12 +2,13 @@
 Some useful pre-built Conditions for data queries.
 """
 from typing import Optional, Any
-from itertools import chain
+from itertools import chain, count
 
-from psycopg import sql
+from psycopg import AsyncCursor, sql
 from data.conditions import Condition, Joiner
 from data.columns import ColumnExpr
 from data.base import Expression
+from data.bulk import column_types, copy_rows
 from constants import MAX_COINS
 
 
@@ -86,10 +87,19 @@ def as_duration(expr: Expression) -> ColumnExpr:
     )
 
 
+_staging_ids = count()
+
+
 class TemporaryTable(Expression):
     """
     Create a temporary table expression to be used in From or With clauses.
 
+    By default the table is expressed as a `VALUES` list.
+    If `copy` is set and at least `copy_threshold` rows are given,
+    `stage` instead streams the rows with binary COPY into a real temporary table,
+    which is then referenced under the same name.
+    This requires the column `types`, and must be done inside a transaction.
+
     Example
     -------
     ```
@@ -99,13 +109,18 @@ class TemporaryTable(Expression):
     real_table.update_where(col1=tmp_table['_col1']).set(col2=tmp_table['_col2']).from_(tmp_table)
     ```
     """
+    # Minimum number of rows to stage through COPY
+    copy_threshold = 500
 
-    def __init__(self, *columns: str, name: str = '_t', types: Optional[tuple[str, ...]] = None):
+    def __init__(self, *columns: str, name: str = '_t', types: Optional[tuple[str, ...]] = None, copy=False):
         self.name = name
         self.columns = columns
         self.types = types
         if types and len(types) != len(columns):
             raise ValueError("Number of types does not much number of columns!")
+        if copy and not types:
+            raise ValueError("Column types are required to stage a temporary table with COPY.")
+        self.copy = copy
 
         self._table_columns = {
             col: ColumnExpr(sql.Identifier(name, col))
@@ -114,6 +129,9 @@ class TemporaryTable(Expression):
 
         self.values = []
 
+        # Name of the staging table, once the values have been copied into it
+        self._staged: Optional[sql.Identifier] = None
+
     def __getitem__(self, key) -> sql.Identifier:
         return self._table_columns[key]
 
@@ -123,6 +141,8 @@ class TemporaryTable(Expression):
         AS
         name (col1, col2)
         """
+        if self._staged is not None:
+            return (sql.SQL("{} AS {}").format(self._staged, sql.Identifier(self.name)), ())
         if not self.values:
             raise ValueError("Cannot flatten CTE with no values.")
 
@@ -153,6 +173,34 @@ class TemporaryTable(Expression):
     def set_values(self, *data):
         self.values = data
 
+    async def stage(self, cursor: AsyncCursor) -> bool:
+        """
+        Copy the values into a temporary staging table, if COPY is enabled and there are enough values.
+
+        Must be called inside a transaction, as the staging table is dropped on commit.
+        Returns whether the values were staged.
+        Otherwise, the table continues to be expressed as a `VALUES` list.
+        """
+        if not self.copy or len(self.values) < self.copy_threshold:
+            return False
+
+        staging = sql.Identifier(f"_tmp_staging_{next(_staging_ids)}")
+        await cursor.execute(
+            sql.SQL("CREATE TEMPORARY TABLE {staging} ({columns}) ON COMMIT DROP").format(
+                staging=staging,
+                columns=sql.SQL(', ').join(
+                    sql.SQL("{} {}").format(sql.Identifier(col), sql.SQL(coltype))
+                    for col, coltype in zip(self.columns, self.types)
+                )
+            )
+        )
+        types = await column_types(cursor, staging, self.columns, key=(self.columns, self.types))
+        if types is None:
+            return False
+        await copy_rows(cursor, staging, self.columns, types, self.values)
+        self._staged = staging
+        return True
+
 
 def SAFECOINS(expr: Expression) -> Expression:
     expr_expr, expr_values = expr.as_tuple()
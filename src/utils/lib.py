@@ -910,11 +910,12 @@ async def parse_time_static(timestr, timezone):
         )
     return ts
 
-def write_records(records: list[dict[str, Any]], stream: StringIO):
+def write_records(records: list[dict[str, Any]], stream: StringIO, header=True):
     if records:
-        keys = records[0].keys()
-        stream.write(','.join(keys))
-        stream.write('\n')
+        if header:
+            keys = records[0].keys()
+            stream.write(','.join(keys))
+            stream.write('\n')
         for record in records:
             stream.write(','.join(map(str, record.values())))
             stream.write('\n')
@@ -0,0 +1,288 @@
+import asyncio
+import time
+import logging
+from typing import Optional
+from collections import deque
+from contextlib import asynccontextmanager
+from weakref import WeakValueDictionary
+
+
+logger = logging.getLogger(__name__)
+
+
+class LockStats:
+    """
+    Lightweight contention statistics for a family of locks.
+
+    Tracks the current number of waiters (queue depth),
+    the number of held locks, and the time spent waiting for acquisition.
+    """
+    __slots__ = ('waiting', 'held', 'acquired', 'wait_total', 'wait_max', 'recent')
+
+    def __init__(self, recent=1000):
+        self.waiting = 0
+        self.held = 0
+        self.acquired = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        # Recent wait times, for windowed averages
+        self.recent: deque[float] = deque(maxlen=recent)
+
+    def __repr__(self):
+        return (
+            "<"
+                f"LockStats"
+                f" waiting={self.waiting}"
+                f" held={self.held}"
+                f" acquired={self.acquired}"
+                f" wait_avg={self.wait_avg:.4f}"
+                f" wait_recent={self.wait_recent:.4f}"
+                f" wait_max={self.wait_max:.4f}"
+                ">"
+        )
+
+    @property
+    def wait_avg(self) -> float:
+        return self.wait_total / self.acquired if self.acquired else 0.0
+
+    @property
+    def wait_recent(self) -> float:
+        return sum(self.recent) / len(self.recent) if self.recent else 0.0
+
+    def record(self, waited: float):
+        self.acquired += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        self.recent.append(waited)
+
+
+class SharedLock:
+    """
+    Asyncio lock which may be held either exclusively, or shared by any number of holders.
+
+    Waiters are granted strictly in arrival order,
+    so a waiting exclusive holder is never starved by a stream of shared holders.
+    Not thread-safe.
+    """
+    __slots__ = ('_shared', '_exclusive', '_waiters', '__weakref__')
+
+    def __init__(self):
+        self._shared = 0
+        self._exclusive = False
+        self._waiters: deque[tuple[bool, asyncio.Future]] = deque()
+
+    def __repr__(self):
+        return (
+            f"<SharedLock shared={self._shared} exclusive={self._exclusive} waiters={len(self._waiters)}>"
+        )
+
+    def locked(self) -> bool:
+        """Whether the lock is currently held exclusively."""
+        return self._exclusive
+
+    def busy(self) -> bool:
+        """Whether the lock is currently held in any mode."""
+        return self._exclusive or bool(self._shared)
+
+    def _can_grant(self, exclusive: bool) -> bool:
+        if exclusive:
+            return not (self._exclusive or self._shared)
+        else:
+            return not self._exclusive
+
+    def _grant(self, exclusive: bool):
+        if exclusive:
+            self._exclusive = True
+        else:
+            self._shared += 1
+
+    def _wake(self):
+        # Grant waiters from the front of the queue while they are compatible
+        while self._waiters:
+            exclusive, fut = self._waiters[0]
+            if fut.done():
+                self._waiters.popleft()
+                continue
+            if not self._can_grant(exclusive):
+                break
+            self._waiters.popleft()
+            self._grant(exclusive)
+            fut.set_result(True)
+            if exclusive:
+                break
+
+    async def acquire(self, exclusive=False) -> bool:
+        if not self._waiters and self._can_grant(exclusive):
+            self._grant(exclusive)
+            return True
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append((exclusive, fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # We were granted the lock concurrently with cancellation
+                self.release(exclusive)
+            else:
+                self._wake()
+            raise
+        return True
+
+    def release(self, exclusive=False):
+        if exclusive:
+            if not self._exclusive:
+                raise RuntimeError("SharedLock is not held exclusively.")
+            self._exclusive = False
+        else:
+            if not self._shared:
+                raise RuntimeError("SharedLock is not held shared.")
+            self._shared -= 1
+        self._wake()
+
+
+class GuildMemberLocks:
+    """
+    Hierarchical lock manager serialising work per member,
+    with exclusive barriers over a single guild or over every guild.
+
+    Member holders take the global and guild barriers shared, and then the member lock.
+    Hence holders for distinct members run concurrently,
+    while `guild` and `barrier` wait for (and block) all member holders underneath them.
+
+    Locks are held weakly and are discarded when no longer referenced.
+    """
+
+    def __init__(self):
+        self._global = SharedLock()
+        self._guilds: WeakValueDictionary[int, SharedLock] = WeakValueDictionary()
+        self._members: WeakValueDictionary[tuple[int, int], asyncio.Lock] = WeakValueDictionary()
+
+        self.stats = LockStats()
+        self.holder: Optional[str] = None
+
+    def __repr__(self):
+        return (
+            "<"
+                f"{self.__class__.__name__}"
+                f" global={self._global!r}"
+                f" guilds={len(self._guilds)}"
+                f" members={len(self._members)}"
+                f" holder={self.holder}"
+                f" stats={self.stats!r}"
+                ">"
+        )
+
+    def locked(self) -> bool:
+        """Whether the global barrier is currently held."""
+        return self._global.locked()
+
+    def guild_locked(self, guildid: int) -> bool:
+        """Whether the barrier for the given guild is currently held."""
+        lock = self._guilds.get(guildid, None)
+        return lock is not None and lock.locked()
+
+    def _guild_lock(self, guildid: int) -> SharedLock:
+        lock = self._guilds.get(guildid, None)
+        if lock is None:
+            lock = self._guilds[guildid] = SharedLock()
+        return lock
+
+    def _member_lock(self, guildid: int, userid: int) -> asyncio.Lock:
+        key = (guildid, userid)
+        lock = self._members.get(key, None)
+        if lock is None:
+            lock = self._members[key] = asyncio.Lock()
+        return lock
+
+    @asynccontextmanager
+    async def _timed(self):
+        """
+        Account for waiting and acquisition time for a lock acquisition in the body.
+        """
+        stats = self.stats
+        stats.waiting += 1
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            stats.waiting -= 1
+        stats.record(time.monotonic() - start)
+
+    @asynccontextmanager
+    async def member(self, guildid: int, userid: int):
+        """
+        Serialise work for the given member.
+        """
+        glock = self._guild_lock(guildid)
+        mlock = self._member_lock(guildid, userid)
+
+        async with self._timed():
+            await self._global.acquire()
+            try:
+                await glock.acquire()
+                try:
+                    await mlock.acquire()
+                except BaseException:
+                    glock.release()
+                    raise
+            except BaseException:
+                self._global.release()
+                raise
+
+        self.stats.held += 1
+        try:
+            yield
+        finally:
+            self.stats.held -= 1
+            mlock.release()
+            glock.release()
+            self._global.release()
+
+    @asynccontextmanager
+    async def guild(self, *guildids: int):
+        """
+        Take exclusive barriers over the given guilds.
+
+        Barriers are acquired in sorted order to avoid deadlocks between multi-guild holders.
+        """
+        glocks = [self._guild_lock(guildid) for guildid in sorted(set(guildids))]
+        acquired = []
+
+        async with self._timed():
+            await self._global.acquire()
+            try:
+                for glock in glocks:
+                    await glock.acquire(exclusive=True)
+                    acquired.append(glock)
+            except BaseException:
+                for glock in acquired:
+                    glock.release(exclusive=True)
+                self._global.release()
+                raise
+
+        self.stats.held += 1
+        try:
+            yield
+        finally:
+            self.stats.held -= 1
+            for glock in acquired:
+                glock.release(exclusive=True)
+            self._global.release()
+
+    @asynccontextmanager
+    async def barrier(self, holder: Optional[str] = None):
+        """
+        Take the exclusive global barrier, waiting for every other holder to complete.
+        """
+        async with self._timed():
+            await self._global.acquire(exclusive=True)
+
+        self.stats.held += 1
+        self.holder = holder
+        try:
+            yield
+        finally:
+            self.holder = None
+            self.stats.held -= 1
+            self._global.release(exclusive=True)
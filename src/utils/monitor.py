@@ -1,6 +1,7 @@
 import asyncio
-import bisect
+import heapq
 import logging
+from itertools import count
 from typing import TypeVar, Generic, Optional, Callable, Coroutine, Any
 
 from .lib import utc_now
@@ -11,19 +12,26 @@ logger = logging.getLogger(__name__)
 
 Taskid = TypeVar('Taskid')
 
+# Marker for stale heap entries
+_REMOVED = object()
+
 
 class TaskMonitor(Generic[Taskid]):
     """
     Base class for a task monitor.
 
-    Stores tasks as a time-sorted list of taskids.
+    Stores tasks in a binary heap ordered by execution time, with lazy deletion.
     Subclasses may override `run_task` to implement an executor.
 
-    Adding or removing a single task has O(n) performance.
-    To bulk update tasks, instead use `schedule_tasks`.
+    Scheduling, rescheduling, or cancelling a single task has O(log n) performance.
+    Rescheduled and cancelled tasks leave stale heap entries behind,
+    which are discarded when they reach the top of the heap,
+    or by compacting the heap when stale entries outnumber live tasks.
 
     Each taskid must be unique and hashable.
     """
+    # Minimum number of stale entries before the heap is compacted
+    _compact_threshold = 1024
 
     def __init__(self, executor=None, bucket: Optional[Bucket] = None):
         # Ratelimit bucket to enforce maximum execution rate
@@ -35,8 +43,10 @@ class TaskMonitor(Generic[Taskid]):
         self._monitor_task: Optional[asyncio.Task] = None
 
         # Task data
-        self._tasklist: list[Taskid] = []
-        self._taskmap: dict[Taskid, int] = {}  # taskid -> timestamp
+        # Heap of [timestamp, sequence, taskid] entries, the taskid is replaced by _REMOVED when stale
+        self._heap: list[list] = []
+        self._taskmap: dict[Taskid, list] = {}  # taskid -> live heap entry
+        self._counter = count()
 
         # Running map ensures we keep a reference to the running task
         # And allows simpler external cancellation if required
@@ -46,7 +56,7 @@ class TaskMonitor(Generic[Taskid]):
         return (
             "<"
                 f"{self.__class__.__name__}"
-                f" tasklist={len(self._tasklist)}"
+                f" heap={len(self._heap)}"
                 f" taskmap={len(self._taskmap)}"
                 f" wakeup={self._wakeup.is_set()}"
                 f" bucket={self._bucket}"
@@ -55,24 +65,46 @@ class TaskMonitor(Generic[Taskid]):
                 f">"
         )
 
+    def _push(self, taskid: Taskid, timestamp: int) -> None:
+        if (entry := self._taskmap.get(taskid, None)) is not None:
+            entry[-1] = _REMOVED
+        entry = [timestamp, next(self._counter), taskid]
+        self._taskmap[taskid] = entry
+        heapq.heappush(self._heap, entry)
+
+    def _peek(self) -> Optional[list]:
+        """
+        Return the heap entry for the next live task, discarding stale entries on top of the heap.
+        """
+        heap = self._heap
+        while heap and heap[0][-1] is _REMOVED:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def _maybe_compact(self) -> None:
+        stale = len(self._heap) - len(self._taskmap)
+        if stale > self._compact_threshold and stale > len(self._taskmap):
+            self._heap = list(self._taskmap.values())
+            heapq.heapify(self._heap)
+
     def set_tasks(self, *tasks: tuple[Taskid, int]) -> None:
         """
         Similar to `schedule_tasks`, but wipe and reset the tasklist.
         """
-        self._taskmap = {tid: time for tid, time in tasks}
-        self._tasklist = list(sorted(self._taskmap.keys(), key=lambda tid: -1 * self._taskmap[tid]))
+        self._taskmap = {tid: [time, next(self._counter), tid] for tid, time in tasks}
+        self._heap = list(self._taskmap.values())
+        heapq.heapify(self._heap)
         self._wakeup.set()
 
     def schedule_tasks(self, *tasks: tuple[Taskid, int]) -> None:
         """
         Schedule the given tasks.
 
-        Rather than repeatedly inserting tasks,
-        where the O(log n) insort is dominated by the O(n) list insertion,
-        we build an entirely new list, and always wake up the loop.
+        Each task is pushed onto the heap in O(log n), and the loop is always woken up.
         """
-        self._taskmap |= {tid: time for tid, time in tasks}
-        self._tasklist = list(sorted(self._taskmap.keys(), key=lambda tid: -1 * self._taskmap[tid]))
+        for tid, time in tasks:
+            self._push(tid, time)
+        self._maybe_compact()
         self._wakeup.set()
 
     def schedule_task(self, taskid: Taskid, timestamp: int) -> None:
@@ -80,16 +112,13 @@ class TaskMonitor(Generic[Taskid]):
         Insert the provided task into the tasklist.
         If the new task has a lower timestamp than the next task, wakes up the monitor loop.
         """
-        if self._tasklist:
-            nextid = self._tasklist[-1]
-            wake = self._taskmap[nextid] >= timestamp
-            wake = wake or taskid == nextid
+        if (nextentry := self._peek()) is not None:
+            wake = nextentry[0] >= timestamp
+            wake = wake or taskid == nextentry[-1]
         else:
             wake = True
-        if taskid in self._taskmap:
-            self._tasklist.remove(taskid)
-        self._taskmap[taskid] = timestamp
-        bisect.insort_left(self._tasklist, taskid, key=lambda t: -1 * self._taskmap[t])
+        self._push(taskid, timestamp)
+        self._maybe_compact()
         if wake:
             self._wakeup.set()
 
@@ -98,14 +127,29 @@ class TaskMonitor(Generic[Taskid]):
         Remove all tasks with the given taskids from the tasklist.
         If the next task has this taskid, wake up the monitor loop.
         """
-        taskids = set(taskids)
-        wake = (self._tasklist and self._tasklist[-1] in taskids)
-        self._tasklist = [tid for tid in self._tasklist if tid not in taskids]
+        nextentry = self._peek()
+        wake = False
         for tid in taskids:
-            self._taskmap.pop(tid, None)
+            if (entry := self._taskmap.pop(tid, None)) is not None:
+                entry[-1] = _REMOVED
+                wake = wake or entry is nextentry
+        self._maybe_compact()
         if wake:
             self._wakeup.set()
 
+    def pop_due(self, now: float) -> list[Taskid]:
+        """
+        Remove and return every task due to run at the given time, in execution order.
+        """
+        heap = self._heap
+        due = []
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if (taskid := entry[-1]) is not _REMOVED:
+                del self._taskmap[taskid]
+                due.append(taskid)
+        return due
+
     def start(self):
         if self._monitor_task and not self._monitor_task.done():
             self._monitor_task.cancel()
@@ -124,21 +168,18 @@ class TaskMonitor(Generic[Taskid]):
         try:
             while True:
                 self._wakeup.clear()
-                if not self._tasklist:
+                if (nextentry := self._peek()) is None:
                     # No tasks left, just sleep until wakeup
                     await self._wakeup.wait()
                 else:
                     # Get the next task, sleep until wakeup or it is ready to run
-                    nextid = self._tasklist[-1]
-                    nexttime = self._taskmap[nextid]
-                    sleep_for = nexttime - utc_now().timestamp()
+                    sleep_for = nextentry[0] - utc_now().timestamp()
                     try:
                         await asyncio.wait_for(self._wakeup.wait(), timeout=sleep_for)
                     except asyncio.TimeoutError:
-                        # Ready to run the task
-                        self._tasklist.pop()
-                        self._taskmap.pop(nextid, None)
-                        self._running[nextid] = asyncio.ensure_future(self._run(nextid))
+                        # Ready to run the next task, and any others which are now due
+                        for taskid in self.pop_due(utc_now().timestamp()):
+                            self._running[taskid] = asyncio.ensure_future(self._run(taskid))
                     else:
                         # Wakeup task fired, loop again
                         continue
@@ -146,7 +187,7 @@ class TaskMonitor(Generic[Taskid]):
             # Log closure and wait for remaining tasks
             # A second cancellation will also cancel the tasks
             logger.debug(
-                f"Task Monitor {self.__class__.__name__} cancelled with {len(self._tasklist)} tasks remaining. "
+                f"Task Monitor {self.__class__.__name__} cancelled with {len(self._taskmap)} tasks remaining. "
                 f"Waiting for {len(self._running)} running tasks to complete."
             )
             await asyncio.gather(*self._running.values(), return_exceptions=True)